@@ -0,0 +1,62 @@
+import itertools
+
+from hlogedu.search.algorithm import Node, Solution
+
+
+# Més estats objectiu que això i la cerca enrere no surt a compte: la capa
+# inicial de la fringe enrere ja és més gran que tota la cerca endavant
+MAX_GOAL_STATES = 1000
+
+
+def backward_goals(problem, limit=MAX_GOAL_STATES):
+    """
+    Estats objectiu on comença la cerca enrere, o None si només podem
+    cercar endavant: el problema no té `get_predecessors` i
+    `get_goal_states`, o té més de `limit` estats objectiu. Només en
+    demanem `limit + 1`, així `get_goal_states` pot ser un generador.
+    """
+    if not hasattr(problem, "get_predecessors") or not hasattr(problem, "get_goal_states"):
+        return None
+    goals = list(itertools.islice(problem.get_goal_states(), limit + 1))
+    return goals if len(goals) <= limit else None
+
+
+def join_paths(meet, forward, backward):
+    """
+    Passos (estat, acció, cost) des de l'inici fins a l'objectiu passant
+    per `meet`, i l'estat inicial d'on surten.
+
+    `forward` i `backward` guarden, per cada estat visitat, una tupla que
+    comença amb (estat, acció, cost): cap endavant, el pare i l'acció que
+    en surt; cap enrere, el fill i l'acció que hi porta. Als extrems
+    (inicis i objectius) l'estat és None.
+    """
+    steps = []
+    state = meet
+    while forward[state][0] is not None:
+        parent, action, cost = forward[state][:3]
+        steps.append((state, action, cost))
+        state = parent
+    start = state
+    steps.reverse()
+
+    state = meet
+    while state in backward and backward[state][0] is not None:
+        child, action, cost = backward[state][:3]
+        steps.append((child, action, cost))
+        state = child
+    return start, steps
+
+
+def build_solution(problem, roots, start, steps):
+    """Solution amb el camí de `join_paths`, sense tornar a expandir."""
+    n = next(root for root in roots if root.state == start)
+    n.expanded_order = 1
+    n.location = Node.Location.EXPANDED
+    for order, (state, action, cost) in enumerate(steps, start=2):
+        ns = Node(state, action, cost=n.cost + cost, parent=n)
+        n.add_successor(ns)
+        n = ns
+        n.expanded_order = order
+        n.location = Node.Location.EXPANDED
+    return Solution(problem, roots, solution_node=n)
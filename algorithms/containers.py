@@ -0,0 +1,178 @@
+from hlogedu.search.containers import Fringe
+
+
+class IndexedPriorityQueue(Fringe):
+    """
+    Cua de prioritat indexada (heap d-ari) amb decrease-key.
+
+    Com `PriorityQueue`, però cada element té una clau (per defecte
+    l'estat del node) i a la cua hi ha com a molt un element per clau.
+    Si fem `push` d'una clau que ja hi és amb millor prioritat,
+    substituïm l'element i el pugem al heap (decrease-key) en lloc
+    d'afegir-ne un duplicat; si la prioritat no és millor, no fem res.
+
+    Els empats es desfan per ordre d'inserció, i un decrease-key compta
+    com una inserció nova, igual que el push duplicat d'una cua normal.
+    Així l'ordre d'expansió és el mateix que amb `PriorityQueue`, però la
+    cua no creix amb entrades obsoletes.
+    """
+
+    def __init__(self, index=lambda n: n.state, arity=4):
+        self._heap = []  # Entrades (prioritat, ordre, clau, element)
+        self._position = {}  # clau -> posició dins del heap
+        self._index = index
+        self._arity = arity
+        self._counter = 0
+        self._max_size = 0
+
+    @property
+    def max_size(self):
+        return self._max_size
+
+    def push(self, element, priority):
+        """
+        Afegeix l'element, o fa decrease-key si la seva clau ja hi és.
+        Retorna True si la cua ha canviat.
+        """
+        key = self._index(element)
+        i = self._position.get(key)
+        if i is not None:
+            if priority >= self._heap[i][0]:
+                return False
+            self._counter += 1
+            self._heap[i] = (priority, self._counter, key, element)
+            self._sift_up(i)
+            return True
+
+        self._counter += 1
+        self._heap.append((priority, self._counter, key, element))
+        self._sift_up(len(self._heap) - 1)
+        if len(self._heap) > self._max_size:
+            self._max_size = len(self._heap)
+        return True
+
+    def decrease_key(self, element, priority):
+        """
+        Com `push`, però la clau de l'element ha de ser a la cua.
+        """
+        if self._index(element) not in self._position:
+            raise KeyError(self._index(element))
+        return self.push(element, priority)
+
+    def peek(self):
+        return self._heap[0][3]
+
+    def pop(self):
+        heap = self._heap
+        top = heap[0]
+        last = heap.pop()
+        del self._position[top[2]]
+        if heap:
+            heap[0] = last
+            self._sift_down(0)
+        return top[3]
+
+    def discard(self, key):
+        """Treu l'element amb aquesta clau, si hi és."""
+        i = self._position.pop(key, None)
+        if i is None:
+            return
+        heap = self._heap
+        last = heap.pop()
+        if i < len(heap):
+            heap[i] = last
+            self._sift_up(i)
+            self._sift_down(self._position[last[2]])
+
+    def priority(self, key):
+        """Prioritat de la clau a la cua, o None si no hi és."""
+        i = self._position.get(key)
+        return None if i is None else self._heap[i][0]
+
+    def size(self):
+        return len(self._heap)
+
+    def is_empty(self):
+        return not self._heap
+
+    def __contains__(self, key):
+        return key in self._position
+
+    def __bool__(self):
+        return bool(self._heap)
+
+    def __iter__(self):
+        return (entry[3] for entry in self._heap)
+
+    def _sift_up(self, i):
+        heap, position, arity = self._heap, self._position, self._arity
+        entry = heap[i]
+        while i:
+            parent = (i - 1) // arity
+            # Només es comparen (prioritat, ordre): l'ordre és únic
+            if not entry < heap[parent]:
+                break
+            heap[i] = heap[parent]
+            position[heap[i][2]] = i
+            i = parent
+        heap[i] = entry
+        position[entry[2]] = i
+
+    def _sift_down(self, i):
+        heap, position, arity = self._heap, self._position, self._arity
+        n = len(heap)
+        entry = heap[i]
+        while True:
+            first = arity * i + 1
+            if first >= n:
+                break
+            best = first
+            for child in range(first + 1, min(first + arity, n)):
+                if heap[child] < heap[best]:
+                    best = child
+            if not heap[best] < entry:
+                break
+            heap[i] = heap[best]
+            position[heap[i][2]] = i
+            i = best
+        heap[i] = entry
+        position[entry[2]] = i
+
+
+# Mida màxima de la taula de DenseStateSet (un byte per estat)
+MAX_DENSE_STATES = 2**28
+
+
+class DenseStateSet:
+    """
+    Conjunt d'estats guardat com una taula densa, un byte per estat.
+
+    Per problemes amb un índex perfecte dels estats (`state_index(state)`
+    a range(`num_states`), com JarsProblem): fa de `set` d'estats visitats
+    sense guardar cap tupla ni pagar-ne el hash.
+    """
+
+    def __init__(self, index, size):
+        self._index = index
+        self._table = bytearray(size)
+        self._size = 0
+
+    def add(self, state):
+        i = self._index(state)
+        if not self._table[i]:
+            self._table[i] = 1
+            self._size += 1
+
+    def __contains__(self, state):
+        return self._table[self._index(state)] == 1
+
+    def __len__(self):
+        return self._size
+
+
+def visited_set(problem):
+    """`DenseStateSet` si el problema té índex perfecte i hi cap; si no, `set`."""
+    size = getattr(problem, "num_states", None)
+    if not hasattr(problem, "state_index") or size is None or size > MAX_DENSE_STATES:
+        return set()
+    return DenseStateSet(problem.state_index, size)
@@ -1,6 +1,17 @@
-from hlogedu.search.algorithm import Algorithm, Node, Solution
+import os
+import sys
+
+from hlogedu.search.algorithm import Algorithm
 from hlogedu.search.containers import PriorityQueue
 
+# Els mòduls auxiliars (containers, nodestore, metrics) són al mateix directori
+ALGORITHMS_DIR = os.path.dirname(os.path.abspath(__file__))
+if ALGORITHMS_DIR not in sys.path:
+    sys.path.insert(0, ALGORITHMS_DIR)
+from containers import IndexedPriorityQueue, visited_set  # noqa: E402
+from metrics import SearchMetrics  # noqa: E402
+from nodestore import search_tree  # noqa: E402
+
 class AStarGraph(Algorithm):
     """
     A* Graph
@@ -10,72 +21,108 @@ class AStarGraph(Algorithm):
     
     Fem tracking dels estats expandits per evitar revisitar nodes
     I també trackegem el millor cost conegut per cada estat
+
+    Amb DECREASE_KEY la fringe és una IndexedPriorityQueue: quan trobem un
+    camí millor a un estat de la fringe li actualitzem la prioritat en
+    lloc d'afegir-ne un duplicat (veure my-graph-astar-dk)
+
+    L'arbre de cerca només es guarda sencer si l'outputter el dibuixa
+    (dot, graphviz); si no, els nodes són registres compactes amb
+    l'enllaç al pare (veure nodestore.py)
     """
     NAME = "my-graph-astar"
+    DECREASE_KEY = False
     
     def __init__(self, problem):
         super().__init__(problem)
-        self.fringe = PriorityQueue()
+        self.tree = search_tree()
+        if self.DECREASE_KEY:
+            self.fringe = IndexedPriorityQueue(index=self.tree.state)
+        else:
+            self.fringe = PriorityQueue()
     
     def run(self, heuristic):
-        expand_counter = 0
-        expanded = set()  # Set per evitar revisitar nodes expandits
+        tree = self.tree
+        metrics = SearchMetrics(self)
+        heuristic = metrics.heuristic(heuristic)
+        # Estats expandits, per no revisitar-los (taula densa si el problema ho permet)
+        expanded = visited_set(self.problem)
         best_cost = {}  # Diccionari per guardar el millor g(n) per cada estat
         
         # Creem root nodes a partir dels estats inicials
-        roots = [Node(s) for s in self.problem.get_start_states()]
+        roots = [tree.root(s) for s in self.problem.get_start_states()]
         
         # Comprovem si root es un estat final i l'afegim a fringe
         for n in roots:
-            if self.problem.is_goal_state(n.state):
-                return Solution(self.problem, roots, solution_node=n)
+            state = tree.state(n)
+            if self.problem.is_goal_state(state):
+                return metrics.finish(tree.solution(self.problem, n), self.fringe)
             
             # f(n) = g(n) + h(n)
-            f_n = n.cost + heuristic(n.state)
+            f_n = tree.cost(n) + heuristic(state)
             self.fringe.push(n, f_n)
-            best_cost[n.state] = n.cost
+            best_cost[state] = tree.cost(n)
         
         # search loop
         while self.fringe:
             n = self.fringe.pop()
+            state, cost = tree.state(n), tree.cost(n)
             
             # El saltem si ja ha sigut expandit
-            if n.state in expanded:
+            if state in expanded:
+                metrics.duplicates += 1
                 continue
             
             # El saltem si hem trobat un camí millor (aquest node està obsolet)
-            if n.state in best_cost and n.cost > best_cost[n.state]:
+            if state in best_cost and cost > best_cost[state]:
+                metrics.duplicates += 1
                 continue
             
             # Marquem com a expanded
-            expand_counter += 1
-            n.expand_order = expand_counter
-            n.location = Node.Location.EXPANDED
-            expanded.add(n.state)
+            metrics.expanded += 1
+            tree.expand(n, metrics.expanded)
+            expanded.add(state)
             
             # Generem successors en ordre lexicografic
             for s, a, c in sorted(
-                self.problem.get_successors(n.state), key=lambda x: x[0]
+                self.problem.get_successors(state), key=lambda x: x[0]
             ):
                 # Només processem successors si no ha sigut expanded
                 if s not in expanded:
-                    new_cost = n.cost + c
+                    new_cost = cost + c
                     
                     # Només afegim/actualitzem si és un camí millor
                     if s not in best_cost or new_cost < best_cost[s]:
-                        ns = Node(s, a, cost=new_cost, parent=n)
-                        n.add_successor(ns)
+                        ns = tree.child(n, s, a, new_cost)
+                        metrics.generated += 1
                         
                         # Actualitzem el millor cost conegut
                         best_cost[s] = new_cost
                         
                         # Comprovem si es estat final
-                        if self.problem.is_goal_state(ns.state):
-                            return Solution(self.problem, roots, solution_node=ns)
+                        if self.problem.is_goal_state(s):
+                            return metrics.finish(
+                                tree.solution(self.problem, ns), self.fringe
+                            )
                         
                         # f(ns) = g(ns) + h(ns)
-                        f_ns = new_cost + heuristic(ns.state)
+                        # Amb DECREASE_KEY, si ja hi era, substitueix el node vell
+                        f_ns = new_cost + heuristic(s)
                         self.fringe.push(ns, f_ns)
+                    else:
+                        metrics.duplicates += 1
+                else:
+                    metrics.duplicates += 1
         
         # No hem trobat solucio
-        return Solution(self.problem, roots)
\ No newline at end of file
+        return metrics.finish(tree.solution(self.problem), self.fringe)
+
+
+class AStarGraphDecreaseKey(AStarGraph):
+    """
+    A* Graph amb decrease-key
+    El mateix algorisme i ordre d'expansió que my-graph-astar, però sense
+    nodes obsolets a la fringe
+    """
+    NAME = "my-graph-astar-dk"
+    DECREASE_KEY = True
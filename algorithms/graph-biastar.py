@@ -0,0 +1,154 @@
+import math
+import os
+import sys
+
+from hlogedu.search.algorithm import Algorithm, Node, Solution
+from hlogedu.search.containers import PriorityQueue
+
+# Els mòduls auxiliars (containers, nodestore, metrics) són al mateix directori
+ALGORITHMS_DIR = os.path.dirname(os.path.abspath(__file__))
+if ALGORITHMS_DIR not in sys.path:
+    sys.path.insert(0, ALGORITHMS_DIR)
+from bidirectional import backward_goals, build_solution, join_paths  # noqa: E402
+from metrics import SearchMetrics  # noqa: E402
+
+
+class BidirectionalAStar(Algorithm):
+    """
+    A* bidireccional (front-to-end, amb potencials mitjans)
+    h_f(n) = h(n) és la heurística fins a l'objectiu i
+    h_b(n) = max(0, h(inici) - h(n)) és una cota inferior de la distància
+    des de l'inici (si h és consistent). La cerca cap endavant ordena per
+    g(n) + p(n) i la cerca cap enrere (amb get_predecessors) per
+    g(n) - p(n), amb p(n) = (h_f(n) - h_b(n)) / 2.
+
+    Cada cop que un estat té cost conegut per les dues bandes actualitzem
+    el millor camí. Com que p és consistent en les dues direccions, podem
+    parar quan la suma dels mínims de les dues fringes arriba al millor
+    camí.
+
+    Si el problema no té `get_predecessors` i `get_goal_states`, o té
+    massa estats objectiu (veure bidirectional.py), fem un A* de graf
+    normal només cap endavant.
+    """
+    NAME = "my-graph-biastar"
+
+    def __init__(self, problem):
+        super().__init__(problem)
+        self.fringe = PriorityQueue()
+        self.backward_fringe = PriorityQueue()
+
+    def run(self, heuristic):
+        self.metrics = metrics = SearchMetrics(self)
+        heuristic = metrics.heuristic(heuristic)
+        goals = backward_goals(self.problem)
+        bidirectional = goals is not None
+
+        roots = [Node(s) for s in self.problem.get_start_states()]
+        starts = [n.state for n in roots]
+        for s in starts:
+            if self.problem.is_goal_state(s):
+                return metrics.finish(
+                    build_solution(self.problem, roots, s, []),
+                    self.fringe, self.backward_fringe,
+                )
+        h_start = min(heuristic(s) for s in starts)
+
+        def potential(s):
+            h = heuristic(s)
+            return (h - max(0, h_start - h)) / 2
+
+        # Una entrada per direcció: fringe, g(n), (veí, acció, cost) cap a
+        # l'extrem (veure join_paths), expandits i potencial
+        if bidirectional:
+            forward = (self.fringe, {}, {}, set(), potential)
+        else:
+            forward = (self.fringe, {}, {}, set(), heuristic)
+        backward = (
+            self.backward_fringe, {}, {}, set(), lambda s: -potential(s),
+        )
+        for s in starts:
+            self.push(forward, s, (None, None, 0), 0)
+        if bidirectional:
+            for s in goals:
+                self.push(backward, s, (None, None, 0), 0)
+
+        best_cost = math.inf
+        meet = None
+
+        # search loop
+        while self.fringe and (not bidirectional or self.backward_fringe):
+            top = self.top(forward)
+            if bidirectional:
+                top += self.top(backward)
+            if best_cost <= top:
+                break
+
+            # Expandim la banda amb la fringe més petita
+            if not bidirectional or (
+                self.fringe.size() <= self.backward_fringe.size()
+            ):
+                side, other = forward, backward
+                neighbors = self.problem.get_successors
+            else:
+                side, other = backward, forward
+                neighbors = self.problem.get_predecessors
+
+            fringe, g, _, expanded, _ = side
+            if not fringe:
+                break
+            _, _, state = fringe.pop()
+            metrics.expanded += 1
+            expanded.add(state)
+
+            for s, a, c in sorted(neighbors(state), key=lambda x: x[0]):
+                if s in expanded:
+                    metrics.duplicates += 1
+                    continue
+                new_cost = g[state] + c
+                if s in g and new_cost >= g[s]:
+                    metrics.duplicates += 1
+                    continue
+                self.push(side, s, (state, a, c), new_cost)
+                metrics.generated += 1
+
+                # Sense cerca enrere, els objectius tenen cost 0 fins al final
+                if s in other[1]:
+                    total = new_cost + other[1][s]
+                elif not bidirectional and self.problem.is_goal_state(s):
+                    total = new_cost
+                else:
+                    continue
+                if total < best_cost:
+                    best_cost, meet = total, s
+
+        if meet is None:
+            # No hem trobat solucio
+            return metrics.finish(
+                Solution(self.problem, roots), self.fringe, self.backward_fringe
+            )
+
+        start, steps = join_paths(meet, forward[2], backward[2])
+        return metrics.finish(
+            build_solution(self.problem, roots, start, steps),
+            self.fringe, self.backward_fringe,
+        )
+
+    @staticmethod
+    def push(side, state, link, cost):
+        fringe, g, links, _, h = side
+        g[state] = cost
+        links[state] = link
+        f = cost + h(state)
+        fringe.push((f, cost, state), f)
+
+    def top(self, side):
+        """Mínima prioritat de la fringe, descartant entrades obsoletes."""
+        fringe, g, _, expanded, _ = side
+        while fringe:
+            f, cost, state = fringe.peek()
+            if state not in expanded and cost == g[state]:
+                return f
+            fringe.pop()
+            self.metrics.duplicates += 1
+        return math.inf
@@ -0,0 +1,107 @@
+import os
+import sys
+
+from hlogedu.search.algorithm import Algorithm, Node, Solution
+from hlogedu.search.containers import Queue
+
+# Els mòduls auxiliars (containers, nodestore, metrics) són al mateix directori
+ALGORITHMS_DIR = os.path.dirname(os.path.abspath(__file__))
+if ALGORITHMS_DIR not in sys.path:
+    sys.path.insert(0, ALGORITHMS_DIR)
+from bidirectional import backward_goals, build_solution, join_paths  # noqa: E402
+from metrics import SearchMetrics  # noqa: E402
+
+
+class BidirectionalBfs(Algorithm):
+    """
+    BFS bidireccional
+    Fem una BFS des dels estats inicials (amb get_successors) i una altra
+    des dels estats objectiu (amb get_predecessors), expandint cada cop
+    la capa completa de la fringe més petita. Quan una capa troba estats
+    ja visitats per l'altra banda, ens quedem amb el camí més curt.
+
+    Si el problema no té `get_predecessors` i `get_goal_states`, o té
+    massa estats objectiu (veure bidirectional.py), fem una BFS de graf
+    normal només cap endavant.
+    """
+    NAME = "my-graph-bibfs"
+
+    def __init__(self, problem):
+        super().__init__(problem)
+        self.fringe = Queue()
+        self.backward_fringe = Queue()
+
+    def run(self):
+        metrics = SearchMetrics(self)
+        goals = backward_goals(self.problem)
+        bidirectional = goals is not None
+
+        # Per cada estat guardem (estat veí cap a l'extrem, acció, cost,
+        # profunditat)
+        forward = {}
+        backward = {}
+        roots = [Node(s) for s in self.problem.get_start_states()]
+        for n in roots:
+            if self.problem.is_goal_state(n.state):
+                return metrics.finish(
+                    build_solution(self.problem, roots, n.state, []),
+                    self.fringe, self.backward_fringe,
+                )
+            forward[n.state] = (None, None, 0, 0)
+            self.fringe.push(n.state)
+        if bidirectional:
+            for s in goals:
+                backward[s] = (None, None, 0, 0)
+                self.backward_fringe.push(s)
+
+        # search loop
+        while self.fringe and (not bidirectional or self.backward_fringe):
+            # Expandim la capa més petita
+            if not bidirectional or (
+                self.fringe.length() <= self.backward_fringe.length()
+            ):
+                fringe, visited, other = self.fringe, forward, backward
+                neighbors = self.problem.get_successors
+            else:
+                fringe, visited, other = self.backward_fringe, backward, forward
+                neighbors = self.problem.get_predecessors
+
+            best = None
+            for _ in range(fringe.length()):
+                state = fringe.pop()
+                metrics.expanded += 1
+                depth = visited[state][3] + 1
+                for s, a, c in sorted(neighbors(state), key=lambda x: x[0]):
+                    if s in visited:
+                        metrics.duplicates += 1
+                        continue
+                    visited[s] = (state, a, c, depth)
+                    fringe.push(s)
+                    metrics.generated += 1
+
+                    # Sense cerca enrere, com una BFS: el primer objectiu
+                    # generat ja és a la profunditat mínima
+                    if not bidirectional:
+                        if self.problem.is_goal_state(s):
+                            start, steps = join_paths(s, forward, backward)
+                            return metrics.finish(
+                                build_solution(self.problem, roots, start, steps),
+                                self.fringe, self.backward_fringe,
+                            )
+                        continue
+                    if s in other:
+                        length = depth + other[s][3]
+                        if best is None or length < best[0]:
+                            best = (length, s)
+
+            if best is not None:
+                start, steps = join_paths(best[1], forward, backward)
+                return metrics.finish(
+                    build_solution(self.problem, roots, start, steps),
+                    self.fringe, self.backward_fringe,
+                )
+
+        # No hem trobat solucio
+        return metrics.finish(
+            Solution(self.problem, roots), self.fringe, self.backward_fringe
+        )
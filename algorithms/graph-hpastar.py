@@ -0,0 +1,345 @@
+import os
+import sys
+from array import array
+from collections import deque
+
+from hlogedu.search.algorithm import Algorithm, Node, Solution
+from hlogedu.search.containers import PriorityQueue
+from hlogedu.search.exceptions import AlgorithmException
+
+# Els mòduls auxiliars (containers, nodestore, metrics) són al mateix directori
+ALGORITHMS_DIR = os.path.dirname(os.path.abspath(__file__))
+if ALGORITHMS_DIR not in sys.path:
+    sys.path.insert(0, ALGORITHMS_DIR)
+from metrics import SearchMetrics  # noqa: E402
+
+
+# Direccions de la taula de veïns de Pacman (`DIRECTIONS`), en el mateix ordre
+DIRECTIONS = ("U", "D", "L", "R")
+
+# Grafs abstractes ja construïts en aquest procés: (hash del laberint,
+# mida del clúster) -> {cel·la: [(cel·la, cost)]}
+ABSTRACT_GRAPHS = {}
+
+# Capçalera del fitxer de la memòria cau (magic, versió, mida del clúster,
+# nombre d'arestes); canvieu la versió si canvia el format
+HPA_MAGIC = 0x48504131
+HPA_VERSION = 1
+
+
+class HPAStar(Algorithm):
+    """
+    Hierarchical Pathfinding A* (HPA*) per als laberints de Pacman.
+
+    Dividim el mapa en clústers de CLUSTER_SIZE x CLUSTER_SIZE cel·les.
+    A cada vora entre dos clústers, cada tram de cel·les lliures als dos
+    costats és una entrada: hi posem una transició al mig (o dues, als
+    extrems, si el tram és llarg). Les cel·les de les transicions són els
+    nodes del graf abstracte, units per arestes de cost 1 entre clústers
+    i, dins de cada clúster, per la distància BFS sense sortir-ne.
+
+    El graf abstracte només depèn de les parets: es construeix un cop per
+    laberint i es guarda a la memòria cau del problema (`cache_path`).
+    Cada consulta connecta l'inici i l'objectiu als nodes del seu clúster,
+    fa A* (Manhattan) sobre el graf abstracte i refina cada aresta del
+    camí amb un BFS dins del clúster. El camí és quasi òptim: només pot
+    ser més llarg que l'òptim perquè passa per les transicions.
+
+    La Solution conté el camí complet cel·la a cel·la amb les accions
+    `move` del problema. `my-graph-hpastar-abstract` no refina i retorna
+    només els punts de pas (mateix cost).
+    """
+    NAME = "my-graph-hpastar"
+    CLUSTER_SIZE = 16
+    REFINE = True
+
+    def __init__(self, problem):
+        super().__init__(problem)
+        self.fringe = PriorityQueue()
+
+    def run(self):
+        problem = self.problem
+        if not hasattr(problem, "neighbors") or not hasattr(problem, "food_cell"):
+            raise AlgorithmException("HPA* needs a Pacman problem (neighbor table)")
+        if getattr(problem, "corridors", None) is not None:
+            raise AlgorithmException("HPA* needs the cell graph (graph=cells)")
+        if problem.food_cell is None:
+            raise AlgorithmException("HPA* needs a layout with a single food")
+
+        metrics = self.metrics = SearchMetrics(self)
+        self.cols = problem.cols
+        self.neighbors = problem.neighbors
+        self.expanded_cells = 0
+        graph = self.abstract_graph()
+
+        start, goal = problem.start_cell, problem.food_cell
+        # Connectem l'inici i l'objectiu al graf abstracte (sense tocar-lo)
+        extra = {start: self.cluster_edges(start, graph), goal: []}
+        for cell, cost in self.cluster_edges(goal, graph):
+            extra.setdefault(cell, []).append((goal, cost))
+        for cell, cost in self.cluster_distances(start, [goal]):
+            extra[start].append((goal, cost))
+
+        path = self.abstract_search(graph, extra, start, goal)
+        problem._num_expanded += metrics.expanded + self.expanded_cells
+        if path is None:
+            roots = [Node(s) for s in problem.get_start_states()]
+            return metrics.finish(Solution(problem, roots), self.fringe)
+        return metrics.finish(self.build_solution(path), self.fringe)
+
+    def cluster(self, cell):
+        r, c = divmod(cell, self.cols)
+        return (r // self.CLUSTER_SIZE, c // self.CLUSTER_SIZE)
+
+    def cluster_distances(self, source, targets):
+        """Distàncies BFS de `source` a `targets` sense sortir del clúster."""
+        cluster = self.cluster(source)
+        targets = set(targets)
+        distances = {source: 0}
+        found = []
+        frontier = deque([source])
+        while frontier:
+            cell = frontier.popleft()
+            self.expanded_cells += 1
+            if cell in targets and cell != source:
+                found.append((cell, distances[cell]))
+            for n_cell in self.neighbors[4 * cell:4 * cell + 4]:
+                if n_cell >= 0 and n_cell not in distances and self.cluster(n_cell) == cluster:
+                    distances[n_cell] = distances[cell] + 1
+                    frontier.append(n_cell)
+        return found
+
+    def cluster_edges(self, cell, graph):
+        """Arestes de `cell` als nodes abstractes del seu clúster."""
+        cluster = self.cluster(cell)
+        nodes = [n for n in graph if self.cluster(n) == cluster]
+        return self.cluster_distances(cell, nodes)
+
+    # Graf abstracte
+    ##########################################################################
+
+    def abstract_graph(self):
+        problem = self.problem
+        key = (problem.layout_hash, self.CLUSTER_SIZE)
+        graph = ABSTRACT_GRAPHS.get(key)
+        if graph is not None:
+            return graph
+
+        path = problem.cache_path(f"hpa-{self.CLUSTER_SIZE}.bin")
+        edges = self.load_edges(path)
+        if edges is None:
+            # Les distàncies dins dels clústers no compten com a expansions
+            # de la consulta
+            counted = self.expanded_cells
+            edges = self.build_edges()
+            self.expanded_cells = counted
+            header = array("i", (HPA_MAGIC, HPA_VERSION, self.CLUSTER_SIZE, len(edges) // 3))
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, "wb") as fh:
+                    header.tofile(fh)
+                    edges.tofile(fh)
+                os.replace(tmp_path, path)
+            except OSError:
+                pass  # La memòria cau només és una optimització
+
+        graph = {}
+        for i in range(0, len(edges), 3):
+            a, b, cost = edges[i:i + 3]
+            graph.setdefault(a, []).append((b, cost))
+            graph.setdefault(b, []).append((a, cost))
+        ABSTRACT_GRAPHS[key] = graph
+        return graph
+
+    def load_edges(self, path):
+        """Arestes del fitxer de la memòria cau, o None si no n'hi ha o la
+        capçalera no quadra (format antic, una altra mida de clúster o un
+        fitxer truncat)."""
+        data = array("i")
+        try:
+            with open(path, "rb") as fh:
+                data.frombytes(fh.read())
+        except (OSError, ValueError):
+            return None
+        if len(data) < 4:
+            return None
+        magic, version, cluster_size, n_edges = data[:4]
+        if (magic, version, cluster_size) != (HPA_MAGIC, HPA_VERSION, self.CLUSTER_SIZE):
+            return None
+        if len(data) != 4 + 3 * n_edges:
+            return None
+        n_cells = self.problem.rows * self.cols
+        edges = data[4:]
+        if any(not 0 <= cell < n_cells for i, cell in enumerate(edges) if i % 3 != 2):
+            return None
+        return edges
+
+    def build_edges(self):
+        """Arestes (a, b, cost) del graf abstracte, en un array pla."""
+        problem = self.problem
+        rows, cols, walls, size = problem.rows, self.cols, problem.walls, self.CLUSTER_SIZE
+        edges = array("i")
+        nodes = set()
+
+        def add_entrance(run):
+            # Trams curts: una transició al mig; llargs: una a cada extrem
+            for a, b in ([run[len(run) // 2]] if len(run) < 6 else [run[0], run[-1]]):
+                nodes.update((a, b))
+                edges.extend((a, b, 1))
+
+        # Vores verticals (entre columnes de clústers) i horitzontals
+        borders = [
+            [(r * cols + c, r * cols + c + 1) for r in range(rows)]
+            for c in range(size - 1, cols - 1, size)
+        ] + [
+            [(r * cols + c, (r + 1) * cols + c) for c in range(cols)]
+            for r in range(size - 1, rows - 1, size)
+        ]
+        for border in borders:
+            run = []
+            for i, (a, b) in enumerate(border):
+                # Els trams no passen d'un clúster al següent
+                if run and i % size == 0:
+                    add_entrance(run)
+                    run = []
+                if walls[a] or walls[b]:
+                    if run:
+                        add_entrance(run)
+                    run = []
+                else:
+                    run.append((a, b))
+            if run:
+                add_entrance(run)
+
+        clusters = {}
+        for cell in nodes:
+            clusters.setdefault(self.cluster(cell), []).append(cell)
+        for cluster_nodes in clusters.values():
+            for i, a in enumerate(cluster_nodes):
+                for b, cost in self.cluster_distances(a, cluster_nodes[i + 1:]):
+                    edges.extend((a, b, cost))
+        return edges
+
+    # Consulta
+    ##########################################################################
+
+    def abstract_search(self, graph, extra, start, goal):
+        """
+        A* sobre el graf abstracte. Retorna el camí com a parelles
+        (cel·la, cost acumulat), o None si l'objectiu no és accessible.
+        """
+        metrics = self.metrics
+        goal_r, goal_c = divmod(goal, self.cols)
+
+        def manhattan(cell):
+            r, c = divmod(cell, self.cols)
+            return abs(r - goal_r) + abs(c - goal_c)
+
+        best_cost = {start: 0}
+        parent = {start: None}
+        expanded = set()
+        self.fringe.push((0, start), manhattan(start))
+        metrics.heuristic_calls += 1
+        while self.fringe:
+            cost, cell = self.fringe.pop()
+            if cell in expanded or cost > best_cost[cell]:
+                metrics.duplicates += 1
+                continue
+            metrics.expanded += 1
+            expanded.add(cell)
+            if cell == goal:
+                path = []
+                while cell is not None:
+                    path.append((cell, best_cost[cell]))
+                    cell = parent[cell]
+                return path[::-1]
+
+            for n_cell, c in graph.get(cell, []) + extra.get(cell, []):
+                new_cost = cost + c
+                if n_cell in expanded or new_cost >= best_cost.get(n_cell, new_cost + 1):
+                    metrics.duplicates += 1
+                    continue
+                best_cost[n_cell] = new_cost
+                parent[n_cell] = cell
+                self.fringe.push((new_cost, n_cell), new_cost + manhattan(n_cell))
+                metrics.generated += 1
+                metrics.heuristic_calls += 1
+        return None
+
+    def refine(self, a, b):
+        """Moviments de `a` a `b`: un sol pas o un BFS dins del clúster."""
+        for d, n_cell in enumerate(self.neighbors[4 * a:4 * a + 4]):
+            if n_cell == b:
+                return [DIRECTIONS[d]]
+
+        cluster = self.cluster(a)
+        parent = {a: None}
+        frontier = deque([a])
+        while frontier:
+            cell = frontier.popleft()
+            self.expanded_cells += 1
+            if cell == b:
+                break
+            for d, n_cell in enumerate(self.neighbors[4 * cell:4 * cell + 4]):
+                if n_cell >= 0 and n_cell not in parent and self.cluster(n_cell) == cluster:
+                    parent[n_cell] = (cell, d)
+                    frontier.append(n_cell)
+
+        moves = []
+        while parent[b] is not None:
+            b, d = parent[b]
+            moves.append(DIRECTIONS[d])
+        return moves[::-1]
+
+    def build_solution(self, path):
+        """Solution amb el camí cel·la a cel·la, o amb els punts de pas."""
+        problem = self.problem
+        roots = [Node(s) for s in problem.get_start_states()]
+        n = roots[0]
+        n.expanded_order = 1
+        n.location = Node.Location.EXPANDED
+
+        if not self.REFINE:
+            for order, (cell, cost) in enumerate(path[1:], start=2):
+                r, c = divmod(cell, self.cols)
+                food = () if cell == problem.food_cell else (problem.food,)
+                ns = Node(problem.encode((r, c), food), f"to({r},{c})", cost=cost, parent=n)
+                n.add_successor(ns)
+                n = ns
+                n.expanded_order = order
+                n.location = Node.Location.EXPANDED
+            return Solution(problem, roots, solution_node=n)
+
+        moves = []
+        for (a, _), (b, _) in zip(path, path[1:]):
+            moves.extend(self.refine(a, b))
+
+        # La reconstrucció no compta com a expansions
+        expanded_before = problem.num_expanded
+        for order, move in enumerate(moves, start=2):
+            for s, a, c in problem.get_successors(n.state):
+                if a == f"move({move})":
+                    ns = Node(s, a, cost=n.cost + c, parent=n)
+                    n.add_successor(ns)
+                    n = ns
+                    break
+            else:
+                raise AlgorithmException(f"The problem does not support move({move})")
+            n.expanded_order = order
+            n.location = Node.Location.EXPANDED
+            # Un tram refinat pot passar pel menjar abans d'arribar al
+            # punt de pas: el camí acaba quan se'l menja
+            if problem.is_goal_state(n.state):
+                break
+        problem._num_expanded = expanded_before
+
+        if not problem.is_goal_state(n.state):
+            raise AlgorithmException("The refined path does not reach the food")
+        return Solution(problem, roots, solution_node=n)
+
+
+class HPAStarAbstract(HPAStar):
+    """HPA* sense refinar: la Solution només té els punts de pas."""
+    NAME = "my-graph-hpastar-abstract"
+    REFINE = False
@@ -0,0 +1,200 @@
+import os
+import sys
+
+from hlogedu.search.algorithm import Algorithm, Node, Solution
+from hlogedu.search.containers import PriorityQueue
+from hlogedu.search.exceptions import AlgorithmException
+
+# Els mòduls auxiliars (containers, nodestore, metrics) són al mateix directori
+ALGORITHMS_DIR = os.path.dirname(os.path.abspath(__file__))
+if ALGORITHMS_DIR not in sys.path:
+    sys.path.insert(0, ALGORITHMS_DIR)
+from metrics import SearchMetrics  # noqa: E402
+
+
+# Direccions de la taula de veïns de Pacman (`DIRECTIONS`), en el mateix ordre:
+# 0 i 1 són verticals, 2 i 3 horitzontals, i `d ^ 1` és la direcció contrària
+DIRECTIONS = ("U", "D", "L", "R")
+VERTICAL = (0, 1)
+HORIZONTAL = (2, 3)
+
+
+class JumpPointSearch(Algorithm):
+    """
+    Jump Point Search (variant 4-connectada) per als laberints de Pacman.
+
+    Fa servir la taula de veïns del problema (`neighbors`, cel·la i
+    direcció -> cel·la veïna o -1), així que només funciona amb el graf de
+    cel·les (graph=cells) i un sol menjar.
+
+    En lloc d'afegir a la fringe cada cel·la, saltem en línia recta fins
+    a trobar un jump point: l'objectiu, una cel·la amb un veí forçat
+    (el camí simètric està bloquejat) o, en salts verticals, una cel·la
+    des d'on un salt horitzontal troba un jump point.
+    Només els jump points passen per la PriorityQueue, amb
+    f(n) = g(n) + h(n) i h l'heurística del problema (-hf) avaluada a
+    l'estat del jump point. Cada jump point expandit passa per
+    `get_successors`, que és qui compta les expansions.
+
+    La Solution conté el camí complet cel·la a cel·la amb les accions
+    `move` del problema, perquè els outputters funcionin.
+    """
+    NAME = "my-graph-jps"
+
+    def __init__(self, problem):
+        super().__init__(problem)
+        self.fringe = PriorityQueue()
+
+    def run(self, heuristic):
+        problem = self.problem
+        if not hasattr(problem, "neighbors") or not hasattr(problem, "food_cell"):
+            raise AlgorithmException("Jump Point Search needs a Pacman problem (neighbor table)")
+        if getattr(problem, "corridors", None) is not None:
+            raise AlgorithmException("Jump Point Search needs the cell graph (graph=cells)")
+        if problem.food_cell is None:
+            raise AlgorithmException("Jump Point Search needs a layout with a single food")
+
+        metrics = SearchMetrics(self)
+        heuristic = metrics.heuristic(heuristic)
+        self.neighbors = problem.neighbors
+        self.goal = problem.food_cell
+        start = problem.start_cell
+
+        best_cost = {start: 0}
+        parent = {start: None}
+        expanded = set()
+
+        self.fringe.push((start, None), heuristic(self.state(start)))
+
+        # search loop
+        while self.fringe:
+            cell, direction = self.fringe.pop()
+
+            # El saltem si ja ha sigut expandit
+            if cell in expanded:
+                metrics.duplicates += 1
+                continue
+
+            metrics.expanded += 1
+            expanded.add(cell)
+
+            if cell == self.goal:
+                return metrics.finish(self.build_solution(cell, parent), self.fringe)
+
+            # Expandim el jump point amb el problema: només saltem cap a
+            # les direccions on hi ha successor
+            moves = {a for _, a, _ in problem.get_successors(self.state(cell))}
+            for d in self.pruned_directions(cell, direction):
+                if f"move({DIRECTIONS[d]})" not in moves:
+                    continue
+                jump_point = self.jump(cell, d)
+                if jump_point is None:
+                    continue
+                if jump_point in expanded:
+                    metrics.duplicates += 1
+                    continue
+
+                # Els salts són en línia recta: el cost és la distància
+                new_cost = best_cost[cell] + self.distance(cell, jump_point)
+                if jump_point not in best_cost or new_cost < best_cost[jump_point]:
+                    best_cost[jump_point] = new_cost
+                    parent[jump_point] = cell
+                    self.fringe.push(
+                        (jump_point, d), new_cost + heuristic(self.state(jump_point))
+                    )
+                    metrics.generated += 1
+                else:
+                    metrics.duplicates += 1
+
+        # No hem trobat solucio
+        roots = [Node(s) for s in problem.get_start_states()]
+        return metrics.finish(Solution(problem, roots), self.fringe)
+
+    def state(self, cell):
+        """Estat del problema amb Pacman a `cell` (el menjar hi és si no
+        és la cel·la de l'objectiu)."""
+        food = () if cell == self.goal else (self.problem.food,)
+        return self.problem.encode(divmod(cell, self.problem.cols), food)
+
+    def distance(self, a, b):
+        (r1, c1), (r2, c2) = divmod(a, self.problem.cols), divmod(b, self.problem.cols)
+        return abs(r2 - r1) + abs(c2 - c1)
+
+    def pruned_directions(self, cell, direction):
+        """Direccions que cal explorar des d'un jump point."""
+        if direction is None:
+            return range(4)
+        if direction in VERTICAL:
+            # Vertical: seguim recte i escanegem les dues horitzontals
+            return (direction,) + HORIZONTAL
+
+        # Horitzontal: seguim recte i girem només cap als veïns forçats
+        neighbors = self.neighbors
+        back = neighbors[4 * cell + (direction ^ 1)]
+        directions = [direction]
+        for v in VERTICAL:
+            if neighbors[4 * cell + v] >= 0 and (back < 0 or neighbors[4 * back + v] < 0):
+                directions.append(v)
+        return directions
+
+    def jump(self, cell, d):
+        """Avança en la direcció `d` fins al proper jump point."""
+        neighbors = self.neighbors
+        sides = VERTICAL if d in HORIZONTAL else HORIZONTAL
+        while True:
+            prev, cell = cell, neighbors[4 * cell + d]
+            if cell < 0:
+                return None
+            if cell == self.goal:
+                return cell
+
+            # Veí forçat: la cel·la del costat és lliure però la del
+            # costat de la cel·la d'on venim està bloquejada
+            for side in sides:
+                if neighbors[4 * cell + side] >= 0 and neighbors[4 * prev + side] < 0:
+                    return cell
+            if d in VERTICAL:
+                if self.jump(cell, 2) is not None or self.jump(cell, 3) is not None:
+                    return cell
+
+    def build_solution(self, goal, parent):
+        """Reconstrueix el camí cel·la a cel·la amb les accions del problema."""
+        jump_points = []
+        cell = goal
+        while cell is not None:
+            jump_points.append(cell)
+            cell = parent[cell]
+        jump_points.reverse()
+
+        roots = [Node(s) for s in self.problem.get_start_states()]
+        n = roots[0]
+        n.expanded_order = 1
+        n.location = Node.Location.EXPANDED
+        order = 1
+        for a, b in zip(jump_points, jump_points[1:]):
+            # Direcció del salt: la que porta de `a` cap a `b` en línia recta
+            d = next(
+                d for d in range(4)
+                if self.walk(a, d, self.distance(a, b)) == b
+            )
+            cell = a
+            for _ in range(self.distance(a, b)):
+                cell = self.neighbors[4 * cell + d]
+                ns = Node(self.state(cell), f"move({DIRECTIONS[d]})", cost=n.cost + 1, parent=n)
+                n.add_successor(ns)
+                n = ns
+                order += 1
+                n.expanded_order = order
+                n.location = Node.Location.EXPANDED
+
+        if not self.problem.is_goal_state(n.state):
+            raise AlgorithmException("The food cell is not a goal state")
+        return Solution(self.problem, roots, solution_node=n)
+
+    def walk(self, cell, d, steps):
+        """Cel·la a `steps` passos en la direcció `d`, o -1 si hi ha paret."""
+        for _ in range(steps):
+            if cell < 0:
+                break
+            cell = self.neighbors[4 * cell + d]
+        return cell
@@ -0,0 +1,109 @@
+import os
+import sys
+
+from hlogedu.search.algorithm import Algorithm
+from hlogedu.search.containers import PriorityQueue
+
+# Els mòduls auxiliars (containers, nodestore, metrics) són al mateix directori
+ALGORITHMS_DIR = os.path.dirname(os.path.abspath(__file__))
+if ALGORITHMS_DIR not in sys.path:
+    sys.path.insert(0, ALGORITHMS_DIR)
+from containers import IndexedPriorityQueue, visited_set  # noqa: E402
+from metrics import SearchMetrics  # noqa: E402
+from nodestore import search_tree  # noqa: E402
+
+
+class UcsGraph(Algorithm):
+    """
+    UCS Graph
+    Expandim sempre el node amb menys cost g(n) des de l'inici.
+    Comprovem si és objectiu quan l'expandim (no quan el generem),
+    així el primer objectiu que surt de la fringe és òptim.
+
+    Fem tracking dels estats expandits i del millor cost conegut per
+    cada estat. Amb DECREASE_KEY la fringe és una IndexedPriorityQueue
+    i els camins millors actualitzen el node de la fringe en lloc
+    d'afegir-ne un duplicat (veure my-graph-ucs-dk)
+
+    Com my-graph-astar, només guardem l'arbre sencer si l'outputter el
+    dibuixa (veure nodestore.py)
+    """
+    NAME = "my-graph-ucs"
+    DECREASE_KEY = False
+
+    def __init__(self, problem):
+        super().__init__(problem)
+        self.tree = search_tree()
+        if self.DECREASE_KEY:
+            self.fringe = IndexedPriorityQueue(index=self.tree.state)
+        else:
+            self.fringe = PriorityQueue()
+
+    def run(self, max_depth):
+        tree = self.tree
+        metrics = SearchMetrics(self)
+        cutoff = False
+        # Estats expandits, per no revisitar-los (taula densa si el problema ho permet)
+        expanded = visited_set(self.problem)
+        best_cost = {}  # Diccionari per guardar el millor g(n) per cada estat
+
+        # Creem root nodes a partir dels estats inicials
+        roots = [tree.root(s) for s in self.problem.get_start_states()]
+        for n in roots:
+            self.fringe.push(n, tree.cost(n))
+            best_cost[tree.state(n)] = tree.cost(n)
+
+        # search loop
+        while self.fringe:
+            n = self.fringe.pop()
+            state, cost = tree.state(n), tree.cost(n)
+
+            # El saltem si ja ha sigut expandit o si està obsolet
+            if state in expanded or cost > best_cost[state]:
+                metrics.duplicates += 1
+                continue
+
+            if self.problem.is_goal_state(state):
+                return metrics.finish(
+                    tree.solution(self.problem, n, cutoff=cutoff), self.fringe
+                )
+
+            if max_depth is not None and tree.depth(n) >= max_depth:
+                cutoff = True
+                continue
+
+            # Marquem com a expanded
+            metrics.expanded += 1
+            tree.expand(n, metrics.expanded)
+            expanded.add(state)
+
+            # Generem successors en ordre lexicografic
+            for s, a, c in sorted(
+                self.problem.get_successors(state), key=lambda x: x[0]
+            ):
+                if s in expanded:
+                    metrics.duplicates += 1
+                    continue
+                new_cost = cost + c
+
+                # Només afegim/actualitzem si és un camí millor
+                if s not in best_cost or new_cost < best_cost[s]:
+                    ns = tree.child(n, s, a, new_cost)
+                    metrics.generated += 1
+                    best_cost[s] = new_cost
+                    self.fringe.push(ns, new_cost)
+                else:
+                    metrics.duplicates += 1
+
+        # No hem trobat solucio
+        return metrics.finish(tree.solution(self.problem, cutoff=cutoff), self.fringe)
+
+
+class UcsGraphDecreaseKey(UcsGraph):
+    """
+    UCS Graph amb decrease-key
+    El mateix algorisme i ordre d'expansió que my-graph-ucs, però sense
+    nodes obsolets a la fringe
+    """
+    NAME = "my-graph-ucs-dk"
+    DECREASE_KEY = True
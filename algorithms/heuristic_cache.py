@@ -0,0 +1,129 @@
+import os
+from collections import OrderedDict
+
+from hlogedu.search.exceptions import AlgorithmException
+
+
+# Memòria cau de l'heurística per execució, sense tocar les classes:
+#
+#     HLOG_HEURISTIC_CACHE=lru:100000    LRU de com a molt 100000 estats
+#     HLOG_HEURISTIC_CACHE=clock         CLOCK de DEFAULT_SIZE estats
+CACHE_ENV = "HLOG_HEURISTIC_CACHE"
+DEFAULT_SIZE = 2**16
+
+
+def cached_heuristic(heuristic):
+    """
+    L'heurística amb la memòria cau que demana HLOG_HEURISTIC_CACHE, o
+    None si no n'hi ha cap de seleccionada.
+    """
+    spec = os.environ.get(CACHE_ENV)
+    if not spec:
+        return None
+    policy, size = cache_spec(spec)
+    return CachedHeuristic(heuristic, size, policy)
+
+
+def cache_spec(spec):
+    """(política, mida) d'un valor de HLOG_HEURISTIC_CACHE."""
+    policy, _, size = spec.partition(":")
+    try:
+        size = int(size) if size else DEFAULT_SIZE
+    except ValueError:
+        size = 0
+    if policy not in CachedHeuristic.POLICIES or size < 1:
+        raise AlgorithmException(
+            f"Invalid {CACHE_ENV}={spec!r}: expected lru, clock, lru:N or "
+            f"clock:N, with N the number of states kept (N >= 1)"
+        )
+    return policy, size
+
+
+class CachedHeuristic:
+    """
+    Embolcall amb memòria cau per qualsevol `Heuristic`, amb clau l'estat.
+
+    Com a molt guarda `size` valors; quan és plena en treu un amb la
+    política triada:
+
+        lru    el que fa més temps que no es fa servir (OrderedDict)
+        clock  aproximació de LRU amb un bit de referència per entrada,
+               més barata en cada encert perquè no reordena res
+
+    Només té sentit si `compute` depèn únicament de l'estat, com totes
+    les heurístiques del projecte.
+    """
+
+    POLICIES = ("lru", "clock")
+
+    def __init__(self, heuristic, size=DEFAULT_SIZE, policy="lru"):
+        if policy not in self.POLICIES:
+            raise AlgorithmException(f"Unknown heuristic cache policy: {policy}")
+        if size < 1:
+            raise AlgorithmException("The heuristic cache needs room for at least one state")
+        self.heuristic = heuristic
+        self.size = size
+        self.policy = policy
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if policy == "lru":
+            self.values = OrderedDict()
+            self.lookup = self.lookup_lru
+        else:
+            self.values = {}  # estat -> (valor, posició al rellotge)
+            self.keys = []
+            self.referenced = bytearray(size)
+            self.hand = 0
+            self.lookup = self.lookup_clock
+
+    def __call__(self, state):
+        return self.lookup(state)
+
+    def compute(self, state):
+        return self.lookup(state)
+
+    def lookup_lru(self, state):
+        values = self.values
+        value = values.get(state, values)
+        if value is not values:
+            self.hits += 1
+            values.move_to_end(state)
+            return value
+
+        self.misses += 1
+        value = self.heuristic(state)
+        if len(values) >= self.size:
+            values.popitem(last=False)
+            self.evictions += 1
+        values[state] = value
+        return value
+
+    def lookup_clock(self, state):
+        entry = self.values.get(state)
+        if entry is not None:
+            self.hits += 1
+            self.referenced[entry[1]] = 1
+            return entry[0]
+
+        self.misses += 1
+        value = self.heuristic(state)
+        if len(self.keys) < self.size:
+            slot = len(self.keys)
+            self.keys.append(state)
+        else:
+            # Avancem l'agulla fins a una entrada sense referència,
+            # donant una segona oportunitat a les que en tenen
+            referenced = self.referenced
+            while referenced[self.hand]:
+                referenced[self.hand] = 0
+                self.hand = (self.hand + 1) % self.size
+            slot = self.hand
+            self.hand = (self.hand + 1) % self.size
+            del self.values[self.keys[slot]]
+            self.keys[slot] = state
+            self.evictions += 1
+        self.referenced[slot] = 0
+        self.values[state] = (value, slot)
+        return value
@@ -1,6 +1,17 @@
-from hlogedu.search.algorithm import Algorithm, Node, Solution
+import os
+import sys
+from types import SimpleNamespace
+
+from hlogedu.search.algorithm import Algorithm, Node
 from hlogedu.search.containers import Stack
 
+# Els mòduls auxiliars (containers, nodestore, metrics) són al mateix directori
+ALGORITHMS_DIR = os.path.dirname(os.path.abspath(__file__))
+if ALGORITHMS_DIR not in sys.path:
+    sys.path.insert(0, ALGORITHMS_DIR)
+from metrics import SearchMetrics  # noqa: E402
+from nodestore import TreeSolution, expand_node, link_path  # noqa: E402
+
 
 class IDS(Algorithm):
     NAME = "my-tree-ids"
@@ -10,43 +21,97 @@ class IDS(Algorithm):
         self.fringe = Stack()
     
     def run(self, max_depth):
+        metrics = SearchMetrics(self)
         depth = 0
         while True:
-            # # Reset fringe per cada iteració del depth
-            # self.fringe = Stack()
-            expand_counter = 0
-            cutoff = False
+            roots, goal, cutoff = self.search(depth, metrics)
+            if goal is not None:
+                return metrics.finish(self.solution(roots, depth, goal, cutoff), self.fringe)
             
-            # Creem nodes a partir dels initial states
-            roots = [Node(s) for s in self.problem.get_start_states()]
+            if not cutoff:
+                return metrics.finish(self.solution(roots, depth), self.fringe)
             
-            # Comprovem si algun root es node
-            for n in roots:
-                if self.problem.is_goal_state(n.state):
-                    return Solution(self.problem, roots, solution_node=n, cutoff=False)
-                self.fringe.push(n)
+            # Ja hem arribat a max_depth
+            if max_depth is not None and depth >= max_depth:
+                return metrics.finish(self.solution(roots, depth, cutoff=True), self.fringe)
+            
+            depth += 1
+    
+    def search(self, depth, metrics, roots=None, path=()):
+        """
+        Una iteració: cerca en profunditat fins a `depth`.
+        Retorna (arrels, node objectiu o None, cutoff).
+        
+        Els nodes només tenen l'enllaç al pare i es poden alliberar quan
+        els hem explorat. Si li passem les `roots` d'una iteració anterior,
+        en canvi, guarda l'arbre sencer i hi reaprofita els nodes del camí
+        de la solució (`path`), per dibuixar-lo (veure `solution`).
+        """
+        keep_tree = roots is not None
+        fringe = Stack() if keep_tree else self.fringe
+        expand_counter = 0
+        cutoff = False
+        
+        # Creem nodes a partir dels initial states
+        if roots is None:
+            roots = [Node(s) for s in self.problem.get_start_states()]
+        
+        # Comprovem si algun root es node
+        for n in roots:
+            if self.problem.is_goal_state(n.state):
+                return roots, n, False
+            fringe.push(n)
+        
+        while fringe:
+            n = fringe.pop()
             
-            while self.fringe:
-                n = self.fringe.pop()
+            # Límit de la iteració actual
+            if n.depth >= depth:
+                cutoff = True
+            else:
+                expand_counter += 1
+                expand_node(n, expand_counter)
+                metrics.expanded += 1
+                # La iteració anterior ja havia expandit aquest node
+                if n.depth < depth - 1:
+                    metrics.reopened += 1
                 
-                if n.depth >= max_depth:
-                    cutoff = True
-                else:
-                    expand_counter += 1
-                    n.expand_order = expand_counter
-                    n.location = Node.Location.EXPANDED
-                    
-                    for s, a, c in sorted(
-                        self.problem.get_successors(n.state), key=lambda x: x[0]):
+                for s, a, c in sorted(
+                    self.problem.get_successors(n.state), key=lambda x: x[0]):
+                    child = n.depth + 1
+                    if child < len(path) and n is path[child - 1] and (
+                            path[child].state == s and path[child].action == a):
+                        ns = path[child]
+                    else:
                         ns = Node(s, a, cost=n.cost + c, parent=n)
+                    metrics.generated += 1
+                    if keep_tree:
                         n.add_successor(ns)
-                        
-                        if self.problem.is_goal_state(ns.state):
-                            return Solution(self.problem, roots, solution_node=ns, cutoff=cutoff)
-                        
-                        self.fringe.push(ns)
-            
-            if not cutoff:
-                return Solution(self.problem, roots, cutoff=False)
-            
-            depth += 1
\ No newline at end of file
+                    
+                    if self.problem.is_goal_state(ns.state):
+                        return roots, ns, cutoff
+                    
+                    fringe.push(ns)
+        
+        return roots, None, cutoff
+    
+    def solution(self, roots, depth, goal=None, cutoff=False):
+        """
+        Solution amb les arrels i el camí fins a `goal`. Si l'outputter
+        dibuixa l'arbre, es torna a fer l'última iteració guardant-lo.
+        """
+        path = []
+        if goal is not None:
+            link_path(goal)
+            path = goal.compute_path()
+        
+        def build_tree():
+            for parent, child in zip(path, path[1:]):
+                parent.remove_successor(child)
+            # La repetició no compta com a expansions ni a les mètriques
+            expanded = self.problem.num_expanded
+            counters = SimpleNamespace(expanded=0, generated=0, reopened=0)
+            self.search(depth, counters, roots, path)
+            self.problem._num_expanded = expanded
+        
+        return TreeSolution(self.problem, roots, build_tree, solution_node=goal, cutoff=cutoff)
@@ -0,0 +1,80 @@
+import math
+import os
+import random
+import sys
+
+from hlogedu.search.algorithm import Algorithm, Node
+from hlogedu.search.containers import Stack
+from hlogedu.search.exceptions import AlgorithmException
+
+# Els mòduls auxiliars (containers, nodestore, metrics) són al mateix directori
+ALGORITHMS_DIR = os.path.dirname(os.path.abspath(__file__))
+if ALGORITHMS_DIR not in sys.path:
+    sys.path.insert(0, ALGORITHMS_DIR)
+from localsearch import build_solution  # noqa: E402
+from metrics import SearchMetrics  # noqa: E402
+
+
+class SimulatedAnnealing(Algorithm):
+    """
+    Simulated annealing (cerca local)
+    A cada pas triem a l'atzar una reina en conflicte i una fila candidata.
+    Si el moviment no empitjora l'acceptem sempre; si empitjora en delta
+    conflictes l'acceptem amb probabilitat exp(-delta / T). La temperatura
+    comença a T0 i es refreda geomètricament fins a T_MIN.
+
+    max_depth limita el nombre de passos. La Solution conté el camí de
+    `move(queenId, boardPos)` des de l'estat inicial.
+    """
+    NAME = "my-local-annealing"
+
+    T0 = 2.0
+    COOLING = 0.999
+    T_MIN = 0.05
+    # Passos per reina si no ens donen max_depth
+    STEPS_PER_QUEEN = 200
+
+    def __init__(self, problem):
+        super().__init__(problem)
+        self.fringe = Stack()
+
+    def run(self, max_depth):
+        if not hasattr(self.problem, "conflict_board"):
+            raise AlgorithmException("Simulated annealing needs a problem with a conflict_board")
+
+        self.metrics = SearchMetrics(self)
+        rng = random.Random(getattr(self.problem, "seed", None))
+        roots = [Node(s) for s in self.problem.get_start_states()]
+        board = self.problem.conflict_board(roots[0].state)
+        if max_depth is None:
+            max_depth = self.STEPS_PER_QUEEN * board.size
+
+        moves = []
+        steps = 0
+        temperature = self.T0
+        while board.total_conflicts():
+            if steps >= max_depth:
+                return build_solution(self, roots, moves, steps, solved=False)
+            steps += 1
+
+            queen = board.pick_conflicted(rng)
+            if queen is None:
+                break  # Només queden conflictes entre reines que no es poden moure
+
+            # Una fila a l'atzar; la meitat de les vegades, una fila buida
+            empty = board.empty_rows
+            if empty and rng.random() < 0.5:
+                row = empty[int(rng.random() * len(empty))]
+            else:
+                row = int(rng.random() * board.size)
+            current = board.rows[queen]
+            if row != current:
+                delta = board.cost(queen, row) - board.cost(queen, current)
+                if delta <= 0 or rng.random() < math.exp(-delta / temperature):
+                    board.move(queen, row)
+                    moves.append((queen, row))
+            temperature = max(self.T_MIN, temperature * self.COOLING)
+
+        return build_solution(
+            self, roots, moves, steps, solved=not board.total_conflicts()
+        )
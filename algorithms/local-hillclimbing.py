@@ -0,0 +1,91 @@
+import os
+import random
+import sys
+
+from hlogedu.search.algorithm import Algorithm, Node
+from hlogedu.search.containers import Stack
+from hlogedu.search.exceptions import AlgorithmException
+
+# Els mòduls auxiliars (containers, nodestore, metrics) són al mateix directori
+ALGORITHMS_DIR = os.path.dirname(os.path.abspath(__file__))
+if ALGORITHMS_DIR not in sys.path:
+    sys.path.insert(0, ALGORITHMS_DIR)
+from localsearch import build_solution  # noqa: E402
+from metrics import SearchMetrics  # noqa: E402
+
+
+class RestartHillClimbing(Algorithm):
+    """
+    Hill climbing amb reinicis (cerca local)
+    A cada pas triem a l'atzar una reina en conflicte i la movem a la
+    millor fila (sense comptar la que ja té), desempatant a l'atzar. Només
+    acceptem moviments que no empitjoren; si fem PATIENCE passos seguits
+    (o n, si el tauler és més gran) sense millorar el total de conflictes,
+    tornem a començar des de l'estat inicial amb noves eleccions
+    aleatòries.
+
+    max_depth limita el nombre total de passos (comptant tots els
+    reinicis). La Solution conté el camí de l'últim intent.
+    """
+    NAME = "my-local-hillclimbing"
+
+    # Files avaluades per pas quan el tauler és gran
+    SAMPLE = 32
+    # Passos per reina si no ens donen max_depth
+    STEPS_PER_QUEEN = 100
+    # Passos sense millorar abans de reiniciar (com a mínim, una mida de tauler)
+    PATIENCE = 50
+
+    def __init__(self, problem):
+        super().__init__(problem)
+        self.fringe = Stack()
+
+    def run(self, max_depth):
+        if not hasattr(self.problem, "conflict_board"):
+            raise AlgorithmException("Hill climbing needs a problem with a conflict_board")
+
+        self.metrics = SearchMetrics(self)
+        rng = random.Random(getattr(self.problem, "seed", None))
+        roots = [Node(s) for s in self.problem.get_start_states()]
+        size = len(self.problem.decode(roots[0].state))
+        if max_depth is None:
+            max_depth = self.STEPS_PER_QUEEN * size
+        sampled = size > 2 * self.SAMPLE
+        patience = max(self.PATIENCE, size)
+
+        steps = 0
+        while True:
+            board = self.problem.conflict_board(roots[0].state)
+            moves = []
+            best_total = board.total_conflicts()
+            stuck = 0
+            while board.total_conflicts() and stuck < patience:
+                if steps >= max_depth:
+                    return build_solution(self, roots, moves, steps, solved=False)
+                steps += 1
+
+                queen = board.pick_conflicted(rng)
+                if queen is None:
+                    # Només queden conflictes entre reines que no es poden moure
+                    return build_solution(self, roots, moves, steps, solved=False)
+
+                # Per taulers grans la mostra ja és aleatòria: la primera
+                # fila lliure serveix
+                best_cost, best_rows = board.best_rows(
+                    queen, board.candidate_rows(rng, self.SAMPLE), first_free=sampled
+                )
+
+                # Moviments laterals permesos: ajuden a sortir dels altiplans
+                if best_rows and best_cost <= board.cost(queen, board.rows[queen]):
+                    row = rng.choice(best_rows)
+                    board.move(queen, row)
+                    moves.append((queen, row))
+
+                if board.total_conflicts() < best_total:
+                    best_total = board.total_conflicts()
+                    stuck = 0
+                else:
+                    stuck += 1
+
+            if not board.total_conflicts():
+                return build_solution(self, roots, moves, steps, solved=True)
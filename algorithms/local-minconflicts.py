@@ -0,0 +1,86 @@
+import os
+import random
+import sys
+
+from hlogedu.search.algorithm import Algorithm, Node
+from hlogedu.search.containers import Stack
+from hlogedu.search.exceptions import AlgorithmException
+
+# Els mòduls auxiliars (containers, nodestore, metrics) són al mateix directori
+ALGORITHMS_DIR = os.path.dirname(os.path.abspath(__file__))
+if ALGORITHMS_DIR not in sys.path:
+    sys.path.insert(0, ALGORITHMS_DIR)
+from localsearch import build_solution  # noqa: E402
+from metrics import SearchMetrics  # noqa: E402
+
+
+class MinConflicts(Algorithm):
+    """
+    Min-conflicts (cerca local)
+    A cada pas triem a l'atzar una reina en conflicte i la movem a la fila
+    on tindria menys conflictes, desempatant a l'atzar. Amb probabilitat
+    NOISE la movem a una fila aleatòria, per no quedar atrapats en cicles.
+    Per taulers grans només avaluem una mostra de files (incloent-hi files
+    buides) i parem a la primera sense conflictes.
+
+    Els conflictes es mantenen amb el `ConflictBoard` del problema (O(1)
+    per moviment). max_depth limita el nombre de passos, i la llavor és la
+    del problema, així els resultats són reproduïbles.
+
+    La Solution conté el camí de `move(queenId, boardPos)` des de l'estat
+    inicial; no hi ha fringe.
+    """
+    NAME = "my-local-minconflicts"
+
+    # Files avaluades per pas quan el tauler és gran
+    SAMPLE = 32
+    # Passos per reina si no ens donen max_depth
+    STEPS_PER_QUEEN = 100
+    # Probabilitat d'un pas aleatori
+    NOISE = 0.05
+
+    def __init__(self, problem):
+        super().__init__(problem)
+        self.fringe = Stack()
+
+    def run(self, max_depth):
+        if not hasattr(self.problem, "conflict_board"):
+            raise AlgorithmException("Min-conflicts needs a problem with a conflict_board")
+
+        self.metrics = SearchMetrics(self)
+        rng = random.Random(getattr(self.problem, "seed", None))
+        roots = [Node(s) for s in self.problem.get_start_states()]
+        board = self.problem.conflict_board(roots[0].state)
+        if max_depth is None:
+            max_depth = self.STEPS_PER_QUEEN * board.size
+        sampled = board.size > 2 * self.SAMPLE
+
+        moves = []
+        steps = 0
+        while board.total_conflicts():
+            if steps >= max_depth:
+                return build_solution(self, roots, moves, steps, solved=False)
+            steps += 1
+
+            queen = board.pick_conflicted(rng)
+            if queen is None:
+                break  # Només queden conflictes entre reines que no es poden moure
+
+            current = board.rows[queen]
+            if rng.random() < self.NOISE:
+                # Pas aleatori de tant en tant per sortir dels cicles
+                row = int(rng.random() * (board.size - 1))
+                row += row >= current
+            else:
+                # Per taulers grans la mostra ja és aleatòria: la primera
+                # fila lliure serveix
+                _, rows = board.best_rows(
+                    queen, board.candidate_rows(rng, self.SAMPLE), first_free=sampled
+                )
+                row = rng.choice(rows)
+            board.move(queen, row)
+            moves.append((queen, row))
+
+        return build_solution(
+            self, roots, moves, steps, solved=not board.total_conflicts()
+        )
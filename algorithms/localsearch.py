@@ -0,0 +1,29 @@
+from hlogedu.search.algorithm import Node, Solution
+
+
+def build_solution(algorithm, roots, moves, steps, solved):
+    """
+    Solution d'una cerca local sobre un problema amb `conflict_board`.
+
+    `moves` és la llista de moviments `(queenId, boardPos)` des de l'estat
+    inicial i `steps` els passos fets (compten com a expansions). Si no
+    hem arribat a l'objectiu la Solution no té camí. Els estats del camí
+    venen de `problem.path_states`, que no copia el tauler a cada pas.
+    """
+    problem, metrics = algorithm.problem, algorithm.metrics
+    problem.count_expanded(steps)
+    metrics.expanded = steps
+    metrics.generated = len(moves)
+    if not solved:
+        return metrics.finish(
+            Solution(problem, roots, cutoff=steps > 0), algorithm.fringe
+        )
+
+    n = roots[0]
+    n.expanded_order = 1
+    n.location = Node.Location.EXPANDED
+    for (queen, row), state in zip(moves, problem.path_states(n.state, moves)):
+        ns = Node(state, f"move({queen},{row})", cost=n.cost + 1, parent=n)
+        n.add_successor(ns)
+        n = ns
+    return metrics.finish(Solution(problem, roots, solution_node=n), algorithm.fringe)
@@ -0,0 +1,132 @@
+import csv
+import json
+import time
+import tracemalloc
+
+from heuristic_cache import cached_heuristic
+from profiling import instrument
+
+
+class SearchMetrics:
+    """
+    Mètriques d'una execució d'un algorisme.
+
+    Cada algorisme en crea una al començar `run`, hi va sumant els
+    comptadors i la penja a la Solution amb `finish` (`solution.metrics`):
+
+        generated        nodes creats (successors afegits a l'arbre)
+        expanded         nodes expandits per l'algorisme
+        reopened         nodes tornats a expandir o a generar (iteracions
+                         d'IDS/IDA*, fills oblidats de SMA*)
+        duplicates       successors o entrades de la fringe descartats perquè
+                         l'estat ja s'havia expandit o tenia un camí millor
+        heuristic_calls  crides a l'heurística
+        cache_hits       encerts, fallades i expulsions de la memòria cau de
+        cache_misses     l'heurística (HLOG_HEURISTIC_CACHE, veure
+        cache_evictions  heuristic_cache.py); None si no n'hi ha
+        max_fringe       mida màxima de la fringe
+        time             temps de paret de `run`, en segons
+        memory           pic de memòria de tracemalloc durant `run`, en bytes
+
+    tracemalloc alenteix molt la cerca, així que només mesurem la memòria
+    si ja està activat (`python -X tracemalloc`, PYTHONTRACEMALLOC=1 o
+    `benchmark.py --trace-memory`); si no, `memory` és None.
+
+    Si el problema treballa amb macro-accions (p.ex. Pacman amb
+    `graph=corridors`), `finish` també desplega el camí de la solució amb
+    `problem.expand_solution`, ja que és la sortida comuna dels algorismes.
+
+    Amb HLOG_PROFILE, a més, `profile` és el `Profiler` de l'execució
+    (veure profiling.py); si no, és None i no es cronometra res.
+    """
+
+    FIELDS = (
+        "algorithm", "problem", "generated", "expanded", "reopened",
+        "duplicates", "heuristic_calls", "cache_hits", "cache_misses",
+        "cache_evictions", "max_fringe", "time", "memory",
+    )
+
+    def __init__(self, algorithm):
+        self.algorithm = algorithm.NAME
+        self.problem = algorithm.problem.get_name()
+        self.generated = 0
+        self.expanded = 0
+        self.reopened = 0
+        self.duplicates = 0
+        self.heuristic_calls = 0
+        self.cache = None
+        self.max_fringe = 0
+        self.time = None
+        self.memory = None
+
+        self.profile = instrument(algorithm)
+        self._expand_solution = getattr(algorithm.problem, "expand_solution", None)
+
+        self._tracing = tracemalloc.is_tracing()
+        if self._tracing:
+            tracemalloc.reset_peak()
+        self._start = time.perf_counter()
+
+    def heuristic(self, heuristic):
+        """L'heurística, comptant-ne les crides (i amb memòria cau si cal)."""
+        if self.profile is not None:
+            heuristic = self.profile.wrap("heuristic", heuristic)
+        cache = cached_heuristic(heuristic)
+        if cache is not None:
+            self.cache = cache
+            heuristic = cache
+
+        def counted(state):
+            self.heuristic_calls += 1
+            return heuristic(state)
+        return counted
+
+    def finish(self, solution, *fringes):
+        """Tanca les mesures, les penja a la Solution i la retorna."""
+        self.time = time.perf_counter() - self._start
+        if self._tracing:
+            self.memory = tracemalloc.get_traced_memory()[1]
+        self.max_fringe = max(
+            (getattr(fringe, "max_size", 0) for fringe in fringes), default=0
+        )
+        if self.profile is not None:
+            self.profile.finish(self)
+        if self._expand_solution is not None:
+            # L'outputter `stream` escriu l'arbre de la cerca, amb macro-accions
+            store = getattr(solution, "store", None)
+            goal = getattr(solution, "goal", None)
+            solution = self._expand_solution(solution)
+            if store is not None:
+                solution.store, solution.goal = store, goal
+        solution.metrics = self
+        return solution
+
+    @property
+    def cache_hits(self):
+        return self.cache.hits if self.cache is not None else None
+
+    @property
+    def cache_misses(self):
+        return self.cache.misses if self.cache is not None else None
+
+    @property
+    def cache_evictions(self):
+        return self.cache.evictions if self.cache is not None else None
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def to_json(self):
+        return json.dumps(self.as_dict())
+
+    @classmethod
+    def write_csv(cls, file, metrics):
+        """Escriu una fila per cada SearchMetrics (amb capçalera)."""
+        writer = csv.DictWriter(file, fieldnames=cls.FIELDS)
+        writer.writeheader()
+        for m in metrics:
+            writer.writerow(m.as_dict())
+
+    def __repr__(self):
+        values = ", ".join(f"{k}={v}" for k, v in self.as_dict().items())
+        return f"SearchMetrics({values})"
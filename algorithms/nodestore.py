@@ -0,0 +1,207 @@
+from array import array
+
+from hlogedu.search.algorithm import Node, Solution
+
+
+def search_tree():
+    """
+    Arbre de cerca compacte (`NodeStore`). L'arbre de `Node` sencer només
+    es construeix si algú en demana les arrels, és a dir, si l'outputter
+    el dibuixa (veure `TreeSolution`).
+    """
+    return NodeStore()
+
+
+def link_path(n):
+    """
+    Enllaça amb `add_successor` el camí de l'arrel fins a `n`, per als
+    algorismes que només han guardat l'enllaç al pare.
+    """
+    path = []
+    while n is not None:
+        path.append(n)
+        n = n.parent
+    path.reverse()
+    for order, (parent, child) in enumerate(zip(path, path[1:]), start=1):
+        expand_node(parent, order)
+        parent.add_successor(child)
+
+
+def expand_node(n, order):
+    """
+    Marca `n` com a expandit, el número `order`, si encara no ho estava
+    (la llibreria no deixa canviar `expanded_order`).
+    """
+    if n.expanded_order < 0:
+        n.expanded_order = order
+    n.location = Node.Location.EXPANDED
+
+
+class TreeSolution(Solution):
+    """
+    Solution que completa l'arbre de cerca quan se'n llegeixen les arrels.
+
+    Els algorismes només guarden els enllaços al pare i creen els `Node`
+    del camí de la solució; `build_tree` afegeix la resta de nodes a les
+    mateixes arrels i el mateix camí. hlogedu-search només llegeix
+    `root_nodes` amb els outputters que dibuixen l'arbre (dot, graphviz),
+    així la resta no paguen mai l'arbre sencer.
+    """
+
+    def __init__(self, problem, root_nodes, build_tree, solution_node=None, cutoff=False):
+        super().__init__(problem, root_nodes, solution_node=solution_node, cutoff=cutoff)
+        self._build_tree = build_tree
+
+    @property
+    def root_nodes(self):
+        if self._build_tree is not None:
+            build_tree, self._build_tree = self._build_tree, None
+            build_tree()
+        return super().root_nodes
+
+
+class NodeStore:
+    """
+    Arbre de cerca compacte: només enllaços al pare.
+
+    Cada node és un índex a uns arrays paral·lels (estat, pare, g,
+    profunditat, acció i ordre d'expansió), sense `Node` ni llistes de
+    fills. Les accions es guarden un cop a `actions` i cada node en té
+    l'índex. Només el camí de la solució es converteix en `Node` al final;
+    la resta, si cal dibuixar l'arbre (`TreeSolution`).
+    """
+
+    def __init__(self):
+        self.states = []
+        self.parents = array("l")  # -1 per les arrels
+        self.costs = array("d")
+        self.depths = array("l")
+        self.action_ids = array("l")  # -1 per les arrels
+        self.orders = array("l")  # -1 si no s'ha expandit
+        self.actions = []
+        self.action_index = {}
+        self.roots = []
+
+    def __len__(self):
+        return len(self.states)
+
+    def add(self, state, action, cost, parent):
+        if action is None:
+            action_id = -1
+        else:
+            action_id = self.action_index.get(action)
+            if action_id is None:
+                action_id = self.action_index[action] = len(self.actions)
+                self.actions.append(action)
+        self.states.append(state)
+        self.parents.append(parent)
+        self.costs.append(cost)
+        self.depths.append(0 if parent < 0 else self.depths[parent] + 1)
+        self.action_ids.append(action_id)
+        self.orders.append(-1)
+        return len(self.states) - 1
+
+    def root(self, state):
+        i = self.add(state, None, 0, -1)
+        self.roots.append(i)
+        return i
+
+    def child(self, parent, state, action, cost):
+        return self.add(state, action, cost, parent)
+
+    def state(self, i):
+        return self.states[i]
+
+    def cost(self, i):
+        return self.costs[i]
+
+    def depth(self, i):
+        return self.depths[i]
+
+    def expand(self, i, order):
+        self.orders[i] = order
+
+    def action(self, i):
+        action_id = self.action_ids[i]
+        return self.actions[action_id] if action_id >= 0 else None
+
+    def node(self, i, parent=None):
+        """`Node` del node `i`, amb el seu ordre d'expansió."""
+        # Els costos són enters si les accions ho són
+        cost = self.costs[i]
+        if cost == int(cost):
+            cost = int(cost)
+        n = Node(self.states[i], self.action(i), cost=cost, parent=parent)
+        if self.orders[i] >= 0:
+            expand_node(n, self.orders[i])
+        return n
+
+    def path(self, i):
+        """Índexs des de l'arrel fins a `i`."""
+        path = []
+        while i >= 0:
+            path.append(i)
+            i = self.parents[i]
+        path.reverse()
+        return path
+
+    def solution(self, problem, i=None, cutoff=False):
+        """
+        Solution amb les arrels i el camí de la solució com a `Node`; la
+        resta de l'arbre es crea només si se'n llegeixen les arrels.
+        """
+        nodes = {r: self.node(r) for r in self.roots}
+        roots = list(nodes.values())
+        n = None
+        if i is not None:
+            path = self.path(i)
+            n = nodes[path[0]]
+            for j in path[1:]:
+                ns = nodes[j] = self.node(j, parent=n)
+                n.add_successor(ns)
+                n = ns
+        solution = TreeSolution(
+            problem, roots, lambda: self.build_tree(nodes), solution_node=n, cutoff=cutoff
+        )
+        # Per a l'outputter `stream` (veure `write_tree`)
+        solution.store, solution.goal = self, i
+        return solution
+
+    def build_tree(self, nodes):
+        """
+        Afegeix a `nodes` (índex -> `Node`, les arrels i el camí) la resta
+        de l'arbre, amb els fills en l'ordre en què es van generar.
+        """
+        parents = self.parents
+        # Els nodes del camí es tornen a penjar dels pares en el seu ordre
+        for i, n in nodes.items():
+            if parents[i] >= 0:
+                nodes[parents[i]].remove_successor(n)
+        for i in range(len(self.states)):
+            parent = parents[i]
+            if parent < 0:
+                continue
+            n = nodes.get(i)
+            if n is None:
+                n = nodes[i] = self.node(i, parent=nodes[parent])
+            nodes[parent].add_successor(n)
+
+    def write_tree(self, writer, goal=None, cutoff=False):
+        """
+        Escriu tot l'arbre i el camí fins a `goal` amb un `TreeWriter`
+        (outputter `stream`, veure treestream.py) i en retorna el resum.
+        """
+        writer.sample_nodes(self.parents)
+        for i, state in enumerate(self.states):
+            writer.node(i, self.parents[i], self.depths[i], self.costs[i], self.action(i), state)
+        expanded = sorted((order, i) for i, order in enumerate(self.orders) if order >= 0)
+        for order, i in expanded:
+            writer.expand(i, order)
+        path = [] if goal is None else self.path(goal)
+        return writer.finish(
+            [
+                (j, self.parents[j], self.depths[j], self.costs[j], self.action(j), self.states[j])
+                for j in path
+            ],
+            cutoff,
+        )
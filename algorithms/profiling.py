@@ -0,0 +1,219 @@
+import os
+import sys
+from time import perf_counter
+
+
+# Activem el perfilat amb variables d'entorn, perquè funcioni igual amb
+# `hlogedu-search` que amb `benchmark.py`:
+#
+#     HLOG_PROFILE=-                 taula per stderr
+#     HLOG_PROFILE=perf.txt          taula afegida al fitxer
+#     HLOG_PROFILE=perf.folded       piles "collapsed" per flamegraph.pl/speedscope
+#     HLOG_PROFILE_SAMPLE=10         només cronometra 1 de cada 10 crides
+PROFILE_ENV = "HLOG_PROFILE"
+SAMPLE_ENV = "HLOG_PROFILE_SAMPLE"
+
+
+def instrument(algorithm):
+    """
+    Profiler per aquesta execució de l'algorisme, o None si el perfilat
+    no està activat. Sense HLOG_PROFILE no s'embolcalla res: el cost és
+    només aquesta comprovació, un cop per `run`.
+    """
+    target = os.environ.get(PROFILE_ENV)
+    if not target:
+        return None
+    sample = max(1, int(os.environ.get(SAMPLE_ENV) or 1))
+    profiler = Profiler(algorithm.NAME, target, sample)
+
+    problem = algorithm.problem
+    profiler.patch(problem, "get_successors", materialize=True)
+    profiler.patch(problem, "get_predecessors", materialize=True)
+    profiler.patch(problem, "is_goal_state")
+    for a in actions(problem):
+        # La funció de l'acció, que és la que crida el despatx de la
+        # llibreria (`get_successors` de Problem) per cada paràmetre
+        profiler.patch(a, "_fn", phase=a.name)
+    for name, fringe in vars(algorithm).items():
+        if name.endswith("fringe"):
+            profiler.patch(fringe, "push", phase=f"{name}.push")
+            profiler.patch(fringe, "pop", phase=f"{name}.pop")
+    return profiler
+
+
+def actions(problem):
+    """
+    Objectes `Action` dels mètodes marcats amb `@action` (move, moveKiwi,
+    pour...). Són de la classe: `Profiler.unpatch` els deixa com eren.
+
+    Els problemes amb un `get_successors` propi que no crida les accions
+    (Pacman, kiwis-and-dogs) no en tindran cap crida.
+    """
+    found = getattr(type(problem), "__actions__", None) or ()
+    if isinstance(found, dict):
+        found = found.values()
+    return [a for a in found if isinstance(getattr(a, "name", None), str)]
+
+
+class Profiler:
+    """
+    Temps acumulat i nombre de crides de cada fase calenta d'una cerca.
+
+    Cada fase (get_successors, les accions, is_goal_state, l'heurística,
+    push/pop de la fringe) s'embolcalla amb `wrap`. Les crides sempre es
+    compten; el temps es guarda per pila de fases, així les accions que
+    crida `get_successors` surten a sota seu i en traiem el temps propi.
+
+    Amb mostreig (`sample` > 1) només cronometrem 1 de cada `sample`
+    crides de primer nivell de cada fase, amb tot el que facin a dins, i
+    escalem els temps de cada pila per les crides de primer nivell de la
+    seva fase. Cada fase té el seu comptador: amb un de sol, les fases que
+    s'alternen en un patró fix (pop, is_goal_state, get_successors...)
+    cauen sempre a la mateixa crida mostrejada. Si l'estimació de les fases
+    de primer nivell supera el temps de l'execució, l'ajustem a aquest
+    temps.
+    """
+
+    def __init__(self, name, target="-", sample=1):
+        self.name = name
+        self.target = target
+        self.sample = sample
+        self.calls = {}  # fase -> crides
+        self.times = {}  # pila de fases -> temps mesurat
+        self.stack = []  # None: dins d'una crida no cronometrada
+        self.outer = {}  # fase -> crides de primer nivell
+        self.timed = {}  # fase -> crides de primer nivell cronometrades
+        self.patched = []
+
+    def wrap(self, phase, fn, materialize=False):
+        calls, times, stack = self.calls, self.times, self.stack
+        outer, timed = self.outer, self.timed
+        calls.setdefault(phase, 0)
+        outer.setdefault(phase, 0)
+        timed.setdefault(phase, 0)
+
+        def profiled(*args, **kwargs):
+            calls[phase] += 1
+            if stack:
+                if stack[-1] is None:
+                    return fn(*args, **kwargs)
+            else:
+                outer[phase] += 1
+                # La primera crida de cada fase sempre es cronometra
+                if (outer[phase] - 1) % self.sample:
+                    stack.append(None)
+                    try:
+                        return fn(*args, **kwargs)
+                    finally:
+                        stack.pop()
+                timed[phase] += 1
+
+            stack.append(phase)
+            key = tuple(stack)
+            start = perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+                # Si és un generador, les accions s'executen en iterar-lo
+                return list(result) if materialize else result
+            finally:
+                times[key] = times.get(key, 0.0) + perf_counter() - start
+                stack.pop()
+
+        return profiled
+
+    def patch(self, obj, name, phase=None, materialize=False):
+        """Substitueix `obj.name` per la versió cronometrada (si es pot)."""
+        fn = getattr(obj, name, None)
+        if not callable(fn):
+            return
+        # Si l'atribut ja era de l'objecte (el `_fn` d'una acció), cal
+        # restaurar-lo; si venia de la classe, n'hi ha prou d'esborrar-lo
+        own = vars(obj).get(name) if hasattr(obj, "__dict__") else None
+        try:
+            setattr(obj, name, self.wrap(phase or name, fn, materialize))
+        except AttributeError:
+            return
+        self.patched.append((obj, name, own))
+
+    def unpatch(self):
+        for obj, name, own in reversed(self.patched):
+            if own is None:
+                delattr(obj, name)
+            else:
+                setattr(obj, name, own)
+        self.patched = []
+
+    def scaled_times(self, total=None):
+        """Temps estimat de cada pila, escalat per la fase de primer nivell.
+
+        Amb `total` (temps de l'execució), si la suma de les fases de
+        primer nivell el supera, ho reduïm tot en proporció.
+        """
+        scaled = {}
+        for key, t in self.times.items():
+            timed = self.timed[key[0]]
+            scaled[key] = t * self.outer[key[0]] / timed if timed else 0.0
+        top = sum(t for key, t in scaled.items() if len(key) == 1)
+        if total and top > total:
+            scaled = {key: t * total / top for key, t in scaled.items()}
+        return scaled
+
+    def self_times(self, total=None):
+        """Temps propi estimat de cada pila (sense el de les subfases)."""
+        scaled = self.scaled_times(total)
+        own = dict(scaled)
+        for key, t in scaled.items():
+            if len(key) > 1 and key[:-1] in own:
+                own[key[:-1]] -= t
+        return own
+
+    def as_dict(self, total=None):
+        """fase -> (crides, temps total, temps propi), en segons."""
+        phases = {phase: [calls, 0.0, 0.0] for phase, calls in self.calls.items()}
+        for key, t in self.scaled_times(total).items():
+            phases[key[-1]][1] += t
+        for key, t in self.self_times(total).items():
+            phases[key[-1]][2] += t
+        return {phase: tuple(values) for phase, values in phases.items()}
+
+    def finish(self, metrics):
+        """Desfà els embolcalls i escriu el resultat de l'execució."""
+        self.unpatch()
+        if self.target.endswith(".folded"):
+            report = self.folded(metrics.time)
+        else:
+            report = self.table(metrics)
+        if self.target == "-":
+            sys.stderr.write(report)
+        else:
+            # Un sol write per execució: els workers poden compartir fitxer
+            with open(self.target, "a") as f:
+                f.write(report)
+
+    def folded(self, total):
+        """Una línia `algorisme;fase;subfase microsegons` per pila."""
+        own = self.self_times(total)
+        lines = [f"{self.name} {round(max(total - sum(own.values()), 0) * 1e6)}"]
+        for key, t in sorted(own.items()):
+            lines.append(f"{self.name};{';'.join(key)} {round(max(t, 0) * 1e6)}")
+        return "\n".join(lines) + "\n"
+
+    def table(self, metrics):
+        total = metrics.time or 0.0
+        sampled = f", 1/{self.sample} crides cronometrades" if self.sample > 1 else ""
+        lines = [
+            f"# {metrics.algorithm} - {metrics.problem} ({total:.3f} s{sampled})",
+            f"{'fase':<24}{'crides':>12}{'total (s)':>12}{'propi (s)':>12}"
+            f"{'us/crida':>10}{'%':>7}",
+        ]
+        phases = sorted(self.as_dict(total).items(), key=lambda x: -x[1][1])
+        for phase, (calls, inclusive, own) in phases:
+            if not calls:
+                continue  # Accions que aquest problema no crida
+            per_call = inclusive / calls * 1e6 if calls else 0.0
+            share = 100 * inclusive / total if total else 0.0
+            lines.append(
+                f"{phase:<24}{calls:>12}{inclusive:>12.4f}{own:>12.4f}"
+                f"{per_call:>10.2f}{share:>7.1f}"
+            )
+        return "\n".join(lines) + "\n\n"
@@ -1,6 +1,16 @@
-from hlogedu.search.algorithm import Algorithm, Node, Solution
+import os
+import sys
+
+from hlogedu.search.algorithm import Algorithm
 from hlogedu.search.containers import PriorityQueue
 
+# Els mòduls auxiliars (containers, nodestore, metrics) són al mateix directori
+ALGORITHMS_DIR = os.path.dirname(os.path.abspath(__file__))
+if ALGORITHMS_DIR not in sys.path:
+    sys.path.insert(0, ALGORITHMS_DIR)
+from metrics import SearchMetrics  # noqa: E402
+from nodestore import search_tree  # noqa: E402
+
 
 class AStarTree(Algorithm):
     """
@@ -10,55 +20,61 @@ class AStarTree(Algorithm):
         h(n) es la estimació heuristica desde n fins l'objectiu
     
         La heuristica ha de ser admissible
+
+    Si l'outputter no dibuixa l'arbre, els nodes són registres compactes
+    amb l'enllaç al pare (veure nodestore.py)
     """
     NAME = "my-tree-astar"
     
     def __init__(self, problem):
         super().__init__(problem)
         self.fringe = PriorityQueue()
+        self.tree = search_tree()
     
     def run(self, heuristic):
-        expand_counter = 0
+        tree = self.tree
+        metrics = SearchMetrics(self)
+        heuristic = metrics.heuristic(heuristic)
         
         # Creem root nodes a partir dels estats inicials
-        roots = [Node(s) for s in self.problem.get_start_states()]
+        roots = [tree.root(s) for s in self.problem.get_start_states()]
         
         # Comprovem si root es un estat final i l'afegim a fringe
         for n in roots:
-            if self.problem.is_goal_state(n.state):
-                return Solution(self.problem, roots, solution_node=n)
+            if self.problem.is_goal_state(tree.state(n)):
+                return metrics.finish(tree.solution(self.problem, n), self.fringe)
             
             # f(n) = g(n) + h(n)
-            f_n = n.cost + heuristic(n.state)
+            f_n = tree.cost(n) + heuristic(tree.state(n))
             self.fringe.push(n, f_n)
         
         # search loop
         while self.fringe:
             n = self.fringe.pop()
+            state, cost = tree.state(n), tree.cost(n)
             
             # Expandim el node
-            expand_counter += 1
-            n.expand_order = expand_counter
-            n.location = Node.Location.EXPANDED
+            metrics.expanded += 1
+            tree.expand(n, metrics.expanded)
             
             # Goal test quan expanding
-            if self.problem.is_goal_state(n.state):
-                return Solution(self.problem, roots, solution_node=n)
+            if self.problem.is_goal_state(state):
+                return metrics.finish(tree.solution(self.problem, n), self.fringe)
             
             # Generem successors en ordre lexicografic
             for s, a, c in sorted(
-                self.problem.get_successors(n.state), key=lambda x: x[0]
+                self.problem.get_successors(state), key=lambda x: x[0]
             ):
-                ns = Node(s, a, cost=n.cost + c, parent=n)
-                n.add_successor(ns)
+                ns = tree.child(n, s, a, cost + c)
+                metrics.generated += 1
                 
                  # Comprovem si es estat final
-                if self.problem.is_goal_state(ns.state):
-                    return Solution(self.problem, roots, solution_node=ns)
+                if self.problem.is_goal_state(s):
+                    return metrics.finish(tree.solution(self.problem, ns), self.fringe)
                 
                 # f(ns) = g(ns) + h(ns)
-                f_ns = ns.cost + heuristic(ns.state)
+                f_ns = cost + c + heuristic(s)
                 self.fringe.push(ns, f_ns)
         
         # No hem trobat solucio
-        return Solution(self.problem, roots)
\ No newline at end of file
+        return metrics.finish(tree.solution(self.problem), self.fringe)
\ No newline at end of file
@@ -0,0 +1,127 @@
+import math
+import os
+import sys
+
+from hlogedu.search.algorithm import Algorithm, Node, Solution
+from hlogedu.search.containers import Stack
+
+# Els mòduls auxiliars (containers, nodestore, metrics) són al mateix directori
+ALGORITHMS_DIR = os.path.dirname(os.path.abspath(__file__))
+if ALGORITHMS_DIR not in sys.path:
+    sys.path.insert(0, ALGORITHMS_DIR)
+from metrics import SearchMetrics  # noqa: E402
+
+
+class IDAStar(Algorithm):
+    """
+    IDA* (Iterative Deepening A*)
+    Fem cerques en profunditat limitades per un llindar de f(n) = g(n) + h(n).
+    El primer llindar és h(inici); cada iteració el puja a la mínima f que
+    ha superat el llindar anterior. Amb una heurística admissible la primera
+    solució trobada és òptima.
+
+    No guardem l'arbre de cerca: la fringe només té el camí actual (amb els
+    successors pendents de cada nivell), així la memòria és O(profunditat).
+    Evitem cicles saltant els estats que ja són al camí actual.
+    """
+    NAME = "my-tree-idastar"
+
+    def __init__(self, problem):
+        super().__init__(problem)
+        self.fringe = Stack()
+
+    def run(self, heuristic):
+        self.metrics = metrics = SearchMetrics(self)
+        heuristic = metrics.heuristic(heuristic)
+        roots = [Node(s) for s in self.problem.get_start_states()]
+        for n in roots:
+            if self.problem.is_goal_state(n.state):
+                return metrics.finish(
+                    Solution(self.problem, roots, solution_node=n), self.fringe
+                )
+
+        threshold = min(heuristic(n.state) for n in roots)
+        previous = -math.inf
+        while True:
+            next_threshold = math.inf
+            for root in roots:
+                path, bound = self.bounded_search(
+                    root.state, threshold, previous, heuristic
+                )
+                if path is not None:
+                    return metrics.finish(
+                        self.build_solution(roots, root, path), self.fringe
+                    )
+                next_threshold = min(next_threshold, bound)
+
+            # Cap node ha superat el llindar: no hi ha solució
+            if next_threshold == math.inf:
+                return metrics.finish(Solution(self.problem, roots), self.fringe)
+            previous, threshold = threshold, next_threshold
+
+    def successors(self, state):
+        # Generem successors en ordre lexicografic
+        return iter(sorted(self.problem.get_successors(state), key=lambda x: x[0]))
+
+    def bounded_search(self, start, threshold, previous, heuristic):
+        """
+        DFS des de `start` sense passar de f(n) = threshold.
+        Retorna (camí, None) si troba un objectiu, o (None, mínima f que
+        ha superat el llindar). Els nodes amb f(n) <= previous (el llindar
+        anterior) ja es van expandir a la iteració anterior.
+        """
+        metrics = self.metrics
+        next_threshold = math.inf
+        on_path = {start}
+        # Cada entrada: (estat, acció, g(n), successors pendents)
+        self.fringe.push((start, None, 0, self.successors(start)))
+        metrics.expanded += 1
+        if previous > -math.inf:
+            metrics.reopened += 1
+
+        while self.fringe:
+            state, _, g, successors = self.fringe.peek()
+            for s, a, c in successors:
+                if s in on_path:
+                    metrics.duplicates += 1
+                    continue
+                metrics.generated += 1
+
+                # f(s) = g(s) + h(s)
+                f = g + c + heuristic(s)
+                if f > threshold:
+                    next_threshold = min(next_threshold, f)
+                    continue
+
+                if self.problem.is_goal_state(s):
+                    path = [(s, a, g + c)]
+                    while self.fringe:
+                        path.append(self.fringe.pop()[:3])
+                    path.reverse()
+                    return path, None
+
+                on_path.add(s)
+                self.fringe.push((s, a, g + c, self.successors(s)))
+                metrics.expanded += 1
+                if f <= previous:
+                    metrics.reopened += 1
+                break
+            else:
+                # Ja hem provat tots els successors: tornem enrere
+                self.fringe.pop()
+                on_path.discard(state)
+
+        return None, next_threshold
+
+    def build_solution(self, roots, root, path):
+        """Nodes del camí trobat, des de l'arrel fins a l'objectiu."""
+        n = root
+        n.expanded_order = 1
+        n.location = Node.Location.EXPANDED
+        for i, (s, a, g) in enumerate(path[1:]):
+            ns = Node(s, a, cost=g, parent=n)
+            n.add_successor(ns)
+            n = ns
+            n.expanded_order = i + 2
+            n.location = Node.Location.EXPANDED
+        return Solution(self.problem, roots, solution_node=n)
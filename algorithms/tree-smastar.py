@@ -0,0 +1,217 @@
+import math
+import os
+import sys
+
+from hlogedu.search.algorithm import Algorithm, Node, Solution
+from hlogedu.search.exceptions import AlgorithmException
+
+# Els mòduls auxiliars (containers, nodestore, metrics) són al mateix directori
+ALGORITHMS_DIR = os.path.dirname(os.path.abspath(__file__))
+if ALGORITHMS_DIR not in sys.path:
+    sys.path.insert(0, ALGORITHMS_DIR)
+from containers import IndexedPriorityQueue  # noqa: E402
+from metrics import SearchMetrics  # noqa: E402
+
+
+class SMANode:
+    """Node de SMA*. Només existeixen els que caben a memòria."""
+
+    __slots__ = (
+        "state", "action", "cost", "parent", "index", "depth", "f",
+        "successors", "next_successor", "children", "forgotten",
+    )
+
+    def __init__(self, state, action, cost, parent, index, f):
+        self.state = state
+        self.action = action
+        self.cost = cost
+        self.parent = parent
+        self.index = index  # Posició dins dels successors del pare
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.f = f
+        self.successors = None  # (s, a, c) ordenats, quan l'expandim
+        self.next_successor = 0  # Primer successor encara no generat
+        self.children = {}  # índex -> fill a memòria
+        self.forgotten = {}  # índex -> f dels fills esborrats
+
+    def is_open(self):
+        """Encara pot generar (o regenerar) algun successor."""
+        return (
+            self.successors is None
+            or self.next_successor < len(self.successors)
+            or bool(self.forgotten)
+        )
+
+    def is_generated(self):
+        """Ja hem generat tots els successors almenys un cop."""
+        return self.successors is not None and self.next_successor == len(
+            self.successors
+        )
+
+
+class SMAStar(Algorithm):
+    """
+    SMA* (Simplified Memory-bounded A*)
+    Com A* amb f(n) = g(n) + h(n), però amb com a molt MAX_NODES nodes a
+    memòria. Generem els successors d'un en un, del node més profund
+    amb menys f. Quan la memòria s'omple esborrem la fulla menys
+    profunda amb més f, i el pare recorda la seva f per regenerar-la si
+    torna a ser la millor opció.
+
+    Quan un node ha generat tots els seus successors, la seva f passa a
+    ser la mínima dels fills (i es propaga cap amunt). No creem nodes
+    per a estats que ja són a memòria amb un cost igual o menor. Amb una heurística
+    admissible la solució és òptima si el camí òptim cap en MAX_NODES
+    nodes.
+    """
+    NAME = "my-tree-smastar"
+
+    # Nodes que caben a memòria
+    MAX_NODES = 50000
+
+    def __init__(self, problem):
+        super().__init__(problem)
+        # Nodes oberts, el més profund amb menys f primer
+        self.fringe = IndexedPriorityQueue(index=lambda n: n)
+        # Fulles que podem esborrar, la menys profunda amb més f primer
+        self.leaves = IndexedPriorityQueue(index=lambda n: n)
+
+    def run(self, heuristic):
+        if self.MAX_NODES < 2:
+            raise AlgorithmException("SMA* needs room for at least two nodes")
+
+        metrics = SearchMetrics(self)
+        heuristic = metrics.heuristic(heuristic)
+        roots = [Node(s) for s in self.problem.get_start_states()]
+        for n in roots:
+            if self.problem.is_goal_state(n.state):
+                return metrics.finish(
+                    Solution(self.problem, roots, solution_node=n), self.fringe
+                )
+
+        # Estat -> node a memòria amb menys g, per podar duplicats
+        self.in_memory = {}
+        memory = 0
+        for n in roots:
+            node = SMANode(n.state, None, 0, None, None, heuristic(n.state))
+            self.in_memory[n.state] = node
+            self.requeue(node)
+            memory += 1
+
+        # search loop
+        while self.fringe:
+            n = self.fringe.peek()
+            if n.f == math.inf:
+                break
+
+            # Goal test quan el seleccionem, com A*
+            if self.problem.is_goal_state(n.state):
+                return metrics.finish(self.build_solution(roots, n), self.fringe)
+
+            if n.successors is None:
+                metrics.expanded += 1
+                # Generem successors en ordre lexicografic
+                n.successors = sorted(
+                    self.problem.get_successors(n.state), key=lambda x: x[0]
+                )
+
+            if n.next_successor < len(n.successors):
+                i = n.next_successor
+                n.next_successor += 1
+                s, a, c = n.successors[i]
+                f = max(n.f, n.cost + c + heuristic(s))
+            elif n.forgotten:
+                # Regenerem el fill esborrat amb menys f
+                i = min(n.forgotten, key=n.forgotten.get)
+                f = n.forgotten.pop(i)
+                s, a, c = n.successors[i]
+                metrics.reopened += 1
+            else:
+                # Sense successors: f infinita
+                self.requeue(n)
+                self.backup(n)
+                continue
+
+            # Si l'estat ja és a memòria amb un camí igual o millor (també
+            # si és un avantpassat) no cal un altre node: el podem ignorar
+            other = self.in_memory.get(s)
+            if other is not None and other.cost <= n.cost + c:
+                metrics.duplicates += 1
+                self.requeue(n)
+                if n.is_generated():
+                    self.backup(n)
+                continue
+
+            child = SMANode(s, a, n.cost + c, n, i, f)
+            metrics.generated += 1
+            # Un camí més llarg que la memòria no pot arribar a l'objectiu
+            if child.depth >= self.MAX_NODES - 1 and not self.problem.is_goal_state(s):
+                child.f = math.inf
+            n.children[i] = child
+            self.in_memory[s] = child
+            memory += 1
+            self.requeue(n)
+            self.requeue(child)
+            if n.is_generated():
+                self.backup(n)
+
+            while memory > self.MAX_NODES:
+                self.forget(self.leaves.pop())
+                memory -= 1
+
+        # No hem trobat solucio
+        return metrics.finish(Solution(self.problem, roots), self.fringe)
+
+    def requeue(self, node):
+        """Posa el node a les cues que li toquen amb la f actual."""
+        self.fringe.discard(node)
+        self.leaves.discard(node)
+        if node.is_open():
+            self.fringe.push(node, (node.f, -node.depth))
+        if not node.children and node.parent is not None:
+            self.leaves.push(node, (-node.f, node.depth))
+
+    def backup(self, node):
+        """La f d'un node generat és la mínima dels seus fills."""
+        while node is not None and node.is_generated():
+            values = [child.f for child in node.children.values()]
+            values.extend(node.forgotten.values())
+            f = min(values, default=math.inf)
+            if f == node.f:
+                break
+            node.f = f
+            self.requeue(node)
+            node = node.parent
+
+    def forget(self, leaf):
+        """Esborra una fulla; el pare en recorda la f."""
+        parent = leaf.parent
+        self.fringe.discard(leaf)
+        del parent.children[leaf.index]
+        if self.in_memory.get(leaf.state) is leaf:
+            del self.in_memory[leaf.state]
+        # Un fill amb f infinita no cal regenerar-lo mai
+        if leaf.f != math.inf:
+            parent.forgotten[leaf.index] = leaf.f
+        self.requeue(parent)
+        self.backup(parent)
+
+    def build_solution(self, roots, goal):
+        """Nodes del camí trobat, des de l'arrel fins a l'objectiu."""
+        path = []
+        node = goal
+        while node is not None:
+            path.append(node)
+            node = node.parent
+        path.reverse()
+
+        n = next(root for root in roots if root.state == path[0].state)
+        n.expanded_order = 1
+        n.location = Node.Location.EXPANDED
+        for i, node in enumerate(path[1:]):
+            ns = Node(node.state, node.action, cost=node.cost, parent=n)
+            n.add_successor(ns)
+            n = ns
+            n.expanded_order = i + 2
+            n.location = Node.Location.EXPANDED
+        return Solution(self.problem, roots, solution_node=n)
@@ -0,0 +1,403 @@
+import json
+import sys
+from collections import defaultdict
+
+from hlogedu.search.common import ClassParameter
+from hlogedu.search.search import SolutionOutputter
+
+
+# Outputter que escriu l'arbre de cerca a disc, en lloc de construir-lo
+# sencer amb `Node` en memòria com "dot"/"graphviz":
+#
+#     hlogedu-search run ... -o stream -op file=tree.jsonl -op max_nodes=100000
+#
+# i després, fora de línia, se'n dibuixa un tros:
+#
+#     python algorithms/treestream.py render tree.jsonl -o tree.dot --depth 6
+STREAM_OUTPUTTER = "stream"
+STREAM_DEFAULTS = {
+    "file": "tree.jsonl",
+    "max_nodes": 1_000_000,  # nodes escrits com a molt (-1: sense límit)
+    "max_depth": -1,  # profunditat màxima dels nodes escrits (-1: sense límit)
+    "sample": 1,  # escriu 1 de cada `sample` nodes (més els seus avantpassats i el camí)
+}
+
+# Format del fitxer (una línia JSON per registre, llistes per ocupar poc):
+#
+#     {"format": "hlog-tree", "version": 1, ...}    capçalera
+#     ["n", id, pare, profunditat, g, acció, estat]  node generat (pare -1: arrel)
+#     ["e", id, ordre]                               node expandit
+#     ["s", id, id, ...]                             camí de la solució
+#     ["end", {...}]                                 resum (nodes escrits/descartats)
+FORMAT_VERSION = 1
+
+dumps = json.JSONEncoder(ensure_ascii=False).encode
+
+
+def normalize_params(params):
+    params = {**STREAM_DEFAULTS, **{k: v for k, v in params.items() if v is not None}}
+    return {
+        "file": str(params["file"]),
+        "max_nodes": int(params["max_nodes"]),
+        "max_depth": int(params["max_depth"]),
+        "sample": max(1, int(params["sample"])),
+    }
+
+
+class TreeWriter:
+    """
+    Escriu els nodes de l'arbre de cerca, en ordre d'id.
+
+    Els ids han de ser consecutius (0, 1, 2...), com els de `NodeStore`,
+    i cada pare ha de tenir un id més petit que els fills: així només cal
+    un byte per node (`status`) per saber si s'ha escrit o per què no.
+    Els nodes que passen de `max_depth`, els que arriben un cop escrits
+    `max_nodes` i els que descarta el mostreig no s'escriuen, però es
+    compten, i tampoc els seus descendents: tot node escrit té el pare
+    escrit. El camí de la solució s'escriu sempre sencer a `finish`: els
+    seus nodes descartats passen a comptar com a escrits, i els que no
+    s'havien vist mai com a nodes escrits, així `written` més els
+    descartats sempre suma `nodes`.
+    """
+
+    # Comptador de cada node segons el seu `status` (0: encara no vist):
+    # escrit o el motiu pel qual s'ha descartat
+    STATUSES = (None, "written", "over_depth", "over_max_nodes", "sampled_out")
+
+    def __init__(self, file=STREAM_DEFAULTS["file"], max_nodes=-1, max_depth=-1, sample=1):
+        self.file = file
+        self.max_nodes = max_nodes
+        self.max_depth = max_depth
+        self.sample = sample
+        # Mostreig determinista per id (hash multiplicatiu de Knuth)
+        self.threshold = 2**32 // sample
+        self.sampled = None  # per node, si el mostreig l'escriu
+        self.status = bytearray()  # per node, índex a STATUSES
+        self.counts = dict.fromkeys(("nodes", "expanded") + self.STATUSES[1:], 0)
+        self.fh = open(file, "w", encoding="utf-8", buffering=1 << 20)
+        self.write({
+            "format": "hlog-tree",
+            "version": FORMAT_VERSION,
+            "max_nodes": max_nodes,
+            "max_depth": max_depth,
+            "sample": sample,
+        })
+
+    def write(self, record):
+        self.fh.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    def record(self, i, parent, depth, cost, action, state):
+        if cost == int(cost):
+            cost = int(cost)
+        # Formatat a mà: és la línia més freqüent i json.dumps de la llista
+        # sencera en duplica el cost
+        self.fh.write(
+            f'["n",{i},{parent},{depth},{cost},{dumps(action)},{dumps(repr(state))}]\n'
+        )
+        self.set_status(i, 1)
+
+    def set_status(self, i, status):
+        """Compta el node `i` a STATUSES[status] (i el descompta d'on
+        comptava, si ja s'havia vist)."""
+        counts, statuses = self.counts, self.STATUSES
+        while len(self.status) <= i:
+            self.status.append(0)
+            counts["nodes"] += 1
+        if self.status[i]:
+            counts[statuses[self.status[i]]] -= 1
+        self.status[i] = status
+        counts[statuses[status]] += 1
+
+    def sample_nodes(self, parents):
+        """
+        Tria els nodes que escriu el mostreig, donats els pares de tots:
+        1 de cada `sample` per hash de l'id, les arrels i els avantpassats
+        dels triats, perquè cap node quedi penjant d'un pare no escrit.
+        """
+        if self.sample == 1:
+            return
+        sampled = bytearray(len(parents))
+        for i, parent in enumerate(parents):
+            if parent < 0 or (i * 2654435761) % 2**32 < self.threshold:
+                sampled[i] = 1
+        # Els pares tenen ids més petits: n'hi ha prou amb una passada enrere
+        for i in range(len(parents) - 1, -1, -1):
+            if sampled[i] and parents[i] >= 0:
+                sampled[parents[i]] = 1
+        self.sampled = sampled
+
+    def node(self, i, parent, depth, cost, action, state):
+        counts = self.counts
+        if parent >= 0 and self.status[parent] != 1:
+            # Un node descartat s'emporta tot el seu subarbre
+            self.set_status(i, self.status[parent])
+        elif 0 <= self.max_depth < depth:
+            self.set_status(i, 2)
+        elif 0 <= self.max_nodes <= counts["written"]:
+            self.set_status(i, 3)
+        elif self.sampled is not None and not self.sampled[i]:
+            self.set_status(i, 4)
+        else:
+            self.record(i, parent, depth, cost, action, state)
+
+    def expand(self, i, order):
+        if self.status[i] == 1:
+            self.fh.write(f'["e",{i},{order}]\n')
+            self.counts["expanded"] += 1
+
+    def finish(self, path=(), cutoff=False):
+        """
+        Escriu el camí de la solució, com a tuples (id, pare, profunditat,
+        g, acció, estat), i el resum. Retorna el resum.
+        """
+        for i, parent, depth, cost, action, state in path:
+            if i >= len(self.status) or self.status[i] != 1:
+                self.record(i, parent, depth, cost, action, state)
+        if path:
+            self.write(["s", *(node[0] for node in path)])
+        summary = {"file": self.file, "cutoff": cutoff, "solution_length": max(len(path) - 1, 0)}
+        summary.update(self.counts)
+        self.write(["end", summary])
+        self.fh.close()
+        return summary
+
+
+def stream_solution(solution, writer):
+    """
+    Escriu l'arbre de `Node` d'una Solution (algorismes que no fan servir
+    `search_tree`) amb un recorregut en amplada, i el camí de la solució.
+    """
+    ids = {}
+    queue = []
+    for root in solution.root_nodes:
+        ids[id(root)] = len(ids)
+        queue.append((root, -1, 0))
+
+    # Els ids s'assignen en l'ordre del recorregut, com espera TreeWriter
+    for n, parent, depth in queue:
+        for child in n.successors:
+            if id(child) not in ids:
+                ids[id(child)] = len(ids)
+                queue.append((child, ids[id(n)], depth + 1))
+    writer.sample_nodes([parent for _, parent, _ in queue])
+
+    expanded = []
+    for i, (n, parent, depth) in enumerate(queue):
+        writer.node(i, parent, depth, n.cost, n.action, n.state)
+        # `expanded_order` és -1 si no s'ha expandit
+        if n.expanded_order >= 0:
+            expanded.append((i, n.expanded_order))
+    for i, order in sorted(expanded, key=lambda x: x[1]):
+        writer.expand(i, order)
+
+    path = []
+    n = solution.solution_node
+    while n is not None:
+        path.append(n)
+        n = n.parent
+    path.reverse()
+    # Un camí enllaçat només amb `parent` pot no ser a l'arbre recorregut:
+    # els nodes nous hi tenen els ids següents i `finish` els compta
+    records = []
+    for depth, n in enumerate(path):
+        if id(n) not in ids:
+            ids[id(n)] = len(ids)
+        parent = records[-1][0] if records else -1
+        records.append((ids[id(n)], parent, depth, n.cost, n.action, n.state))
+    return writer.finish(records, solution.has_been_cutoff())
+
+
+class TreeStreamOutputter(SolutionOutputter):
+    """
+    Outputter `stream`: l'arbre de cerca en JSON lines, amb límits de
+    nodes i profunditat i mostreig opcional.
+
+    Dels algorismes que fan servir `search_tree` (nodestore.py) escriu
+    directament els arrays compactes, sense crear cap `Node`. Per a la
+    resta, recorre l'arbre de `Node` de la Solution.
+    """
+    PARAMS = [
+        ClassParameter(
+            name="file", type=str, default=STREAM_DEFAULTS["file"],
+            help="Output file (JSON lines).",
+        ),
+        ClassParameter(
+            name="max_nodes", type=int, default=str(STREAM_DEFAULTS["max_nodes"]),
+            help="Maximum number of nodes written (-1: no limit).",
+        ),
+        ClassParameter(
+            name="max_depth", type=int, default=str(STREAM_DEFAULTS["max_depth"]),
+            help="Deepest nodes written (-1: no limit).",
+        ),
+        ClassParameter(
+            name="sample", type=int, default=str(STREAM_DEFAULTS["sample"]),
+            help="Write one in every N nodes (roots and the solution path always).",
+        ),
+    ]
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.params = normalize_params(kwargs)
+
+    def output(self, solution):
+        writer = TreeWriter(**self.params)
+        store = getattr(solution, "store", None)
+        if store is not None:
+            summary = store.write_tree(writer, solution.goal, solution.has_been_cutoff())
+        else:
+            summary = stream_solution(solution, writer)
+
+        dropped = summary["over_depth"] + summary["over_max_nodes"] + summary["sampled_out"]
+        print(f"Search tree: {summary['written']} of {summary['nodes']} nodes written to {summary['file']}")
+        if dropped:
+            print(
+                f"  dropped {summary['over_depth']} over max_depth, "
+                f"{summary['over_max_nodes']} over max_nodes, "
+                f"{summary['sampled_out']} by sampling"
+            )
+        if summary["solution_length"]:
+            print(f"  solution path: {summary['solution_length']} actions")
+
+
+def register():
+    """Afegeix `stream` als outputters de hlogedu-search (-o stream)."""
+    try:
+        from hlogedu.search.outputters import REGISTRY
+    except ImportError:
+        return
+    if isinstance(REGISTRY, dict):
+        REGISTRY.setdefault(STREAM_OUTPUTTER, TreeStreamOutputter)
+
+
+register()
+
+
+# Lectura i dibuix fora de línia
+##############################################################################
+
+
+def read_tree(path):
+    """(nodes, expanded, solution, summary) d'un fitxer de l'outputter."""
+    nodes, expanded, solution, summary = {}, {}, [], None
+    with open(path, encoding="utf-8") as fh:
+        header = json.loads(fh.readline())
+        if header.get("format") != "hlog-tree":
+            raise ValueError(f"{path} is not a search tree stream")
+        for line in fh:
+            record = json.loads(line)
+            tag = record[0]
+            if tag == "n":
+                _, i, parent, depth, cost, action, state = record
+                nodes[i] = (parent, depth, cost, action, state)
+            elif tag == "e":
+                expanded[record[1]] = record[2]
+            elif tag == "s":
+                solution = record[1:]
+            elif tag == "end":
+                summary = record[1]
+    return nodes, expanded, solution, summary
+
+
+def select(nodes, solution, root=None, depth=None, limit=None, solution_only=False):
+    """
+    Ids a dibuixar: el subarbre de `root` (o de totes les arrels) fins a
+    `depth` nivells per sota, com a molt `limit` nodes en amplada, més el
+    camí de la solució. Amb `solution_only`, el camí i els seus fills.
+    """
+    children = defaultdict(list)
+    for i, (parent, *_) in nodes.items():
+        children[parent].append(i)
+
+    on_path = set(solution)
+    if solution_only:
+        selected = set(on_path)
+        for i in solution:
+            selected.update(children[i])
+        return selected
+
+    start = [root] if root is not None else children[-1]
+    base = nodes[root][1] if root is not None else 0
+    selected, queue = set(), list(start)
+    for i in queue:
+        if limit is not None and len(selected) >= limit:
+            break
+        selected.add(i)
+        if depth is None or nodes[i][1] - base < depth:
+            queue.extend(children[i])
+    return selected | (on_path if root is None else set())
+
+
+def to_dot(nodes, expanded, solution, selected):
+    """DOT del subconjunt: camí de la solució en vermell, expandits amb l'ordre."""
+    on_path = set(solution)
+    lines = ["digraph search_tree {", '  node [shape=box, fontsize=10];']
+    for i in sorted(selected):
+        parent, depth, cost, action, state = nodes[i]
+        label = f"{state}\\ng={cost}"
+        if i in expanded:
+            label += f" #{expanded[i]}"
+        attrs = [f'label="{label.replace(chr(34), chr(39))}"']
+        if i in on_path:
+            attrs.append('color="red"')
+        if i not in expanded:
+            attrs.append("style=dashed")
+        lines.append(f"  n{i} [{', '.join(attrs)}];")
+        if parent in selected:
+            edge = [f'label="{action}"']
+            if i in on_path and parent in on_path:
+                edge.append('color="red"')
+            lines.append(f"  n{parent} -> n{i} [{', '.join(edge)}];")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def stats(nodes, expanded, summary):
+    """Nodes escrits per profunditat i factor de ramificació mitjà."""
+    per_depth = defaultdict(int)
+    with_children = set()
+    for parent, depth, *_ in nodes.values():
+        per_depth[depth] += 1
+        with_children.add(parent)
+    lines = [
+        f"{len(nodes)} nodes written, {len(expanded)} expanded"
+        + (f" (of {summary['nodes']} generated)" if summary else " (stream not finished)"),
+    ]
+    parents = len(with_children - {-1})
+    if parents:
+        lines.append(f"mean branching: {(len(nodes) - per_depth[0]) / parents:.2f}")
+    lines.append("depth  nodes")
+    lines += [f"{d:>5}  {per_depth[d]}" for d in sorted(per_depth)]
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect or render a streamed search tree.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    render = sub.add_parser("render", help="Write a subset of the tree as a DOT file.")
+    render.add_argument("tree", help="File written by the stream outputter.")
+    render.add_argument("-o", "--output", default="-", help="DOT file (default: stdout).")
+    render.add_argument("--root", type=int, help="Id of the subtree root (default: every root).")
+    render.add_argument("--depth", type=int, default=5, help="Levels below the root.")
+    render.add_argument("--max-nodes", type=int, default=500, help="Nodes drawn at most.")
+    render.add_argument(
+        "--solution", action="store_true", help="Only the solution path and its children."
+    )
+    info = sub.add_parser("stats", help="Nodes per depth and branching factor.")
+    info.add_argument("tree", help="File written by the stream outputter.")
+    args = parser.parse_args()
+
+    nodes, expanded, solution, summary = read_tree(args.tree)
+    if args.command == "stats":
+        print(stats(nodes, expanded, summary))
+    else:
+        selected = select(
+            nodes, solution, args.root, args.depth, args.max_nodes, args.solution
+        )
+        dot = to_dot(nodes, expanded, solution, selected)
+        if args.output == "-":
+            sys.stdout.write(dot)
+        else:
+            with open(args.output, "w") as fh:
+                fh.write(dot)
@@ -0,0 +1,455 @@
+"""
+Runs a problem x algorithm x heuristic x parameters matrix in a process pool.
+
+Every run loads the problems and algorithms in-process (like `hlogedu-search
+run ... -o none`, without any outputter) in its own worker process, with a
+wall-clock and a memory limit, and writes one row to the results file:
+
+    python benchmark.py                      # nqueens + kiwis suites
+    python benchmark.py smoke                # four quick runs
+    python benchmark.py pacman -j 8 -t 60    # Pacman layouts, 8 workers
+    python benchmark.py all -o results.jsonl --memory 2048 --trace-memory
+    python benchmark.py nqueens --profile perf.folded --profile-sample 10
+    python benchmark.py landmarks decrease-key -t 0 -o comparisons.csv
+
+The suites are the sweeps that used to live in benchmarKiwisQueens.sh,
+pacmanTest.sh, pacmanLandmarks.sh and decreaseKeyBench.sh.
+"""
+
+import argparse
+import csv
+import glob
+import importlib.util
+import inspect
+import json
+import multiprocessing
+import os
+import resource
+import signal
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+PROBLEMS_DIR = os.path.join(ROOT, "problems")
+ALGORITHMS_DIR = os.path.join(ROOT, "algorithms")
+
+FIELDS = [
+    "problem", "instance", "algorithm", "heuristic", "max_depth", "status",
+    "cost", "length", "expanded", "max_fringe", "time", "memory", "error",
+    "command",
+]
+# Columns taken from `solution.metrics` (algorithms/metrics.py), when the
+# algorithm records them
+METRICS_FIELDS = [
+    "generated", "reopened", "duplicates", "heuristic_calls",
+    "cache_hits", "cache_misses", "cache_evictions", "traced_memory",
+]
+
+# Default of `hlogedu-search run -md`, for runs without max_depth
+DEFAULT_MAX_DEPTH = 2**31
+
+# Status of a run
+OK = "ok"  # Solution found
+NO_SOLUTION = "no-solution"
+CUTOFF = "cutoff"  # No solution within max_depth
+TIMEOUT = "timeout"
+MEMORY = "memory"  # Exceeded the memory limit
+ERROR = "error"
+
+
+class Run:
+    """One cell of the benchmark matrix."""
+
+    def __init__(self, problem, algorithm, heuristic=None, params=None, max_depth=None):
+        self.problem = problem
+        self.algorithm = algorithm
+        self.heuristic = heuristic
+        self.params = params or {}
+        self.max_depth = max_depth
+
+    @property
+    def instance(self):
+        return " ".join(
+            f"{k}={os.path.relpath(v, ROOT) if k == 'file' else v}"
+            for k, v in self.params.items()
+        )
+
+    def command(self):
+        """The equivalent `hlogedu-search` invocation."""
+        args = ["run", "-a", self.algorithm, "-p", self.problem]
+        for k, v in self.params.items():
+            args += ["-pp", f"{k}={v}"]
+        if self.heuristic is not None:
+            args += ["-hf", self.heuristic]
+        if self.max_depth is not None:
+            args += ["-md", str(self.max_depth)]
+        return args + ["-o", "none"]
+
+
+# Suites
+##############################################################################
+
+BLIND = [
+    "hlog-graph-ucs", "hlog-graph-bfs", "hlog-graph-dfs",
+    "hlog-tree-ucs", "hlog-tree-bfs", "hlog-tree-dfs",
+]
+# Algorithms of algorithms/, which record a SearchMetrics: the metric
+# columns are only filled for these
+MY_BLIND = ["my-graph-ucs"]
+MY_INFORMED = ["my-graph-astar", "my-tree-idastar"]
+
+
+def nqueens_suite():
+    for n in range(4, 11):
+        for seed in range(1, 6):
+            params = {"n_queens": n, "seed": seed}
+            for algorithm in BLIND + MY_BLIND:
+                yield Run("NQueensIR", algorithm, params=params)
+            for algorithm in ["hlog-tree-astar", "hlog-graph-astar"] + MY_INFORMED:
+                yield Run("NQueensIR", algorithm, "RepairHeuristic", params)
+            yield Run("NQueensIR", "my-local-minconflicts", params=params)
+
+
+def kiwis_suite():
+    for algorithm in BLIND + MY_BLIND:
+        yield Run("kiwis-and-dogs", algorithm)
+    for algorithm in ["hlog-tree-astar", "hlog-graph-astar"] + MY_INFORMED:
+        yield Run("kiwis-and-dogs", algorithm, "RepairHeuristic")
+    yield Run("kiwis-and-dogs", "my-graph-astar", "PatternDatabaseHeuristic")
+    # Generated instances, with and without the agent-symmetry reduction
+    for instance in sorted(glob.glob(os.path.join(ROOT, "problems", "kiwis", "*.kd"))):
+        for symmetry in ("sorted", "none"):
+            params = {"file": instance, "symmetry": symmetry}
+            yield Run("kiwis-and-dogs", "hlog-graph-ucs", params=params)
+            yield Run("kiwis-and-dogs", "hlog-graph-astar", "RepairHeuristic", params)
+            yield Run("kiwis-and-dogs", "my-graph-ucs", params=params)
+            yield Run("kiwis-and-dogs", "my-graph-astar", "RepairHeuristic", params)
+
+
+def pacman_layouts(*subdirs):
+    """The .lay files of problems/layouts/<subdir>, one directory after another."""
+    return [
+        layout
+        for subdir in subdirs
+        for layout in sorted(glob.glob(os.path.join(ROOT, "problems", "layouts", subdir, "*.lay")))
+    ]
+
+
+def pacman_suite():
+    for layout in pacman_layouts("", "wc3"):
+        params = {"file": layout}
+        for algorithm in BLIND + MY_BLIND:
+            yield Run("Pacman", algorithm, params=params)
+        for algorithm in ["hlog-graph-astar", "hlog-tree-astar"] + MY_INFORMED:
+            for heuristic in ("EuclideanHeuristic", "ManhattanHeuristic"):
+                yield Run("Pacman", algorithm, heuristic, params)
+
+
+def smoke_suite():
+    """A few runs of a second or less, to check that the tool works."""
+    params = {"n_queens": 4, "seed": 1}
+    yield Run("NQueensIR", "hlog-graph-bfs", params=params)
+    yield Run("NQueensIR", "hlog-graph-astar", "RepairHeuristic", params)
+    yield Run("NQueensIR", "my-graph-astar", "RepairHeuristic", params)
+    yield Run("kiwis-and-dogs", "hlog-graph-ucs")
+
+
+def landmarks_suite():
+    """LandmarkHeuristic against ManhattanHeuristic on the wc3 layouts."""
+    for layout in pacman_layouts("wc3"):
+        for heuristic in ("ManhattanHeuristic", "LandmarkHeuristic"):
+            yield Run("Pacman", "my-graph-astar", heuristic, {"file": layout})
+
+
+def decrease_key_suite():
+    """Lazy duplicates (PriorityQueue) against the -dk (decrease-key) variants."""
+    for layout in pacman_layouts("", "wc3"):
+        params = {"file": layout}
+        for suffix in ("", "-dk"):
+            yield Run("Pacman", f"my-graph-astar{suffix}", "ManhattanHeuristic", params)
+            yield Run("Pacman", f"my-graph-ucs{suffix}", params=params)
+    for n in range(4, 8):
+        for seed in range(1, 4):
+            params = {"n_queens": n, "seed": seed}
+            for suffix in ("", "-dk"):
+                yield Run("NQueensIR", f"my-graph-astar{suffix}", "RepairHeuristic", params)
+    for suffix in ("", "-dk"):
+        yield Run("kiwis-and-dogs", f"my-graph-ucs{suffix}")
+
+
+SUITES = {
+    "smoke": smoke_suite,
+    "nqueens": nqueens_suite,
+    "kiwis": kiwis_suite,
+    "pacman": pacman_suite,
+    # Comparisons of docs/pac_man.md, which repeat runs of the pacman suite
+    "landmarks": landmarks_suite,
+    "decrease-key": decrease_key_suite,
+}
+# Suites of `all`
+MATRIX = ["nqueens", "kiwis", "pacman"]
+
+
+# Worker
+##############################################################################
+
+
+# Not an Exception, so that no `except Exception` inside a problem swallows it
+class Timeout(BaseException):
+    pass
+
+
+def _alarm(signum, frame):
+    raise Timeout()
+
+
+def load_modules(directory):
+    """Imports every python file of the directory, as the CLI does."""
+    modules = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.py"))):
+        name = os.path.splitext(os.path.basename(path))[0].replace("-", "_")
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+        modules.append(module)
+    return modules
+
+
+def find_problem(modules, name):
+    from hlogedu.search.problem import Problem
+
+    for module in modules:
+        for value in vars(module).values():
+            if (
+                isinstance(value, type)
+                and issubclass(value, Problem)
+                and value is not Problem
+                and value.get_name() == name
+            ):
+                return value
+    raise ValueError(f"Unknown problem: {name}")
+
+
+# Limits of the runs of this worker, set by init_worker
+TIMEOUT_SECONDS = 0
+MEMORY_MIB = 0
+TRACE_MEMORY = False
+
+
+def execute(run):
+    """Runs one cell and returns its row. Called in a fresh worker process."""
+    row = {
+        "problem": run.problem,
+        "instance": run.instance,
+        "algorithm": run.algorithm,
+        "heuristic": run.heuristic or "",
+        "max_depth": "" if run.max_depth is None else run.max_depth,
+        "command": " ".join(["hlogedu-search"] + run.command()),
+    }
+    start = time.perf_counter()
+    if TIMEOUT_SECONDS:
+        signal.setitimer(signal.ITIMER_REAL, TIMEOUT_SECONDS)
+    try:
+        # Registers the hlog-* algorithms, as the CLI does
+        import hlogedu.search.default_algorithms  # noqa: F401
+        from hlogedu.search.algorithm import get_algorithm
+        from hlogedu.search.problem import NullHeuristic, get_heuristic
+
+        problem_modules = load_modules(PROBLEMS_DIR)
+        load_modules(ALGORITHMS_DIR)
+
+        # Heap limit (RLIMIT_AS would also count the shared libraries mapped
+        # by pygame & co), only for the search itself
+        if MEMORY_MIB:
+            limit = MEMORY_MIB * 2**20
+            resource.setrlimit(resource.RLIMIT_DATA, (limit, limit))
+        if TRACE_MEMORY:
+            tracemalloc.start()
+
+        start = time.perf_counter()
+        problem = find_problem(problem_modules, run.problem)(**run.params)
+        algorithm = get_algorithm(run.algorithm)(problem)
+        kwargs = {}
+        parameters = inspect.signature(algorithm.run).parameters
+        if "heuristic" in parameters:
+            if run.heuristic is None:
+                kwargs["heuristic"] = NullHeuristic()
+            else:
+                kwargs["heuristic"] = get_heuristic(type(problem), run.heuristic)(problem)
+        if "max_depth" in parameters:
+            kwargs["max_depth"] = (
+                DEFAULT_MAX_DEPTH if run.max_depth is None else run.max_depth
+            )
+        solution = algorithm.run(**kwargs)
+        row["time"] = round(time.perf_counter() - start, 3)
+
+        if solution.has_solution():
+            path = solution.get_solution_path()
+            row["status"] = OK
+            row["cost"] = path[-1].cost
+            row["length"] = len(path)
+        elif solution.has_been_cutoff():
+            row["status"] = CUTOFF
+        else:
+            row["status"] = NO_SOLUTION
+        row["expanded"] = problem.num_expanded
+        row["max_fringe"] = getattr(algorithm.fringe, "max_size", "")
+
+        metrics = getattr(solution, "metrics", None)
+        if metrics is not None:
+            # Also counts the fringes that are not `algorithm.fringe`, e.g.
+            # both frontiers of the bidirectional searches
+            row["max_fringe"] = metrics.max_fringe
+            for field in METRICS_FIELDS[:-1]:
+                row[field] = getattr(metrics, field)
+            if metrics.memory is not None:
+                row["traced_memory"] = round(metrics.memory / 2**20, 1)
+    except Timeout:
+        row["status"] = TIMEOUT
+        row["time"] = round(time.perf_counter() - start, 3)
+    except MemoryError:
+        row["status"] = MEMORY
+        row["time"] = round(time.perf_counter() - start, 3)
+    except Exception as e:
+        row["status"] = ERROR
+        row["time"] = round(time.perf_counter() - start, 3)
+        row["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+    # ru_maxrss is in KiB on Linux
+    row["memory"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return {field: row.get(field, "") for field in FIELDS + METRICS_FIELDS}
+
+
+def init_worker(timeout, memory, trace_memory=False):
+    """Limits of every run: wall-clock seconds and MiB of heap."""
+    global TIMEOUT_SECONDS, MEMORY_MIB, TRACE_MEMORY
+    TIMEOUT_SECONDS = timeout
+    MEMORY_MIB = memory
+    TRACE_MEMORY = trace_memory
+    signal.signal(signal.SIGALRM, _alarm)
+
+
+# Main
+##############################################################################
+
+
+class Writer:
+    """Writes the rows as CSV or, for .jsonl files, as JSON lines."""
+
+    def __init__(self, path):
+        self.file = open(path, "w", newline="")
+        self.jsonl = path.endswith(".jsonl")
+        if not self.jsonl:
+            self.csv = csv.DictWriter(self.file, fieldnames=FIELDS + METRICS_FIELDS)
+            self.csv.writeheader()
+
+    def write(self, row):
+        if self.jsonl:
+            self.file.write(json.dumps(row) + "\n")
+        else:
+            self.csv.writerow(row)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def heuristic_cache_spec(spec):
+    """Checks --heuristic-cache once here, instead of failing in every run."""
+    if ALGORITHMS_DIR not in sys.path:
+        sys.path.insert(0, ALGORITHMS_DIR)
+    from heuristic_cache import cache_spec
+    from hlogedu.search.exceptions import AlgorithmException
+
+    try:
+        cache_spec(spec)
+    except AlgorithmException as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+    return spec
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "suites", nargs="*", metavar="SUITE",
+        help=f"Suites to run: {', '.join(SUITES)} or all ({' '.join(MATRIX)}) "
+        "(default: nqueens kiwis).",
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=os.cpu_count(),
+        help="Worker processes (default: number of cores).",
+    )
+    parser.add_argument(
+        "-t", "--timeout", type=float, default=10,
+        help="Wall-clock limit per run in seconds (0 = none).",
+    )
+    parser.add_argument(
+        "-m", "--memory", type=int, default=4096,
+        help="Memory limit per run in MiB (0 = none).",
+    )
+    parser.add_argument(
+        "--trace-memory", action="store_true",
+        help="Run with tracemalloc, so the metrics include the peak traced memory (slow).",
+    )
+    parser.add_argument(
+        "--heuristic-cache", metavar="POLICY[:SIZE]", type=heuristic_cache_spec,
+        help="Memoize the heuristic with an lru or clock cache of SIZE states.",
+    )
+    parser.add_argument(
+        "--profile", metavar="FILE",
+        help="Append a per-phase time breakdown of every run to FILE "
+        "(collapsed stacks for flame graphs if it ends in .folded).",
+    )
+    parser.add_argument(
+        "--profile-sample", type=int, default=1, metavar="N",
+        help="With --profile, time only 1 in N calls (default: 1).",
+    )
+    parser.add_argument(
+        "-o", "--output", default="results.csv",
+        help="Results file, .csv or .jsonl (default: results.csv).",
+    )
+    args = parser.parse_args()
+
+    # Checked here: with nargs="*", argparse would check the empty list
+    # against `choices` as a whole
+    unknown = sorted(set(args.suites) - set(SUITES) - {"all"})
+    if unknown:
+        parser.error(f"unknown suites: {', '.join(unknown)}")
+    if not args.suites:
+        suites = ["nqueens", "kiwis"]
+    elif "all" in args.suites:
+        suites = MATRIX
+    else:
+        suites = args.suites
+    runs = [run for suite in suites for run in SUITES[suite]()]
+
+    # Read by algorithms/heuristic_cache.py and algorithms/profiling.py in every worker
+    if args.heuristic_cache:
+        os.environ["HLOG_HEURISTIC_CACHE"] = args.heuristic_cache
+    if args.profile:
+        os.environ["HLOG_PROFILE"] = os.path.abspath(args.profile)
+        os.environ["HLOG_PROFILE_SAMPLE"] = str(args.profile_sample)
+
+    writer = Writer(args.output)
+    # One process per run: the limits and ru_maxrss only count that run
+    with multiprocessing.Pool(
+        args.jobs, initializer=init_worker,
+        initargs=(args.timeout, args.memory, args.trace_memory), maxtasksperchild=1,
+    ) as pool:
+        for i, row in enumerate(pool.imap(execute, runs), start=1):
+            writer.write(row)
+            print(
+                f"[{i}/{len(runs)}] {row['problem']} {row['instance']} "
+                f"{row['algorithm']} {row['heuristic']}: {row['status']}",
+                flush=True,
+            )
+    writer.close()
+    print(f"Done! Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
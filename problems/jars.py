@@ -1,5 +1,10 @@
 """Implementation of the Jars problem."""
 
+import itertools
+import math
+from operator import mul
+
+from hlogedu.search.common import ClassParameter
 from hlogedu.search.problem import action, Problem, DDRange, Heuristic
 
 
@@ -19,10 +24,44 @@ class JarsProblem(Problem):
     """
 
     NAME = "Jars"
-    
-    def __init__(self):
-        self.capacities = (5, 3)
+    PARAMS = [
+        ClassParameter(
+            name="capacities",
+            type=str,
+            default="5,3",
+            help="Comma-separated capacity of every jar.",
+        ),
+        ClassParameter(
+            name="target", type=int, default="4", help="Amount wanted in the first jar."
+        ),
+    ]
+
+    def __init__(self, capacities: str = "5,3", target: int = 4):
+        super().__init__()
+        self.capacities = tuple(int(c) for c in str(capacities).split(","))
+        if not self.capacities or min(self.capacities) <= 0:
+            raise ValueError(f"Invalid capacities: {capacities}")
         self.n_jars = len(self.capacities)
+        self.target = target
+
+        # Every amount in a jar is a multiple of the gcd of the capacities
+        # (fill, empty and pour keep that invariant), so if the target is
+        # not one, or does not fit in the first jar, there is nothing to
+        # search for.
+        self.solvable = (
+            0 <= target <= self.capacities[0]
+            and target % math.gcd(*self.capacities) == 0
+        )
+
+        # Mixed-radix place value of every jar: `state_index` maps each
+        # state to a unique int in range(num_states)
+        self.place = []
+        place = 1
+        for capacity in reversed(self.capacities):
+            self.place.append(place)
+            place *= capacity + 1
+        self.place.reverse()
+        self.num_states = place
 
     def get_start_states(self):
         """Creates the initial state.
@@ -37,9 +76,9 @@ class JarsProblem(Problem):
         """Tests if the state is a goal state.
 
         In this implementation the goal state only depends on the
-        first jar, which we want it to contain 4 liters.
+        first jar, which we want it to contain `target` liters.
         """
-        return state[0] == 4
+        return state[0] == self.target
 
     def is_valid_state(self, state):
         """Verifies that the given state is valid.
@@ -52,10 +91,91 @@ class JarsProblem(Problem):
                 return False
         return True
 
+    def get_goal_states(self):
+        """Enumerates every state that passes `is_goal_state`.
+
+        It is a generator: with big jars there are many goal states (7560
+        for 97,89,83), and bidirectional search only asks for a few of
+        them before falling back to a forward search.
+        """
+        if not self.solvable:
+            return
+        ranges = [range(capacity + 1) for capacity in self.capacities[1:]]
+        for rest in itertools.product(*ranges):
+            yield (self.target,) + rest
+
+    def get_successors(self, state):
+        """Successors of the state, or none if the instance is unsolvable.
+
+        Without successors the search ends right after the start state
+        instead of exhausting the whole state space.
+        """
+        if not self.solvable:
+            self._num_expanded += 1
+            return []
+        return super().get_successors(state)
+
+    def state_index(self, state):
+        """Perfect index of the state in range(num_states).
+
+        Lets graph search keep a dense bytearray visited table instead of
+        a set of tuples (see `DenseStateSet` in algorithms/containers.py).
+        """
+        return sum(map(mul, state, self.place))
+
+    def get_predecessors(self, state):
+        """Inverse of `get_successors`.
+
+        Returns (prev_state, action, cost) tuples such that applying
+        `action` on `prev_state` leads to `state`. Expanding a state
+        backwards counts as an expansion, like `get_successors`.
+        """
+        self._num_expanded += 1
+        predecessors = []
+        for jar in range(self.n_jars):
+            capacity = self.capacities[jar]
+            # fill: the jar had any other amount
+            if state[jar] == capacity:
+                for amount in range(capacity):
+                    predecessors.append(
+                        (self._replace(state, jar, amount), f"fill({jar})", 1)
+                    )
+            # empty: the jar had some liquid
+            if state[jar] == 0:
+                for amount in range(1, capacity + 1):
+                    predecessors.append(
+                        (self._replace(state, jar, amount), f"empty({jar})", 1)
+                    )
+
+        for jar_s in range(self.n_jars):
+            for jar_d in range(self.n_jars):
+                if jar_s == jar_d:
+                    continue
+                cap_s = self.capacities[jar_s]
+                cap_d = self.capacities[jar_d]
+                # pour stops when the source is empty or the destination full
+                for poured in range(1, state[jar_d] + 1):
+                    prev_s = state[jar_s] + poured
+                    prev_d = state[jar_d] - poured
+                    if prev_s > cap_s or min(prev_s, cap_d - prev_d) != poured:
+                        continue
+                    n_state = list(state)
+                    n_state[jar_s] = prev_s
+                    n_state[jar_d] = prev_d
+                    predecessors.append(
+                        (tuple(n_state), f"pour({jar_s}, {jar_d})", 1)
+                    )
+        return predecessors
+
+    @staticmethod
+    def _replace(state, jar, amount):
+        n_state = list(state)
+        n_state[jar] = amount
+        return tuple(n_state)
+
     @action(DDRange(0, 'n_jars'), cost=1)
     def fill(self, state, jar):
         """Fills the specified jar to its maximum capacity."""
-        print("Filing")
         if state[jar] == self.capacities[jar]:
             return None
 
@@ -66,7 +186,6 @@ class JarsProblem(Problem):
     @action(DDRange(0, 'n_jars'), cost=1)
     def empty(self, state, jar):
         """Empties the specified jar."""
-        print("Empting")
         if state[jar] == 0:
             return None
 
@@ -81,7 +200,6 @@ class JarsProblem(Problem):
         This action must take into account that not all the content of
         one jar will fit into the other.
         """
-        print("Pouring")
         cap_d = self.capacities[jar_d]
 
         if jar_s == jar_d or state[jar_s] == 0 or state[jar_d] == cap_d:
@@ -99,4 +217,4 @@ class JarsProblem(Problem):
 @JarsProblem.heuristic
 class DiffFromTargetVolumeHeuristic(Heuristic):
     def compute(self, state):
-        return abs(state[0] - 4)
\ No newline at end of file
+        return abs(state[0] - self.problem.target)
\ No newline at end of file
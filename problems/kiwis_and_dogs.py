@@ -1,23 +1,93 @@
-from dataclasses import dataclass
+import heapq
+import itertools
+import math
+import random
+from dataclasses import dataclass, field
 
-from hlogedu.search.problem import Problem, action, Categorical, DDRange, Heuristic
+from hlogedu.search.common import ClassParameter
+from hlogedu.search.problem import Problem, action, DCategorical, DDRange, Heuristic
 
 
 @dataclass(frozen=True, order=True)
 class State:
     kiwis: tuple[str]
     dogs: tuple[str]
+    # Nodes ocupats (un bit per node), derivat de kiwis i dogs
+    occupied: int = field(default=0, compare=False, repr=False)
 
 
 # Problem
 ##############################################################################
 
 
+def load_instance(path):
+    """Llegeix una instància de fitxer.
+
+    Format (una directiva per línia, # per comentaris):
+
+        kiwis D F              nodes inicials dels kiwis
+        dogs C                 nodes inicials dels gossos
+        goal A E               node objectiu dels kiwis i dels gossos
+        edge A B 3 nobody(E)   aresta dirigida, cost i condicions (opcionals)
+
+    Retorna (graph, kiwis, dogs, goal_kiwis, goal_dogs), amb `graph` en
+    el mateix format que el graf per defecte.
+    """
+    graph = {}
+    kiwis = dogs = goal = None
+    with open(path) as fh:
+        for number, line in enumerate(fh, start=1):
+            fields = line.split("#", 1)[0].split()
+            if not fields:
+                continue
+            key, values = fields[0], fields[1:]
+            if key == "kiwis":
+                kiwis = tuple(values)
+            elif key == "dogs":
+                dogs = tuple(values)
+            elif key == "goal" and len(values) == 2:
+                goal = tuple(values)
+            elif key == "edge" and len(values) in (3, 4):
+                condition = values[3] if len(values) == 4 else ""
+                graph[(values[0], values[1])] = (int(values[2]), condition)
+            else:
+                raise ValueError(f"{path}:{number}: invalid line: {line.strip()}")
+
+    if kiwis is None or dogs is None or goal is None:
+        raise ValueError(f"{path}: missing kiwis, dogs or goal")
+    return graph, kiwis, dogs, goal[0], goal[1]
+
+
 class KiwisAndDogsProblem(Problem):
     NAME = "kiwis-and-dogs"
+    PARAMS = [
+        ClassParameter(
+            name="file",
+            type=str,
+            default="",
+            help="Instance file (graph, agents and goal). Default: the 7-node graph.",
+        ),
+        ClassParameter(
+            name="symmetry",
+            type=str,
+            default="sorted",
+            help="'sorted': interchangeable kiwis and dogs (canonical states) or 'none'.",
+        ),
+    ]
 
-    def __init__(self):
+    def __init__(self, file: str = "", symmetry: str = "sorted"):
         super().__init__()
+        if symmetry not in ("sorted", "none"):
+            raise ValueError(f"Unknown symmetry: {symmetry}")
+        # Els kiwis són intercanviables entre ells, i els gossos també: amb
+        # les tuples ordenades, totes les permutacions són un sol estat
+        self.sorted_agents = symmetry == "sorted"
+
+        if file:
+            self.graph, kiwis, dogs, goal_kiwis, goal_dogs = load_instance(file)
+            self.setup(kiwis, dogs, goal_kiwis, goal_dogs)
+            return
+
         # Assume we only have `nobody(X)` and `somebody(X)` conditions.
         # In case of having more than one condition, these will always be
         # a conjunction and will be separated by a comma.
@@ -45,103 +115,299 @@ class KiwisAndDogsProblem(Problem):
             ("G", "F"): (7, ""),
             ("G", "B"): (5, ""),
         }
-        self.num_kiwis = 2
-        self.num_dogs = 1
+        self.setup(("D", "F"), ("C",), "A", "E")
+
+    def setup(self, kiwis, dogs, goal_kiwis, goal_dogs):
+        self.num_kiwis = len(kiwis)
+        self.num_dogs = len(dogs)
+        self.compile_graph()
+        self.start_state = self.make_state(kiwis, dogs)
+        self.goal_state = self.make_state(
+            (goal_kiwis,) * self.num_kiwis, (goal_dogs,) * self.num_dogs
+        )
+
+    def compile_graph(self):
+        """Compila `self.graph` en llistes d'adjacència per node.
+
+        Cada node té un bit (`bits`) i cada aresta queda com
+        (destí, cost, required, forbidden): `required` són els nodes que han
+        d'estar ocupats (somebody) i `forbidden` els que han d'estar buits
+        (nobody), com a màscares de bits. Així una condició és un AND amb
+        l'ocupació de l'estat, sense tornar a parsejar cap string.
+        """
+        self.nodes = sorted({node for edge in self.graph for node in edge})
+        self.bits = {node: 1 << i for i, node in enumerate(self.nodes)}
+        self.adjacency = {node: [] for node in self.nodes}
+        self.edges = {}
+
+        for (node_from, node_to), (cost, condition) in sorted(self.graph.items()):
+            required = forbidden = 0
+            for cond in filter(None, condition.split(",")):
+                # "somebody(X)" / "nobody(X)"
+                kind, _, node = cond.strip().rstrip(")").partition("(")
+                if kind == "somebody":
+                    required |= self.bits[node]
+                elif kind == "nobody":
+                    forbidden |= self.bits[node]
+                else:
+                    raise ValueError(f"Unknown condition: {cond}")
+            edge = (node_to, cost, required, forbidden)
+            self.adjacency[node_from].append(edge)
+            self.edges[(node_from, node_to)] = edge
+
+    def make_state(self, kiwis, dogs):
+        """State (canònic, si cal) amb la màscara dels nodes on hi ha algú."""
+        if self.sorted_agents:
+            kiwis, dogs = tuple(sorted(kiwis)), tuple(sorted(dogs))
+        occupied = 0
+        for node in kiwis + dogs:
+            occupied |= self.bits[node]
+        return State(kiwis=kiwis, dogs=dogs, occupied=occupied)
 
     def get_start_states(self):
-        return [State(kiwis=("D", "F"), dogs=("C",))]
+        return [self.start_state]
 
     def is_goal_state(self, state):
-        return state == State(
-        kiwis=tuple("A" for _ in range(self.num_kiwis)),
-        dogs=tuple("E" for _ in range(self.num_dogs))
-        )
+        return state == self.goal_state
 
     def is_valid_state(self, _):
         return True # Asegurem que sigui valid des de les accions
-    
-    def parseCondition(self, condition):
-        if "," in condition:
-            return condition.split(",")
-        return [condition]
 
+    def get_successors(self, state):
+        # Només recorrem les arestes que existeixen, en lloc de cridar les
+        # accions per cada agent i els 7 destins. Mateix ordre i noms.
+        self._num_expanded += 1
+        occupied = state.occupied
+        successors = []
+        for kind, agents in (("moveDog", state.dogs), ("moveKiwi", state.kiwis)):
+            for agent_id, node_from in enumerate(agents):
+                # Amb agents intercanviables, moure qualsevol dels que són
+                # al mateix node dona el mateix estat: només en movem un
+                if self.sorted_agents and agent_id and agents[agent_id - 1] == node_from:
+                    continue
+                for node_to, cost, required, forbidden in self.adjacency[node_from]:
+                    if occupied & required != required or occupied & forbidden:
+                        continue
+                    n_state = self.moved(state, kind == "moveKiwi", agent_id, node_to)
+                    successors.append((n_state, f"{kind}({agent_id},{node_to})", cost))
+        return successors
 
-    # TODO: Juntar les 2 actions per evitar repetir codi
-    @action(DDRange(0, 'num_dogs'), Categorical(["A", "B", "C", "D", "E", "F", "G"]))
-    def moveDog(self, state, dog_id, dog_to):
-        
-        dog_from = state.dogs[dog_id]
-        
-        # Asegurem de que existeix la aresta
-        try:
-            #("4", somebody(X))
-            cost = self.graph[(dog_from, dog_to)][0] 
-            condition = self.graph[dog_from, dog_to][1]
-            
-            if condition != "": # Per optimitzar i no haver de pasar pels if's
-                condition = self.parseCondition(self.graph[dog_from, dog_to][1]) # separem les condicions en una llista
-                
-                for i in range(len(condition)): # Comprovem totes les condicions
-                    at_node = condition[i][-2:-1]
-                    # Si la condició == somebody, comprovem que no hi hagi cap kiwi ni cap gos en el node de la condició ja que si no hi ha ningú, no podem moure, contraexemple aproach
-                    if "somebody" in condition[i] and (at_node not in state.kiwis and at_node not in state.dogs):
-                        return None
-                
-                    # Si la condició conté nobody comprovem si hi ha un kiwi o un gos a X, en el cas de que hi hagi, no podem moure 
-                    if "nobody" in condition[i] and (at_node in state.kiwis or at_node in state.dogs):
-                        return None
-                    
-                new_dogs = list(state.dogs)
-                new_dogs[dog_id] = dog_to
-                return (cost, State(kiwis=state.kiwis, dogs=tuple(new_dogs)))
-                    
-            elif condition == "":
-                new_dogs = list(state.dogs)
-                new_dogs[dog_id] = dog_to
-                return (cost, State(kiwis=state.kiwis, dogs=tuple(new_dogs)))
-                
-        except KeyError: # En el cas de que no existeixi aresta, ex: (A, A)
+    def move_agent(self, state, is_kiwi, agent_id, node_to):
+        """Aplica el moviment si l'aresta existeix i es compleix la condició."""
+        node_from = (state.kiwis if is_kiwi else state.dogs)[agent_id]
+        edge = self.edges.get((node_from, node_to))
+        if edge is None:  # No existeix l'aresta, ex: (A, A)
             return None
+        _, cost, required, forbidden = edge
+        if state.occupied & required != required or state.occupied & forbidden:
+            return None
+        return (cost, self.moved(state, is_kiwi, agent_id, node_to))
+
+    def moved(self, state, is_kiwi, agent_id, node_to):
+        agents = list(state.kiwis if is_kiwi else state.dogs)
+        agents[agent_id] = node_to
+        if is_kiwi:
+            return self.make_state(tuple(agents), state.dogs)
+        return self.make_state(state.kiwis, tuple(agents))
+
+    # Els destins són els nodes del graf carregat (`self.nodes`)
+    @action(DDRange(0, 'num_dogs'), DCategorical('nodes'))
+    def moveDog(self, state, dog_id, dog_to):
+        return self.move_agent(state, False, dog_id, dog_to)
 
     # Movem tots els kiwis disponibles, del primer punt possible al segon punt possible, cost definit per graph dinamicament
-    @action(DDRange(0, 'num_kiwis'), Categorical(["A", "B", "C", "D", "E", "F", "G"]))
+    @action(DDRange(0, 'num_kiwis'), DCategorical('nodes'))
     def moveKiwi(self, state, kiwi_id, kiwi_to):
-        
-        kiwi_from = state.kiwis[kiwi_id]
-        
-        try:
-            # Asegurem de que existeix la aresta
-            cost = self.graph[(kiwi_from, kiwi_to)][0]
-            condition = self.graph[(kiwi_from, kiwi_to)][1] # somebody(C)
-            
-            #Comprovem que hi ha algú al node que hi ha dins del sombody(X)
-            
-            if condition != "":
-                condition = self.parseCondition(self.graph[(kiwi_from, kiwi_to)][1])
-                
-                for i in range(len(condition)):
-                    node_at = condition[i][-2:-1]
-                    if "somebody" in condition[i] and (node_at not in state.kiwis and node_at not in state.dogs):
-                        return None
-                    
-                    if "nobody" in condition[i] and (node_at in state.kiwis or node_at in state.dogs):
-                        return None
-                    
-                new_kiwis = list(state.kiwis)
-                new_kiwis[kiwi_id] = kiwi_to
-                return (cost, State(kiwis=tuple(new_kiwis), dogs=state.dogs))
-            
-            elif condition == "":
-                new_kiwis = list(state.kiwis)
-                new_kiwis[kiwi_id] = kiwi_to
-                return (cost, State(kiwis=tuple(new_kiwis), dogs=state.dogs))
-            
-        except KeyError:
-            return None
-        
-# Una heuristica podria ser calcular la distancia entre
+        return self.move_agent(state, True, kiwi_id, kiwi_to)
+
+# Heuristic
+##############################################################################
+
+
+# Taules de les pattern databases, per definició del graf: es construeixen
+# un cop per procés encara que es creïn molts problemes o heurístiques
+PATTERN_DATABASES = {}
+
+
+def single_agent_costs(problem, goal):
+    """Cost mínim de cada node fins a `goal` per un agent sol, ignorant
+    les condicions (Dijkstra enrere des de l'objectiu)."""
+    reverse = {node: [] for node in problem.nodes}
+    for node_from, edges in problem.adjacency.items():
+        for node_to, cost, _, _ in edges:
+            reverse[node_to].append((node_from, cost))
+
+    costs = {goal: 0}
+    heap = [(0, goal)]
+    while heap:
+        cost, node = heapq.heappop(heap)
+        if cost > costs[node]:
+            continue
+        for prev, c in reverse[node]:
+            if cost + c < costs.get(prev, math.inf):
+                costs[prev] = cost + c
+                heapq.heappush(heap, (cost + c, prev))
+    return costs
+
+
+def agent_pair_costs(problem, goals, others):
+    """Cost mínim de cada parella de posicions fins a `goals` per dos
+    agents, amb les condicions relaxades respecte la resta d'agents.
+
+    Una condició nobody(X) falla si algun dels dos és a X. Una somebody(X)
+    es compleix si algun dels dos és a X o, si hi ha altres agents
+    (`others`), sempre, perquè algun hi podria ser.
+    """
+    bits = problem.bits
+    reverse = {node: [] for node in problem.nodes}
+    for node_from, edges in problem.adjacency.items():
+        for node_to, cost, required, forbidden in edges:
+            reverse[node_to].append((node_from, cost, required, forbidden))
+
+    def allowed(occupied, required, forbidden):
+        if occupied & forbidden:
+            return False
+        return others or occupied & required == required
+
+    costs = {goals: 0}
+    heap = [(0, goals)]
+    while heap:
+        cost, (p, q) = heapq.heappop(heap)
+        if cost > costs[(p, q)]:
+            continue
+        # La condició es mira abans del moviment, amb l'agent a l'origen
+        predecessors = [
+            ((u, q), c) for u, c, req, forb in reverse[p]
+            if allowed(bits[u] | bits[q], req, forb)
+        ] + [
+            ((p, u), c) for u, c, req, forb in reverse[q]
+            if allowed(bits[p] | bits[u], req, forb)
+        ]
+        for prev, c in predecessors:
+            if cost + c < costs.get(prev, math.inf):
+                costs[prev] = cost + c
+                heapq.heappush(heap, (cost + c, prev))
+    return costs
+
+
 @KiwisAndDogsProblem.heuristic
-class RepairHeuristic(Heuristic):
+class PatternDatabaseHeuristic(Heuristic):
+    """
+    Pattern databases additives sobre els agents.
+
+    Cada moviment mou un sol agent, així que el cost d'un camí és la suma
+    del que fa cada agent i podem sumar costos exactes de subproblemes
+    amb agents disjunts. Per cada agent sol tenim el cost fins al seu
+    objectiu sense condicions; per cada parella d'agents, el cost de la
+    parella amb les condicions relaxades només respecte els altres. La
+    heurística és el màxim, sobre les parelles, de parella + la resta
+    d'agents sols (i la suma d'agents sols).
+
+    Les taules de parelles tenen nodes^2 entrades: amb grafs de més de
+    MAX_PAIR_NODES nodes només fem servir les d'agents sols.
+    """
+
+    MAX_PAIR_NODES = 300
+
+    def __init__(self, problem):
+        super().__init__(problem)
+        goal = problem.goal_state
+        self.goals = goal.kiwis + goal.dogs
+        with_pairs = 1 < len(self.goals) and len(problem.nodes) <= self.MAX_PAIR_NODES
+        graph_key = (tuple(sorted(problem.graph.items())), self.goals, with_pairs)
+        tables = PATTERN_DATABASES.get(graph_key)
+        if tables is None:
+            tables = PATTERN_DATABASES[graph_key] = self.build_tables(problem, with_pairs)
+        self.singles, self.pairs = tables
+
+    def build_tables(self, problem, with_pairs):
+        singles = {goal: single_agent_costs(problem, goal) for goal in set(self.goals)}
+        pairs = {}
+        if with_pairs:
+            others = len(self.goals) > 2
+            for i, j in itertools.combinations(range(len(self.goals)), 2):
+                goals = (self.goals[i], self.goals[j])
+                if goals not in pairs:
+                    pairs[goals] = agent_pair_costs(problem, goals, others)
+        return singles, pairs
 
     def compute(self, state):
-        raise NotImplementedError("Implement me!")
\ No newline at end of file
+        positions = state.kiwis + state.dogs
+        alone = [
+            self.singles[goal].get(pos, math.inf)
+            for pos, goal in zip(positions, self.goals)
+        ]
+        total = sum(alone)
+        if total == math.inf or not self.pairs:
+            return total
+
+        best = total
+        for i, j in itertools.combinations(range(len(positions)), 2):
+            pair = self.pairs[(self.goals[i], self.goals[j])]
+            cost = pair.get((positions[i], positions[j]), math.inf)
+            best = max(best, total - alone[i] - alone[j] + cost)
+        return best
+
+
+@KiwisAndDogsProblem.heuristic
+class RepairHeuristic(PatternDatabaseHeuristic):
+    """La mateixa `PatternDatabaseHeuristic`, amb el nom dels benchmarks."""
+
+
+# Instàncies aleatòries
+##############################################################################
+
+
+def generate_instance(n_nodes, n_kiwis, n_dogs, seed=0, extra_edges=2, condition_rate=0.2):
+    """Text d'una instància aleatòria per `load_instance`.
+
+    Els nodes formen un anell amb arestes en els dos sentits i sense
+    condicions, així que la instància sempre té solució. Cada node té a més
+    `extra_edges` arestes a nodes a l'atzar, que amb probabilitat
+    `condition_rate` porten una condició somebody(X) o nobody(X).
+    """
+    rng = random.Random(seed)
+    nodes = [f"N{i}" for i in range(n_nodes)]
+    edges = {}
+    for i, node in enumerate(nodes):
+        for other in (nodes[i - 1], nodes[(i + 1) % n_nodes]):
+            if other != node:
+                edges[(node, other)] = (rng.randint(1, 9), "")
+    for node in nodes:
+        for other in rng.sample(nodes, min(extra_edges, n_nodes)):
+            if other == node or (node, other) in edges:
+                continue
+            condition = ""
+            if rng.random() < condition_rate:
+                condition = f"{rng.choice(('somebody', 'nobody'))}({rng.choice(nodes)})"
+            edges[(node, other)] = (rng.randint(1, 9), condition)
+
+    lines = [
+        f"# generate_instance({n_nodes}, {n_kiwis}, {n_dogs}, seed={seed})",
+        "kiwis " + " ".join(rng.choice(nodes) for _ in range(n_kiwis)),
+        "dogs " + " ".join(rng.choice(nodes) for _ in range(n_dogs)),
+        f"goal {rng.choice(nodes)} {rng.choice(nodes)}",
+    ]
+    for (node_from, node_to), (cost, condition) in edges.items():
+        lines.append(f"edge {node_from} {node_to} {cost} {condition}".rstrip())
+    return "\n".join(lines) + "\n"
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Random kiwis-and-dogs instance.")
+    parser.add_argument("output", help="Instance file to write.")
+    parser.add_argument("--nodes", type=int, default=50)
+    parser.add_argument("--kiwis", type=int, default=4)
+    parser.add_argument("--dogs", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--extra-edges", type=int, default=2)
+    parser.add_argument("--condition-rate", type=float, default=0.2)
+    args = parser.parse_args()
+
+    with open(args.output, "w") as fh:
+        fh.write(generate_instance(
+            args.nodes, args.kiwis, args.dogs, args.seed,
+            args.extra_edges, args.condition_rate,
+        ))
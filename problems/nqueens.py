@@ -1,6 +1,7 @@
 import pygame
 import random
 
+from array import array
 from typing import Any
 
 from hlogedu.search.common import ClassParameter
@@ -14,31 +15,44 @@ from hlogedu.search.visualizer import SolutionVisualizer
 class NQueensVisualizer(SolutionVisualizer):
     """Pygame-based visualizer for the N-Queens problem."""
 
-    def draw_state(self, state: Any) -> None:
-        """Draw a board with queens placed according to the given state."""
-        n = self.problem.n_queens
+    def __init__(self, screen, problem, zoom, speed):
+        super().__init__(screen, problem, zoom, speed)
+        self._background = None
+
+    def background(self) -> pygame.Surface:
+        """The empty chessboard, rendered once into a Surface that every
+        frame blits instead of drawing the n * n squares again."""
+        if self._background is None:
+            n = self.problem.n_queens
+            cell_size = self.get_cell_size()
+            self._background = pygame.Surface(self.screen.get_size())
+            self._background.fill((255, 255, 255))
+            for row in range(n):
+                for col in range(n):
+                    rect = pygame.Rect(
+                        col * cell_size, row * cell_size, cell_size, cell_size
+                    )
+                    color = (240, 217, 181) if (row + col) % 2 == 0 else (181, 136, 99)
+                    pygame.draw.rect(self._background, color, rect)
+        return self._background
+
+    def draw_queen(self, col, row) -> None:
+        """Draw a queen; `row` can be a float (for animation)."""
         cell_size = self.get_cell_size()
+        center = (
+            col * cell_size + cell_size // 2,
+            int(row * cell_size + cell_size // 2),
+        )
+        radius = cell_size // 3
+        pygame.draw.circle(self.screen, (200, 0, 0), center, radius)
 
-        # Clear screen
-        self.screen.fill((255, 255, 255))
-
-        # Draw chessboard
-        for row in range(n):
-            for col in range(n):
-                rect = pygame.Rect(
-                    col * cell_size, row * cell_size, cell_size, cell_size
-                )
-                color = (240, 217, 181) if (row + col) % 2 == 0 else (181, 136, 99)
-                pygame.draw.rect(self.screen, color, rect)
+    def draw_state(self, state: Any) -> None:
+        """Draw a board with queens placed according to the given state."""
+        state = self.problem.decode(state)
 
-        # Draw queens
+        self.screen.blit(self.background(), (0, 0))
         for col, row in enumerate(state):
-            center = (
-                col * cell_size + cell_size // 2,
-                row * cell_size + cell_size // 2,
-            )
-            radius = cell_size // 3
-            pygame.draw.circle(self.screen, (200, 0, 0), center, radius)
+            self.draw_queen(col, row)
 
         pygame.display.flip()
 
@@ -47,6 +61,8 @@ class NQueensVisualizer(SolutionVisualizer):
         n = self.problem.n_queens
         cell_size = self.get_cell_size()
         delay = self.get_delay()
+        state = self.problem.decode(state)
+        new_state = self.problem.decode(new_state)
 
         # figure out which queens moved
         moved = [
@@ -58,52 +74,367 @@ class NQueensVisualizer(SolutionVisualizer):
         if not moved:
             return  # nothing changed
 
+        # Only the columns of the moving queens change (one queen per
+        # column): every frame restores them from the background
+        dirty = [
+            pygame.Rect(col * cell_size, 0, cell_size, n * cell_size)
+            for col, _, _ in moved
+        ]
+        background = self.background()
+
         # number of steps in animation
         steps = 10
 
         for step in range(steps + 1):
-            # interpolate state
-            intermediate = list(state)
+            for rect in dirty:
+                self.screen.blit(background, rect, rect)
+
+            # draw the moving queens at their interpolated rows
             for col, old_row, new_row in moved:
                 interp_row = old_row + (new_row - old_row) * (step / steps)
-                intermediate[col] = interp_row
+                self.draw_queen(col, interp_row)
 
-            # draw interpolated state
-            self.draw_interpolated_state(intermediate)
+            pygame.display.update(dirty)
             pygame.time.delay(delay // max(1, steps))
 
         # final draw (ensure exact new state)
         self.draw_state(new_state)
 
-    def draw_interpolated_state(self, state) -> None:
-        """Draw state where row positions can be floats (for animation)."""
-        n = self.problem.n_queens
-        cell_size = self.get_cell_size()
 
-        # Draw board
-        self.screen.fill((255, 255, 255))
-        for row in range(n):
-            for col in range(n):
-                rect = pygame.Rect(
-                    col * cell_size, row * cell_size, cell_size, cell_size
-                )
-                color = (240, 217, 181) if (row + col) % 2 == 0 else (181, 136, 99)
-                pygame.draw.rect(self.screen, color, rect)
-
-        # Draw queens (supports float rows)
-        for col, row in enumerate(state):
-            center = (
-                col * cell_size + cell_size // 2,
-                int(row * cell_size + cell_size // 2),
-            )
-            radius = cell_size // 3
-            pygame.draw.circle(self.screen, (200, 0, 0), center, radius)
+# Problem
+##############################################################################
 
-        pygame.display.flip()
 
+class Board(int):
+    """Tauler compacte: les files de les reines com un enter en base `size`.
+
+    La reina 0 és el dígit més significatiu, així l'ordre dels enters és
+    el mateix que el de les tuples. Un `move` només canvia un dígit: el nou
+    enter s'obté amb una suma a partir del pare, sense construir cap
+    tupla. Tot i així, la suma i el hash són lineals en la mida de l'enter
+    (n log n bits), com copiar una tupla, només amb una constant més
+    petita. `repr` el mostra com la tupla de files.
+    """
+
+    __slots__ = ()
+    size = None
+    key_bits = 0  # Bits baixos reservats per a la clau (veure `ZobristBoard`)
+
+    @classmethod
+    def from_rows(cls, rows):
+        value = 0
+        for row in rows:
+            value = value * cls.size + row
+        return cls(value)
+
+    def rows(self):
+        digits = []
+        value = int(self) >> self.key_bits
+        for _ in range(self.size):
+            value, digit = divmod(value, self.size)
+            digits.append(digit)
+        return tuple(reversed(digits))
+
+    def __repr__(self):
+        return repr(self.rows())
+
+    __str__ = __repr__
+
+
+# Bits baixos de cada `ZobristBoard`, amb la seva clau
+ZOBRIST_BITS = 64
+ZOBRIST_MASK = (1 << ZOBRIST_BITS) - 1
+
+
+def zobrist_number(i):
+    """Nombre pseudoaleatori fix de 64 bits per a l'índex `i` (splitmix64)."""
+    z = (i + 1) * 0x9E3779B97F4A7C15 & ZOBRIST_MASK
+    z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9 & ZOBRIST_MASK
+    z = (z ^ (z >> 27)) * 0x94D049BB133111EB & ZOBRIST_MASK
+    return z ^ (z >> 31)
+
+
+class ZobristNumbers(dict):
+    """Índex (reina * size + fila) -> nombre Zobrist, calculat en demanar-lo:
+    amb taulers grans només en guardem els que fan servir els estats."""
+
+    def __missing__(self, i):
+        number = self[i] = zobrist_number(i)
+        return number
+
+
+class ZobristBoard(Board):
+    """`Board` amb la clau Zobrist del tauler als ZOBRIST_BITS bits baixos.
+
+    La clau és la xor d'un nombre aleatori per cada parella (reina, fila):
+    `move` l'actualitza amb dues xor, i el hash només llegeix la clau, així
+    no depèn de n. El `__hash__` és de Python, però, i amb els taulers que
+    la cerca en graf pot resoldre (n <= 10, un enter de menys de 100 bits)
+    el hash d'un `Board` en C és més ràpid (veure docs/nqueens.md).
+    """
+
+    __slots__ = ()
+    key_bits = ZOBRIST_BITS
+    numbers = None  # `ZobristNumbers` de la mida del tauler
+
+    @classmethod
+    def from_rows(cls, rows):
+        value = key = 0
+        numbers, size = cls.numbers, cls.size
+        for queen, row in enumerate(rows):
+            value = value * size + row
+            key ^= numbers[queen * size + row]
+        return cls((value << ZOBRIST_BITS) | key)
+
+    def __hash__(self):
+        return self & ZOBRIST_MASK
+
+
+_BOARD_TYPES = {}
+
+
+def board_type(size, zobrist=False):
+    """Subclasse de `Board` (o `ZobristBoard`) per a taulers de mida `size`."""
+    if (size, zobrist) not in _BOARD_TYPES:
+        if zobrist:
+            attrs = {"__slots__": (), "size": size, "numbers": ZobristNumbers()}
+            board = type(f"ZobristBoard{size}", (ZobristBoard,), attrs)
+        else:
+            board = type(f"Board{size}", (Board,), {"__slots__": (), "size": size})
+        _BOARD_TYPES[size, zobrist] = board
+    return _BOARD_TYPES[size, zobrist]
+
+
+class BoardPath:
+    """Camí de la cerca local: l'estat inicial i la llista de moviments.
+
+    Tots els estats del camí la comparteixen, així cada pas ocupa O(1) en
+    lloc d'una còpia del tauler.
+    """
+
+    __slots__ = ("start", "moves")
+
+    def __init__(self, start, moves):
+        self.start = start
+        self.moves = moves
+
+    def states(self):
+        """Un `PathBoard` per cada estat del camí, després de l'inicial."""
+        return [PathBoard(self, i) for i in range(1, len(self.moves) + 1)]
+
+
+class PathBoard:
+    """Estat lazy: l'inici de `path` després dels primers `index` moviments.
+
+    No apunta a l'estat anterior, així copiar-lo (el `Node` fa un deepcopy
+    de cada estat) és O(1) i no recursiu. Les files es reconstrueixen en
+    O(n + index) només quan algú les demana (visualitzador, outputters,
+    hash).
+    """
+
+    __slots__ = ("path", "index")
+
+    def __init__(self, path, index):
+        self.path = path
+        self.index = index
+
+    def __deepcopy__(self, memo):
+        # És immutable: la còpia pot ser el mateix objecte
+        return self
+
+    def rows(self):
+        start = self.path.start
+        rows = list(start.rows() if isinstance(start, Board) else start)
+        for queen, row in self.path.moves[:self.index]:
+            rows[queen] = row
+        return tuple(rows)
+
+    def materialize(self):
+        """L'estat equivalent en la codificació de l'estat inicial."""
+        start = self.path.start
+        if not isinstance(start, Board):
+            return self.rows()
+        return type(start).from_rows(self.rows())
+
+    def __eq__(self, other):
+        if isinstance(other, PathBoard):
+            other = other.materialize()
+        return self.materialize() == other
+
+    def __hash__(self):
+        return hash(self.materialize())
+
+    def __repr__(self):
+        return repr(self.rows())
+
+
+class ConflictBoard:
+    """Tauler mutable amb comptadors per línia, per a la cerca local.
+
+    Guarda quantes reines hi ha a cada fila, diagonal i anti-diagonal (i
+    la xor dels seus índexs, per saber quina reina hi ha quan només n'hi
+    ha una), els conflictes totals de cada tipus (com `RepairHeuristic`),
+    les files buides i les reines que poden estar en conflicte. Moure una
+    reina i consultar conflictes és O(1).
+    """
+
+    def __init__(self, rows, movable):
+        self.size = size = len(rows)
+        self.movable = movable
+        self.rows = list(rows)
+        self.row_count = array("i", [0]) * size
+        self.diag1 = array("i", [0]) * (2 * size - 1)
+        self.diag2 = array("i", [0]) * (2 * size - 1)
+        self.row_xor = array("i", [0]) * size
+        self.diag1_xor = array("i", [0]) * (2 * size - 1)
+        self.diag2_xor = array("i", [0]) * (2 * size - 1)
+        for queen, row in enumerate(self.rows):
+            self.row_count[row] += 1
+            self.diag1[queen - row + size - 1] += 1
+            self.diag2[queen + row] += 1
+            self.row_xor[row] ^= queen
+            self.diag1_xor[queen - row + size - 1] ^= queen
+            self.diag2_xor[queen + row] ^= queen
+        self.row_conflicts = sum(c - 1 for c in self.row_count if c > 1)
+        self.diag1_conflicts = sum(c - 1 for c in self.diag1 if c > 1)
+        self.diag2_conflicts = sum(c - 1 for c in self.diag2 if c > 1)
+
+        # Files buides, amb la posició de cada una dins la llista
+        self.empty_rows = [r for r in range(size) if not self.row_count[r]]
+        self.empty_index = array("i", [-1]) * size
+        for i, row in enumerate(self.empty_rows):
+            self.empty_index[row] = i
+
+        # Invariant: tota reina en conflicte que es pot moure és a
+        # `candidates`; les que ja no en tenen es treuen quan surten
+        self.candidates = list(range(movable))
+        self.in_candidates = bytearray([1]) * movable + bytearray(size - movable)
+
+    def total_conflicts(self):
+        return self.row_conflicts + self.diag1_conflicts + self.diag2_conflicts
+
+    def cost(self, queen, row):
+        """Reines amb qui compartiria línia `queen` si fos a `row`."""
+        n = self.size
+        cost = self.row_count[row] + self.diag1[queen - row + n - 1] + self.diag2[queen + row]
+        if row == self.rows[queen]:
+            cost -= 3
+        return cost
+
+    def best_rows(self, queen, rows, first_free=False):
+        """(cost mínim, files amb aquest cost) per moure `queen` a `rows`.
+
+        No compta la fila actual. Amb `first_free` para a la primera fila
+        sense conflictes (útil si `rows` ja ve en ordre aleatori).
+        """
+        # Com `cost`, amb els comptadors en variables locals
+        row_count, diag1, diag2 = self.row_count, self.diag1, self.diag2
+        current = self.rows[queen]
+        offset = queen + self.size - 1
+        best_cost = None
+        best = []
+        for row in rows:
+            if row == current:
+                continue
+            cost = row_count[row] + diag1[offset - row] + diag2[queen + row]
+            if best_cost is None or cost < best_cost:
+                best_cost = cost
+                best = [row]
+                if cost == 0 and first_free:
+                    break
+            elif cost == best_cost:
+                best.append(row)
+        return best_cost, best
+
+    def candidate_rows(self, rng, sample):
+        """Files a avaluar: totes, o una mostra més files buides si n és gran.
+
+        La mostra és lazy i en ordre aleatori, així qui la recorre pot parar
+        a la primera fila sense conflictes.
+        """
+        if self.size <= 2 * sample:
+            return range(self.size)
+        return self.sampled_rows(rng, sample)
+
+    def sampled_rows(self, rng, sample):
+        # int(random() * k) és molt més ràpid que randrange/choice
+        rand = rng.random
+        size = self.size
+        empty = self.empty_rows
+        for _ in range(sample):
+            if empty:
+                yield empty[int(rand() * len(empty))]
+            yield int(rand() * size)
+
+    def pick_conflicted(self, rng):
+        """Una reina en conflicte a l'atzar, o None si no n'hi ha cap."""
+        candidates = self.candidates
+        while candidates:
+            i = int(rng.random() * len(candidates))
+            queen = candidates[i]
+            if self.cost(queen, self.rows[queen]):
+                return queen
+            # Ja no té conflictes: la traiem (swap-remove)
+            candidates[i] = candidates[-1]
+            candidates.pop()
+            self.in_candidates[queen] = 0
+        return None
+
+    def add_candidate(self, queen):
+        if queen < self.movable and not self.in_candidates[queen]:
+            self.candidates.append(queen)
+            self.in_candidates[queen] = 1
+
+    def move(self, queen, row):
+        n = self.size
+        old = self.rows[queen]
+        self.rows[queen] = row
+
+        # Treure la reina de la seva línia només resol un conflicte si
+        # n'hi havia més d'una, i posar-la en una línia ocupada en crea un.
+        # Si a la nova línia hi havia una sola reina, ara també té conflicte
+        self.row_count[old] -= 1
+        self.row_xor[old] ^= queen
+        if self.row_count[old]:
+            self.row_conflicts -= 1
+        else:
+            self.empty_index[old] = len(self.empty_rows)
+            self.empty_rows.append(old)
+        if self.row_count[row]:
+            self.row_conflicts += 1
+            if self.row_count[row] == 1:
+                self.add_candidate(self.row_xor[row])
+        else:
+            i = self.empty_index[row]
+            last = self.empty_rows.pop()
+            if last != row:
+                self.empty_rows[i] = last
+                self.empty_index[last] = i
+            self.empty_index[row] = -1
+        self.row_count[row] += 1
+        self.row_xor[row] ^= queen
+
+        d_old, d_new = queen - old + n - 1, queen - row + n - 1
+        self.diag1_conflicts += (self.diag1[d_new] > 0) - (self.diag1[d_old] > 1)
+        self.diag1[d_old] -= 1
+        self.diag1_xor[d_old] ^= queen
+        if self.diag1[d_new] == 1:
+            self.add_candidate(self.diag1_xor[d_new])
+        self.diag1[d_new] += 1
+        self.diag1_xor[d_new] ^= queen
+
+        d_old, d_new = queen + old, queen + row
+        self.diag2_conflicts += (self.diag2[d_new] > 0) - (self.diag2[d_old] > 1)
+        self.diag2[d_old] -= 1
+        self.diag2_xor[d_old] ^= queen
+        if self.diag2[d_new] == 1:
+            self.add_candidate(self.diag2_xor[d_new])
+        self.diag2[d_new] += 1
+        self.diag2_xor[d_new] ^= queen
+
+        if self.cost(queen, row):
+            self.add_candidate(queen)
 
-# Problem
-##############################################################################
 
 """
 Command cheat sheet:
@@ -125,46 +456,184 @@ class NQueensIterativeRepair(Problem):
 
     NAME = "NQueensIR"
     VISUALIZER = NQueensVisualizer
+    # Estats per generació de la taula de conflictes
+    CONFLICT_TABLE_SIZE = 2**16
     PARAMS = [
         ClassParameter(
             name="n_queens", type=int, default="8", help="Number of queens."
         ),
         ClassParameter(name="seed", type=int, default="123456", help="Random seed."),
+        ClassParameter(
+            name="encoding",
+            type=str,
+            default="tuple",
+            help="State encoding: 'tuple', 'int' (compact mixed-radix board) or "
+            "'zobrist' (int board with an incremental Zobrist hash).",
+        ),
     ]
 
-    def __init__(self, n_queens: int = 8, seed: int = 123456):
+    def __init__(self, n_queens: int = 8, seed: int = 123456, encoding: str = "tuple"):
         super().__init__()
         self.n_queens = n_queens
         self.seed = seed
         self.b_size = max(4, self.n_queens)
         random.seed(self.seed)
 
+        if encoding not in ("tuple", "int", "zobrist"):
+            raise ValueError(f"Unknown encoding: {encoding}")
+        self.compact = encoding != "tuple"
+        self.zobrist = encoding == "zobrist"
+        self.Board = board_type(self.b_size, self.zobrist)
+        # Valor posicional de cada reina dins de l'enter (només per "int":
+        # són O(n^2) bits i amb tuples no cal)
+        self.place = None
+        if self.compact:
+            self.place = [
+                self.b_size ** (self.b_size - 1 - q) << self.Board.key_bits
+                for q in range(self.b_size)
+            ]
+
+        # Taula lateral: estat -> (conflictes de fila, diag1, diag2)
+        # Els successors l'omplen en O(1) a partir dels comptadors del pare.
+        # Està fitada (veure `remember_conflicts`): la generació anterior es
+        # guarda a `old_conflicts` fins que s'omple la nova
+        self.conflict_table = {}
+        self.old_conflicts = {}
+        self._parent_lines = None
+
     def get_start_states(self):
-        return [tuple(random.randint(0, self.b_size - 1) for _ in range(self.b_size))]
+        state = tuple(random.randint(0, self.b_size - 1) for _ in range(self.b_size))
+        return [self.encode(state) if self.compact else state]
+
+    def encode(self, rows):
+        """Tupla de files -> `Board`."""
+        return self.Board.from_rows(rows)
+
+    def decode(self, state):
+        """Estat (tupla, `Board` o `PathBoard`) -> tupla de files."""
+        if isinstance(state, (Board, PathBoard)):
+            return state.rows()
+        return state
+
+    def conflict_board(self, state):
+        """`ConflictBoard` mutable per a la cerca local des de `state`."""
+        return ConflictBoard(self.decode(state), self.n_queens)
+
+    def path_states(self, state, moves):
+        """Estats després de cada moviment `(queenId, boardPos)` de `moves`
+        des de `state`, sense copiar el tauler (veure `PathBoard`)."""
+        return BoardPath(state, moves).states()
+
+    def count_expanded(self, steps):
+        """Suma a les expansions els passos d'una cerca local."""
+        self._num_expanded += steps
 
     def is_goal_state(self, state):
         #No cal comprovar columna ja que sempre sera diferent (columna == posició en la llista)
-        if len(set(state)) != self.b_size: # Si no hi ha duplicats el lenght ha de ser el mateix que la mida del board
-            return False
-        
-        # Check diagonals
-        for i in range(self.b_size):
-            for j in range(i + 1, self.b_size):
-                if abs(i - j) == abs(state[i] - state[j]):
-                    return False
-    
-        return True
+        # És objectiu si no hi ha cap fila ni diagonal amb dues reines
+        return not any(self.conflicts(state))
 
     def is_valid_state(self, state):
         return True
 
+    def conflicts(self, state):
+        """Retorna (conflictes de fila, diag1, diag2) de l'estat.
+
+        Normalment ja són a la taula lateral; si no (p.ex. l'estat
+        inicial) els comptem des de zero.
+        """
+        counters = self.conflict_table.get(state)
+        if counters is None:
+            counters = self.old_conflicts.get(state)
+            if counters is None:
+                counters = self.count_conflicts(state)
+            self.remember_conflicts(state, counters)
+        return counters
+
+    def remember_conflicts(self, state, counters):
+        """Guarda els comptadors de `state` a la taula lateral.
+
+        Quan la generació actual arriba a CONFLICT_TABLE_SIZE estats passa
+        a ser l'anterior i en comencem una de buida, així la taula no té
+        mai més de 2 * CONFLICT_TABLE_SIZE estats. Els que se'n van es
+        tornen a comptar en O(n) si calen.
+        """
+        table = self.conflict_table
+        if len(table) >= self.CONFLICT_TABLE_SIZE:
+            self.old_conflicts = table
+            self.conflict_table = table = {}
+        table[state] = counters
+
+    def count_conflicts(self, state):
+        """Compta els conflictes recorrent tot el tauler, O(n)."""
+        rows, diag1, diag2 = self.line_counts(self.decode(state))
+        return tuple(
+            sum(count - 1 for count in counts if count > 1)
+            for counts in (rows, diag1, diag2)
+        )
+
+    def line_counts(self, state):
+        """Quantes reines hi ha a cada fila, diagonal i anti-diagonal."""
+        size = len(state)
+        rows = [0] * size
+        diag1 = [0] * (2 * size - 1)
+        diag2 = [0] * (2 * size - 1)
+        # Les cel·les que tenen el mateix resultat en el calcul vol dir que estan a la mateixa diag
+        for queen, pos in enumerate(state):
+            rows[pos] += 1
+            diag1[queen - pos + size - 1] += 1
+            diag2[queen + pos] += 1
+        return rows, diag1, diag2
+
+    def move_conflicts(self, status, queenId, boardPos):
+        """Conflictes després de moure una reina, en O(1).
+
+        Els comptadors per línia del pare es calculen un cop per expansió
+        (totes les crides a `move` d'una expansió comparteixen pare).
+        """
+        if self._parent_lines is None or self._parent_lines[0] is not status:
+            board = self.decode(status)
+            self._parent_lines = (status, board, self.line_counts(board))
+        _, board, (rows, diag1, diag2) = self._parent_lines
+        row_c, diag1_c, diag2_c = self.conflicts(status)
+
+        size = len(board)
+        old_pos = board[queenId]
+        # Treure la reina de la seva línia només resol un conflicte si
+        # n'hi havia més d'una, i posar-la en una línia ocupada en crea un
+        row_c += (rows[boardPos] > 0) - (rows[old_pos] > 1)
+        d1_old = queenId - old_pos + size - 1
+        d1_new = queenId - boardPos + size - 1
+        diag1_c += (diag1[d1_new] > 0) - (diag1[d1_old] > 1)
+        diag2_c += (diag2[queenId + boardPos] > 0) - (diag2[queenId + old_pos] > 1)
+        return (row_c, diag1_c, diag2_c)
+
     @action(DDRange(0, 'n_queens'), DDRange(0, 'b_size'), cost=1)
     def move(self, status, queenId, boardPos):
-        if status[queenId] == boardPos:  # Skip if queen already there
-            return None
-        n_board = list(status)
-        n_board[queenId] = boardPos
-        return tuple(n_board) 
+        if self.compact:
+            # Canviem només el dígit de la reina (una suma d'enters grans)
+            place = self.place[queenId]
+            old_pos = status // place % self.b_size
+            if old_pos == boardPos:  # Skip if queen already there
+                return None
+            delta = (boardPos - old_pos) * place
+            if self.zobrist:
+                # i els seus dos termes de la clau
+                numbers, base = self.Board.numbers, queenId * self.b_size
+                key = status & ZOBRIST_MASK
+                delta += (key ^ numbers[base + old_pos] ^ numbers[base + boardPos]) - key
+            n_state = self.Board(status + delta)
+        else:
+            if status[queenId] == boardPos:  # Skip if queen already there
+                return None
+            n_board = list(status)
+            n_board[queenId] = boardPos
+            n_state = tuple(n_board)
+        if n_state not in self.conflict_table:
+            self.remember_conflicts(
+                n_state, self.move_conflicts(status, queenId, boardPos)
+            )
+        return n_state
         
 
 # Heuristic
@@ -176,45 +645,9 @@ class RepairHeuristic(Heuristic):
 
     #Admissible because each tile needs at least one move to reach its goal position (assuming it's misplaced)
     def compute(self, state):
-        # Contem els conflictes per direcció
-        col_conflicts = 0
-        diag1_conflicts = 0
-        diag2_conflicts = 0
-        
-        # Diccionari, contem quantes reines hi ha en cada columna
-        col_counts = {}
-        for col in state: 
-            # Ex: {1: 2, 0: 1, 2: 1}
-            col_counts[col] = col_counts.get(col, 0) + 1
-            
-        for count in col_counts.values(): # Si una columna te N reines en conflicte, hem de moure n-1
-            if count > 1:
-                # Column 1 te 2 reines -> conflicts += (2-1) = 1
-                col_conflicts += count - 1
-        
-        # Diagonal conflicts
-        diag1_counts = {}
-        diag2_counts = {}
-        
-        # Les cel·les que tenen el mateix resultat en el calcul vol dir que estan a la mateixa diag
-        # Row 0, Col 0: d1 = 0-0 = 0
-        # Row 3, Col 3: d1 = 3-3 = 0
-        for row in range(len(state)):
-            col = state[row]
-            d1 = row - col
-            d2 = row + col
-            diag1_counts[d1] = diag1_counts.get(d1, 0) + 1
-            diag2_counts[d2] = diag2_counts.get(d2, 0) + 1
-        
-        for count in diag1_counts.values():
-            if count > 1:
-                diag1_conflicts += count - 1
-        
-        for count in diag2_counts.values():
-            if count > 1:
-                diag2_conflicts += count - 1
+        # Per cada direcció (files, diag1, diag2), si una línia te N reines
+        # en conflicte, hem de moure n-1. Els comptadors venen de la taula
+        # lateral del problema, actualitzada en O(1) a cada `move`
         
         # Retornem el maxim, fem admissible (no sobreestima) i "tighter" el bound 
-        return max(col_conflicts, diag1_conflicts, diag2_conflicts)
-
-            
\ No newline at end of file
+        return max(self.problem.conflicts(state))
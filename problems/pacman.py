@@ -1,8 +1,16 @@
 import pygame
+import hashlib
+import json
 import math
+import mmap
+import os
+
+from array import array
 
 from typing import Any
 
+from hlogedu.search.algorithm import Node, Solution
+from hlogedu.search.exceptions import HeuristicException
 from hlogedu.search.problem import Problem, action, Categorical, Heuristic
 from hlogedu.search.visualizer import SolutionVisualizer
 from hlogedu.search.common import ClassParameter
@@ -19,39 +27,59 @@ class PacmanVisualizer(SolutionVisualizer):
         self.rows = len(self.grid)
         self.cols = len(self.grid[0])
         self.last_action = "move(R)"  # default direction
+        self._background = None
+        self.full_redraw = True
+
+    def background(self):
+        """The static maze (floor and walls), rendered once into a Surface
+        that every frame blits instead of drawing the walls again."""
+        if self._background is None:
+            self._background = pygame.Surface(self.screen.get_size())
+            self._background.fill((0, 0, 0))
+            self.draw_maze_walls(self._background)
+        return self._background
+
+    def cell_rect(self, r, c):
+        return pygame.Rect(
+            c * self.cell_size, r * self.cell_size, self.cell_size, self.cell_size
+        )
+
+    def draw_food(self, r, c):
+        pygame.draw.circle(
+            self.screen, (255, 255, 255), self.cell_rect(r, c).center, self.cell_size // 6
+        )
+
+    def draw_sprite(self, r, c, mouth_angle):
+        radius = self.cell_size // 2 - 2
+        draw_pacman(
+            self.screen, self.cell_rect(r, c).center, radius, mouth_angle, self.last_action
+        )
 
     def draw_state(self, state: Any, mouth_angle: float = 0.25):
+        if isinstance(state, int):
+            state = self.problem.decode(state)
         (pac_r, pac_c), food = state
-        self.screen.fill((0, 0, 0))
-
-        self.draw_maze_walls()
+        self.screen.blit(self.background(), (0, 0))
 
-        # draw food (if not eaten)
-        if food is not None:
-            fr, fc = food
-            food_rect = pygame.Rect(
-                fc * self.cell_size, fr * self.cell_size, self.cell_size, self.cell_size
-            )
-            pygame.draw.circle(
-                self.screen, (255, 255, 255), food_rect.center, self.cell_size // 6
-            )
+        # draw the food that is left
+        for fr, fc in food:
+            self.draw_food(fr, fc)
 
-        # draw pacman
-        pac_rect = pygame.Rect(
-            pac_c * self.cell_size,
-            pac_r * self.cell_size,
-            self.cell_size,
-            self.cell_size,
-        )
-        radius = self.cell_size // 2 - 2
-        draw_pacman(self.screen, pac_rect.center, radius, mouth_angle, self.last_action)
+        self.draw_sprite(pac_r, pac_c, mouth_angle)
+        self.full_redraw = True
 
     def animate_transition(self, state: Any, action: Any, new_state: Any):
-        (r1, c1), food = state
-        (r2, c2), _ = new_state
+        (r1, c1), food = self.problem.decode(state)
+        (r2, c2), _ = self.problem.decode(new_state)
 
         self.last_action = action  # update facing direction
 
+        # Only the cells Pacman moves across change: every frame restores
+        # them from the background and redraws the food and Pacman there
+        dirty = self.cell_rect(r1, c1).union(self.cell_rect(r2, c2))
+        dirty_food = [pos for pos in food if dirty.colliderect(self.cell_rect(*pos))]
+        background = self.background()
+
         steps = 8
         for i in range(1, steps + 1):
             r = r1 + (r2 - r1) * (i / steps)
@@ -61,11 +89,23 @@ class PacmanVisualizer(SolutionVisualizer):
             phase = math.sin(i / steps * math.pi)
             mouth_angle = 0.5 * phase  # up to ~30°
 
-            self.draw_state(((r, c), food), mouth_angle)
-            pygame.display.flip()
+            self.screen.blit(background, dirty, dirty)
+            for fr, fc in dirty_food:
+                self.draw_food(fr, fc)
+            self.draw_sprite(r, c, mouth_angle)
+
+            # After a full draw_state the whole screen has to be shown once
+            if self.full_redraw:
+                pygame.display.flip()
+                self.full_redraw = False
+            else:
+                pygame.display.update(dirty)
             pygame.time.delay(self.get_delay())
 
-    def draw_maze_walls(self):
+    def draw_maze_walls(self, surface=None):
+        """Draws the floor and the wall outlines on `surface` (the screen
+        by default). Slow on big mazes: use the cached `background`."""
+        surface = self.screen if surface is None else surface
         wall_blue = (0, 0, 255)
         bg_color = (20, 20, 40)  # dark navy background
         thickness = max(2, self.cell_size // 5)
@@ -78,7 +118,7 @@ class PacmanVisualizer(SolutionVisualizer):
 
                 if self.grid[r][c] != "%":
                     # fill non-wall cell with dark navy
-                    pygame.draw.rect(self.screen, bg_color, rect)
+                    pygame.draw.rect(surface, bg_color, rect)
                     continue
 
                 # otherwise it's a wall: draw blue outline where it borders non-wall
@@ -105,7 +145,7 @@ class PacmanVisualizer(SolutionVisualizer):
                         not (0 <= nr < self.rows and 0 <= nc < self.cols)
                         or self.grid[nr][nc] != "%"
                     ):
-                        pygame.draw.line(self.screen, wall_blue, start, end, thickness)
+                        pygame.draw.line(surface, wall_blue, start, end, thickness)
 
 
 def draw_pacman(surface, center, radius, mouth_angle, direction):
@@ -140,6 +180,93 @@ def draw_pacman(surface, center, radius, mouth_angle, direction):
 # Problem
 ##############################################################################
 
+# Maps every byte of the layout to 1 if it is a wall and 0 otherwise
+WALL_TABLE = bytes(1 if b == ord("%") else 0 for b in range(256))
+
+# Precomputed per-layout data, keyed by the hash of the layout file
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+LAYOUTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "layouts")
+
+# Compiled layout files start with these two ints; bump the version when
+# the format changes
+LAYOUT_MAGIC = 0x5041434D
+LAYOUT_VERSION = 2
+LAYOUT_HEADER_SIZE = 6 * 4
+
+# Each distance map of `distance_map` takes rows * cols * 4 bytes (1 MiB for
+# the 514 x 514 wc3 maps). Past this total the least recently used are deleted.
+DISTANCE_CACHE_BYTES = 64 * 2**20
+
+
+def parse_grid(data):
+    """Rows of a `.lay` file, without surrounding whitespace."""
+    return [line.strip() for line in data.decode().splitlines()]
+
+
+def write_cache(path, *arrays):
+    """Atomically writes the arrays to `path`. Returns False on failure."""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as fh:
+            for values in arrays:
+                values.tofile(fh)
+        os.replace(tmp_path, path)
+    except OSError:
+        return False  # Caching is only an optimization
+    return True
+
+
+def prune_cache(marker, max_bytes):
+    """Deletes the least recently used cache files with `marker` in their
+    name until they take at most `max_bytes`."""
+    try:
+        names = [name for name in os.listdir(CACHE_DIR) if marker in name]
+    except OSError:
+        return
+    files = []
+    for name in names:
+        path = os.path.join(CACHE_DIR, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue  # Deleted by another process
+        files.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total -= size
+
+
+class PacmanState(int):
+    """
+    Packed int state (see `PacmanProblem.encode`) that prints as
+    ((r, c), remaining food positions) in the search tree outputs. It
+    hashes and compares as the plain int, and arithmetic on it gives
+    plain ints. Each problem has its own subclass, `PacmanProblem.State`,
+    with the problem to decode it.
+    """
+    __slots__ = ()
+    problem = None
+
+    def __repr__(self):
+        return repr(self.problem.decode(self))
+
+    __str__ = __repr__
+
+    # Immutable, like int: `Node` deep-copies the states it gets
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
 
 class PacmanProblem(Problem):
     NAME = "Pacman"
@@ -151,98 +278,717 @@ class PacmanProblem(Problem):
             type=str,
             default=None,
             help="File with the maze in the Pacman Project format.",
-        )
+        ),
+        ClassParameter(
+            "graph",
+            type=str,
+            default="cells",
+            help="'cells' (one state per open cell) or 'corridors' (dead ends "
+            "pruned and corridors collapsed into weighted macro moves).",
+        ),
     ]
 
-    def __init__(self, file: str):
-        with open(file) as fh:
-            self.grid = [line.strip() for line in fh]
-
-        self.rows = len(self.grid)
-        self.cols = len(self.grid[0])
-
-        start = None
-        food = None
-
-        for r, row in enumerate(self.grid):
-            for c, ch in enumerate(row):
-                if ch == "P":
-                    start = (r, c)
-                elif ch == ".":
-                    food = (r, c)
+    # Same order as the values of the `move` action parameter
+    DIRECTIONS = ("U", "D", "L", "R")
+    ACTION_NAMES = ("move(U)", "move(D)", "move(L)", "move(R)")
+
+    def __init__(self, file: str, graph: str = "cells"):
+        if graph not in ("cells", "corridors"):
+            raise ValueError(f"Unknown graph: {graph}")
+        self.file = file
+        with open(file, "rb") as fh:
+            data = fh.read()
+        self.layout_hash = hashlib.sha1(data).hexdigest()
+        self._grid = None
+        self._walls_hash = None
+
+        # Compiled layout from the cache, or parse the text and compile it
+        if not self.load_compiled():
+            self._grid = parse_grid(data)
+            self.rows = len(self._grid)
+            self.cols = len(self._grid[0])
+
+            start = None
+            food = []
+
+            for r, row in enumerate(self._grid):
+                for c, ch in enumerate(row):
+                    if ch == "P":
+                        start = (r, c)
+                    elif ch == ".":
+                        food.append((r, c))
+
+            if start is None:
+                raise ValueError("Grid must contain 'P' for Pacman start")
+            if not food:
+                raise ValueError("Grid must contain '.' for food")
+
+            self.compile_grid()
+            self.start_cell = self.cell(*start)
+            self.food_cells = tuple(self.cell(*pos) for pos in food)
+            self.write_compiled()
+
+        # state = (cell << food_bits) | food_mask, where cell = r * cols + c
+        # and bit i of the mask tells whether food_cells[i] is still there.
+        # With a single food this is (cell << 1) | food_flag.
+        self.food_bits = len(self.food_cells)
+        self.all_food = (1 << self.food_bits) - 1
+        self.food_bit = {cell: 1 << i for i, cell in enumerate(self.food_cells)}
+        self.State = type("PacmanState", (PacmanState,), {"__slots__": (), "problem": self})
+        self.start_state = self.State((self.start_cell << self.food_bits) | self.all_food)
+
+        # The single food of the classic layouts (None when there are more),
+        # used by the heuristics and algorithms that go to one target
+        if self.food_bits == 1:
+            self.food_cell = self.food_cells[0]
+            self.food = divmod(self.food_cell, self.cols)
+        else:
+            self.food_cell = self.food = None
+
+        # Distance maps of the food cells, see `food_distances`
+        self._food_distances = None
+
+        # cell -> [(cell, action, cost)] of the compressed graph, or None
+        self.corridors = self.compress_corridors() if graph == "corridors" else None
+
+    @property
+    def grid(self):
+        """Text rows of the layout, parsed on first use (the visualizer
+        needs them, the search does not)."""
+        if self._grid is None:
+            with open(self.file, "rb") as fh:
+                self._grid = parse_grid(fh.read())
+        return self._grid
+
+    @property
+    def open_cells(self):
+        return len(self.walls) - sum(self.walls)
+
+    def compile_grid(self):
+        """Compiles the maze into a flat wall mask and a neighbor table.
+
+        `walls` is a flat bytearray (1 = wall) and `neighbors` stores, for
+        every cell and direction in `DIRECTIONS`, the index of the target
+        cell or -1 when the move is not possible.
+        """
+        rows, cols = self.rows, self.cols
+        n_cells = rows * cols
+        layout = "".join(row[:cols].ljust(cols, "%") for row in self.grid)
+        self.walls = bytearray(layout.encode().translate(WALL_TABLE))
+
+        self.neighbors = array("i", [-1]) * (4 * n_cells)
+        walls, neighbors, last_col = self.walls, self.neighbors, cols - 1
+        for cell in [i for i, wall in enumerate(walls) if not wall]:
+            base = 4 * cell
+            c = cell % cols
+            if cell >= cols and not walls[cell - cols]:
+                neighbors[base] = cell - cols
+            if cell + cols < n_cells and not walls[cell + cols]:
+                neighbors[base + 1] = cell + cols
+            if c > 0 and not walls[cell - 1]:
+                neighbors[base + 2] = cell - 1
+            if c < last_col and not walls[cell + 1]:
+                neighbors[base + 3] = cell + 1
+
+    def load_compiled(self):
+        """Loads the compiled layout of this file from the cache.
+
+        The file is a header of six ints (magic, version, rows, cols,
+        start cell, number of food cells), the food cells, the neighbor
+        table and the wall mask. It is memory-mapped: the neighbor table
+        is a view of the file.
+        Returns False if there is no valid cache file.
+        """
+        try:
+            with open(self.cache_path("layout.bin"), "rb") as fh:
+                view = memoryview(mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ))
+        except (OSError, ValueError):
+            return False
+
+        header_size = LAYOUT_HEADER_SIZE
+        if len(view) < header_size:
+            return False
+        magic, version, rows, cols, start_cell, n_food = view[:header_size].cast("i")
+        n_cells = rows * cols
+        if (magic, version) != (LAYOUT_MAGIC, LAYOUT_VERSION):
+            return False
+        food_end = header_size + 4 * n_food
+        if len(view) != food_end + 17 * n_cells:
+            return False
+
+        self.rows, self.cols = rows, cols
+        self.start_cell = start_cell
+        self.food_cells = tuple(view[header_size:food_end].cast("i"))
+        neighbors_end = food_end + 16 * n_cells
+        self.neighbors = view[food_end:neighbors_end].cast("i")
+        self.walls = bytes(view[neighbors_end:])
+        return True
 
-        if start is None:
-            raise ValueError("Grid must contain 'P' for Pacman start")
-        if food is None:
-            raise ValueError("Grid must contain '.' for food")
+    def write_compiled(self):
+        header = array("i", (
+            LAYOUT_MAGIC, LAYOUT_VERSION,
+            self.rows, self.cols, self.start_cell, len(self.food_cells),
+        ))
+        write_cache(
+            self.cache_path("layout.bin"),
+            header, array("i", self.food_cells), self.neighbors, array("B", self.walls),
+        )
 
-        # state = (pacman_position, food_position | None)
-        self.start_state = (start, food)
+    def compress_corridors(self):
+        """Compresses the maze into a weighted graph of junctions.
+
+        First prunes the dead ends: cells with a single open neighbor that
+        are neither the start nor a food, repeatedly, so whole dead-end
+        branches go away. The remaining cells with exactly two neighbors
+        are corridor cells. Every other cell (junctions, the start and the
+        food cells) is a node, joined to the next node along each corridor by a
+        macro move like `moves(RRDL)` that costs its number of cells.
+        States are still packed cells, but only of the nodes.
+        """
+        neighbors = self.neighbors
+        keep = {self.start_cell, *self.food_cells}
+        alive = bytearray(1 - wall for wall in self.walls)
+        degree = bytearray(len(alive))
+        for cell in [i for i, open_cell in enumerate(alive) if open_cell]:
+            degree[cell] = sum(n >= 0 for n in neighbors[4 * cell:4 * cell + 4])
+
+        dead_ends = [
+            cell for cell, d in enumerate(degree)
+            if alive[cell] and d <= 1 and cell not in keep
+        ]
+        while dead_ends:
+            cell = dead_ends.pop()
+            alive[cell] = 0
+            for n_cell in neighbors[4 * cell:4 * cell + 4]:
+                if n_cell >= 0 and alive[n_cell]:
+                    degree[n_cell] -= 1
+                    if degree[n_cell] == 1 and n_cell not in keep:
+                        dead_ends.append(n_cell)
+
+        def is_node(cell):
+            return degree[cell] != 2 or cell in keep
+
+        corridors = {}
+        for cell in [i for i, live in enumerate(alive) if live and is_node(i)]:
+            edges = {}
+            for d in range(4):
+                n_cell = neighbors[4 * cell + d]
+                if n_cell < 0 or not alive[n_cell]:
+                    continue
+                # Follow the corridor until the next node
+                moves, prev = [d], cell
+                while not is_node(n_cell):
+                    for n_d in range(4):
+                        n_next = neighbors[4 * n_cell + n_d]
+                        if n_next >= 0 and alive[n_next] and n_next != prev:
+                            break
+                    moves.append(n_d)
+                    prev, n_cell = n_cell, n_next
+                if n_cell == cell:
+                    continue  # A loop back to the same node
+                # Of two corridors to the same node, keep the shortest
+                if n_cell not in edges or len(moves) < edges[n_cell][1]:
+                    action = "moves(" + "".join(self.DIRECTIONS[m] for m in moves) + ")"
+                    edges[n_cell] = (action, len(moves))
+            corridors[cell] = [(n_cell, a, c) for n_cell, (a, c) in edges.items()]
+        return corridors
+
+    def expand_solution(self, solution):
+        """The solution with its macro moves expanded back into
+        cell-by-cell `move(U/D/L/R)`, for the visualizer and outputters.
+
+        Only the solution path is kept: the search tree of the compressed
+        graph is not part of the returned `Solution`.
+        """
+        n = solution.solution_node
+        if self.corridors is None or n is None:
+            return solution
+
+        macro_path = []
+        while n is not None:
+            macro_path.append(n)
+            n = n.parent
+        macro_path.reverse()
+
+        n = root = Node(macro_path[0].state)
+        order = 1
+        food_bits, State = self.food_bits, self.State
+        for macro in macro_path[1:]:
+            state = n.state
+            food = state & self.all_food
+            # "moves(RRD)", or a plain "move(R)" from an algorithm that
+            # already walks the grid
+            moves = macro.action[macro.action.index("(") + 1:-1]
+            for i, direction in enumerate(moves):
+                cell = self.neighbors[4 * (state >> food_bits) + self.DIRECTIONS.index(direction)]
+                # Only the last cell of a macro move can be a food
+                state = macro.state if i == len(moves) - 1 else State((cell << food_bits) | food)
+                n.expanded_order = order
+                n.location = Node.Location.EXPANDED
+                ns = Node(state, f"move({direction})", cost=n.cost + 1, parent=n)
+                n.add_successor(ns)
+                n = ns
+                order += 1
+        n.expanded_order = order
+        n.location = Node.Location.EXPANDED
+        return Solution(self, [root], solution_node=n, cutoff=solution.has_been_cutoff())
+
+    def cache_path(self, name):
+        """Path of a cache file for this layout."""
+        return os.path.join(CACHE_DIR, f"{self.layout_hash}-{name}")
+
+    @property
+    def walls_hash(self):
+        """Hash of the wall mask, the key of the cache files that only
+        depend on the maze (not on the start or the food)."""
+        if self._walls_hash is None:
+            self._walls_hash = hashlib.sha1(self.walls).hexdigest()
+        return self._walls_hash
+
+    def bfs_distances(self, source):
+        """Maze distance from every cell to `source` (-1 if unreachable).
+
+        Moves are reversible, so a single wavefront from `source` gives the
+        distance from every cell to it.
+        """
+        distances = array("i", [-1]) * (self.rows * self.cols)
+        distances[source] = 0
+        neighbors = self.neighbors
+        frontier = [source]
+        depth = 0
+        while frontier:
+            depth += 1
+            next_frontier = []
+            for cell in frontier:
+                base = 4 * cell
+                for n_cell in neighbors[base:base + 4]:
+                    if n_cell >= 0 and distances[n_cell] < 0:
+                        distances[n_cell] = depth
+                        next_frontier.append(n_cell)
+            frontier = next_frontier
+        return distances
+
+    def distance_map(self, source):
+        """Like `bfs_distances`, but cached on disk per maze and source.
+
+        Only the heuristics ask for them, with the food cells as sources.
+        The cache keeps the most recently used maps, up to
+        `DISTANCE_CACHE_BYTES` in total.
+        """
+        path = os.path.join(
+            CACHE_DIR, f"{self.walls_hash}-{self.rows}x{self.cols}-dist-{source}.bin"
+        )
+        distances = array("i")
+        try:
+            with open(path, "rb") as fh:
+                distances.fromfile(fh, self.rows * self.cols)
+        except (OSError, EOFError):
+            pass
+        else:
+            try:
+                os.utime(path)  # Recently used, see `prune_cache`
+            except OSError:
+                pass
+            return distances
+
+        distances = self.bfs_distances(source)
+        if write_cache(path, distances):
+            prune_cache("-dist-", DISTANCE_CACHE_BYTES)
+        return distances
+
+    def food_distances(self):
+        """Maze distances to every food, computed once per problem.
+
+        Returns (distances, pairwise): distances[i] is the distance map of
+        food_cells[i] (cached on disk by `distance_map`) and pairwise[i][j]
+        the maze distance between foods i and j (-1 if unreachable).
+        """
+        if self._food_distances is None:
+            distances = [self.distance_map(cell) for cell in self.food_cells]
+            pairwise = [[d[cell] for cell in self.food_cells] for d in distances]
+            self._food_distances = (distances, pairwise)
+        return self._food_distances
+
+    def select_landmarks(self, k):
+        """Picks `k` landmarks by farthest-point selection.
+
+        The first landmark is the cell farthest from the first open cell,
+        and each next one maximizes the distance to the closest landmark
+        chosen so far. Returns the landmarks and their distance arrays.
+        """
+        seed = self.walls.index(0)
+        closest = self.bfs_distances(seed)
+        landmarks, distances = [], []
+        for _ in range(k):
+            landmark = max(range(len(closest)), key=closest.__getitem__)
+            if closest[landmark] <= 0 and landmarks:
+                break  # Every reachable cell is already a landmark
+            landmarks.append(landmark)
+            distances.append(self.bfs_distances(landmark))
+            closest = array("i", map(min, closest, distances[-1]))
+        return landmarks, distances
+
+    def landmark_distances(self, k):
+        """Distance arrays of `k` landmarks, memory-mapped from the cache.
+
+        The landmarks only depend on the walls, so the file is keyed by the
+        wall mask and shared by every start/food pair on the same maze.
+        Returns one int view per landmark.
+        """
+        n_cells = self.rows * self.cols
+        path = os.path.join(
+            CACHE_DIR, f"{self.walls_hash}-{self.rows}x{self.cols}-landmarks-{k}.bin"
+        )
+        if not os.path.exists(path):
+            _, distances = self.select_landmarks(k)
+            if not write_cache(path, *distances):
+                return distances
+
+        with open(path, "rb") as fh:
+            view = memoryview(mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ))
+        view = view.cast("i")
+        return [view[i:i + n_cells] for i in range(0, len(view), n_cells)]
+
+    def cell(self, r, c):
+        return r * self.cols + c
+
+    def encode(self, pos, food):
+        """((r, c), remaining food positions) -> packed int state."""
+        mask = 0
+        for r, c in food:
+            mask |= self.food_bit[self.cell(r, c)]
+        return self.State((self.cell(*pos) << self.food_bits) | mask)
+
+    def decode(self, state):
+        """Packed int state -> ((r, c), tuple of remaining food positions)."""
+        pos = divmod(state >> self.food_bits, self.cols)
+        food = tuple(
+            divmod(cell, self.cols)
+            for cell, bit in self.food_bit.items()
+            if state & bit
+        )
+        return (pos, food)
 
     def get_start_states(self):
         return [self.start_state]
 
     def is_goal_state(self, state):
-        _, food = state
-        return food is None
+        return not state & self.all_food
 
     def is_valid_state(self, _):
         return True
 
+    def get_successors(self, state):
+        # Fast path: read the neighbor table directly instead of calling
+        # `move` once per direction. Same order and action names.
+        self._num_expanded += 1
+        food_bits, food_bit, State = self.food_bits, self.food_bit, self.State
+        food = state & self.all_food
+        if self.corridors is not None:
+            return [
+                (State((n_cell << food_bits) | (food & ~food_bit.get(n_cell, 0))), action, cost)
+                for n_cell, action, cost in self.corridors[state >> food_bits]
+            ]
+
+        base = 4 * (state >> food_bits)
+        successors = []
+        for d in range(4):
+            n_cell = self.neighbors[base + d]
+            if n_cell >= 0:
+                n_food = food & ~food_bit.get(n_cell, 0)
+                successors.append((State((n_cell << food_bits) | n_food), self.ACTION_NAMES[d], 1))
+        return successors
+
+    def get_goal_states(self):
+        # Every optimal path ends the moment the last food is eaten
+        return [self.State(cell << self.food_bits) for cell in self.food_cells]
+
+    def get_predecessors(self, state):
+        """Inverse of `get_successors`: (prev_state, action, cost) tuples
+        such that applying `action` on `prev_state` leads to `state`.
+
+        States without food are all goal states, so moves between them are
+        never part of a search path and are left out. Expanding a state
+        backwards counts as an expansion, like `get_successors`.
+        """
+        self._num_expanded += 1
+        food_bits, food_bit, State = self.food_bits, self.food_bit, self.State
+        cell = state >> food_bits
+        food = state & self.all_food
+        bit = food_bit.get(cell, 0)
+        if food & bit:
+            return []  # Standing on a food without eating it
+
+        # Food left before the move: the food of this cell if it has just
+        # been eaten and, unless this is a goal state, the same as now
+        # (Pacman walked over an already eaten food)
+        previous = [food | bit] if bit else []
+        if food:
+            previous.append(food)
+
+        if self.corridors is not None:
+            # Corridors can be walked both ways: the macro move from p_cell
+            # to cell is the one stored in p_cell's list
+            moves = [
+                (p_cell, action, cost)
+                for p_cell, _, _ in self.corridors[cell]
+                for n_cell, action, cost in self.corridors[p_cell]
+                if n_cell == cell
+            ]
+        else:
+            # Moves are reversible: p_cell reaches cell with the opposite move
+            base = 4 * cell
+            moves = [
+                (p_cell, self.ACTION_NAMES[d ^ 1], 1)
+                for d, p_cell in enumerate(self.neighbors[base:base + 4])
+                if p_cell >= 0
+            ]
+
+        return [
+            (State((p_cell << food_bits) | p_food), action, cost)
+            for p_food in previous
+            for p_cell, action, cost in moves
+            if not p_food & food_bit.get(p_cell, 0)
+        ]
+
     @action(Categorical(["U", "D", "L", "R"]), cost=1)
     def move(self, state, direction):
-        (r, c), food = state
-        if direction == "U":
-            r -= 1
-        elif direction == "D":
-            r += 1
-        elif direction == "L":
-            c -= 1
-        elif direction == "R":
-            c += 1
-        else:
+        try:
+            d = self.DIRECTIONS.index(direction)
+        except ValueError:
             raise ValueError(f"Unknown action: {direction}")
 
-        new_food = food
-        if (r, c) == food:
-            new_food = None  # food eaten
+        n_cell = self.neighbors[4 * (state >> self.food_bits) + d]
+        if n_cell < 0:
+            return None
+
+        # Moving onto a food eats it
+        food = state & self.all_food & ~self.food_bit.get(n_cell, 0)
+        return self.State((n_cell << self.food_bits) | food)
+
+
+class SingleFoodHeuristic(Heuristic):
+    """
+    Base of the heuristics that estimate the distance to the one food of
+    the classic layouts (state = (cell << 1) | food_flag).
+    """
+
+    def __init__(self, problem):
+        super().__init__(problem)
+        if problem.food_cell is None:
+            raise HeuristicException(
+                f"{self.get_name()} needs a layout with a single food, "
+                "use FoodMSTHeuristic"
+            )
 
-        if 0 <= r <= self.rows and 0 <= c <= self.cols and self.grid[r][c] != "%":
-            return ((r, c), new_food)
-        return None
 
 @PacmanProblem.heuristic
-class EuclideanHeuristic(Heuristic):
+class EuclideanHeuristic(SingleFoodHeuristic):
     """
     Formula: sqrt((x2-x1)^2 + (y2-y1)^2)
     """
     
     def compute(self, state):
-        (pac_r, pac_c), food = state
-        
         # If food is already eaten, we're at the goal
-        if food is None:
+        if not state & 1:
             return 0
         
-        food_r, food_c = food
+        pac_r, pac_c = divmod(state >> 1, self.problem.cols)
+        food_r, food_c = self.problem.food
         
         # Calculate Euclidean distance
         return math.sqrt((pac_r - food_r) ** 2 + (pac_c - food_c) ** 2)
     
 @PacmanProblem.heuristic
-class ManhattanHeuristic(Heuristic):
+class ManhattanHeuristic(SingleFoodHeuristic):
     """
     Formula: |x2-x1| + |y2-y1|
     """
     
     def compute(self, state):
-        (pac_r, pac_c), food = state
-        
         # If food is already eaten, we're at the goal
-        if food is None:
+        if not state & 1:
             return 0
         
-        food_r, food_c = food
+        pac_r, pac_c = divmod(state >> 1, self.problem.cols)
+        food_r, food_c = self.problem.food
         
         # Calculate Manhattan distance
-        return abs(pac_r - food_r) + abs(pac_c - food_c)
\ No newline at end of file
+        return abs(pac_r - food_r) + abs(pac_c - food_c)
+
+
+@PacmanProblem.heuristic
+class MazeDistanceHeuristic(SingleFoodHeuristic):
+    """
+    Exact maze distance to the food, read from a precomputed BFS distance
+    map (cached on disk per maze), so compute() is a single lookup.
+    """
+
+    def __init__(self, problem):
+        super().__init__(problem)
+        self.distances = problem.distance_map(problem.food_cell)
+
+    def compute(self, state):
+        # If food is already eaten, we're at the goal
+        if not state & 1:
+            return 0
+
+        distance = self.distances[state >> 1]
+        return distance if distance >= 0 else math.inf
+
+
+
+@PacmanProblem.heuristic
+class LandmarkHeuristic(SingleFoodHeuristic):
+    """
+    ALT heuristic: for every landmark L, |d(L, food) - d(L, n)| is a lower
+    bound of d(n, food) by the triangle inequality. Returns the max over
+    the landmarks (and Manhattan, which is also admissible).
+    """
+
+    NUM_LANDMARKS = 8
+
+    def __init__(self, problem):
+        super().__init__(problem)
+        food = problem.food_cell
+        self.landmarks = [
+            (distances, distances[food])
+            for distances in problem.landmark_distances(self.NUM_LANDMARKS)
+            if distances[food] >= 0
+        ]
+        self.food_r, self.food_c = problem.food
+
+    def compute(self, state):
+        # If food is already eaten, we're at the goal
+        if not state & 1:
+            return 0
+
+        cell = state >> 1
+        pac_r, pac_c = divmod(cell, self.problem.cols)
+        best = abs(pac_r - self.food_r) + abs(pac_c - self.food_c)
+        for distances, to_food in self.landmarks:
+            distance = distances[cell]
+            if distance >= 0 and abs(to_food - distance) > best:
+                best = abs(to_food - distance)
+        return best
+
+
+@PacmanProblem.heuristic
+class FoodMSTHeuristic(Heuristic):
+    """
+    Heuristic for layouts with several foods: maze distance to the closest
+    food left plus the weight of the minimum spanning tree of the food left,
+    weighted by the maze distances between foods. Any path that eats them
+    all walks to one of them and then joins all of them, so it is
+    admissible (and consistent). With a single food it is the maze distance.
+
+    The distances are precomputed once per layout (`food_distances`) and
+    the MST only depends on the food mask, so it is memoized per mask.
+    """
+
+    def __init__(self, problem):
+        super().__init__(problem)
+        distances, pairwise = problem.food_distances()
+        self.distances = distances
+        self.pairwise = [[d if d >= 0 else math.inf for d in row] for row in pairwise]
+        self.mst = {0: 0}
+
+    def compute(self, state):
+        food = state & self.problem.all_food
+        if not food:
+            return 0
+
+        cell = state >> self.problem.food_bits
+        left = [i for i in range(self.problem.food_bits) if food >> i & 1]
+        closest = math.inf
+        for i in left:
+            distance = self.distances[i][cell]
+            if distance < 0:
+                return math.inf  # A food Pacman cannot reach
+            closest = min(closest, distance)
+
+        mst = self.mst.get(food)
+        if mst is None:
+            mst = self.mst[food] = self.spanning_tree(left)
+        return closest + mst
+
+    def spanning_tree(self, left):
+        """Weight of the MST of the foods in `left` (Prim, O(k^2))."""
+        pairwise = self.pairwise
+        first, rest = left[0], left[1:]
+        closest = {i: pairwise[first][i] for i in rest}
+        total = 0
+        while closest:
+            i = min(closest, key=closest.get)
+            total += closest.pop(i)
+            row = pairwise[i]
+            for j, distance in closest.items():
+                if row[j] < distance:
+                    closest[j] = row[j]
+        return total
+
+
+# Layout index
+##############################################################################
+
+
+def layout_index(directory=LAYOUTS_DIR):
+    """Size of every `.lay` under `directory`, without opening them.
+
+    Returns {path relative to `directory`: {"rows", "cols", "open_cells",
+    "hash", ...}}, or {"error", ...} for a layout that cannot be loaded.
+    The index is kept in `CACHE_DIR`; an entry is reused while the size and
+    mtime of its file do not change, and new or changed layouts are
+    compiled (which also fills their compiled-layout cache).
+    """
+    directory = os.path.abspath(directory)
+    key = hashlib.sha1(directory.encode()).hexdigest()[:16]
+    path = os.path.join(CACHE_DIR, f"layout-index-{key}.json")
+    try:
+        with open(path) as fh:
+            index = json.load(fh)
+    except (OSError, ValueError):
+        index = {}
+
+    updated = {}
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if not name.endswith(".lay"):
+                continue
+            file = os.path.join(root, name)
+            stat = os.stat(file)
+            entry = index.get(os.path.relpath(file, directory))
+            if entry is None or (entry["size"], entry["mtime_ns"]) != (stat.st_size, stat.st_mtime_ns):
+                entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+                try:
+                    problem = PacmanProblem(file=file)
+                except (OSError, ValueError) as e:
+                    # One broken layout must not hide the others
+                    entry["error"] = str(e)
+                else:
+                    entry.update(
+                        hash=problem.layout_hash,
+                        rows=problem.rows,
+                        cols=problem.cols,
+                        open_cells=problem.open_cells,
+                    )
+            updated[os.path.relpath(file, directory)] = entry
+
+    if updated != index:
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as fh:
+                json.dump(updated, fh, indent=1, sort_keys=True)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass  # Caching is only an optimization
+    return updated
+
+
+if __name__ == "__main__":
+    for layout, entry in sorted(layout_index().items()):
+        if "error" in entry:
+            print(f"{layout:<32} error: {entry['error']}")
+        else:
+            print(f"{layout:<32} {entry['rows']:>4} x {entry['cols']:<4} {entry['open_cells']:>7} open cells")
@@ -0,0 +1,44 @@
+import csv
+import multiprocessing
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_smoke_suite(tmp_path):
+    output = tmp_path / "results.csv"
+    subprocess.run(
+        [sys.executable, "benchmark.py", "smoke", "-j", "2", "-o", str(output)],
+        cwd=ROOT, check=True, capture_output=True, timeout=300,
+    )
+    with open(output) as fh:
+        rows = list(csv.DictReader(fh))
+    assert rows
+    for row in rows:
+        assert row["status"] == "ok", row["error"]
+        assert int(row["expanded"]) > 0
+        # Only the algorithms of algorithms/ record metrics
+        if row["algorithm"].startswith("my-"):
+            assert int(row["generated"]) > 0
+
+
+def test_rows_have_time_and_the_metrics_fringe():
+    sys.path.insert(0, ROOT)
+    import benchmark
+
+    runs = [
+        benchmark.Run("Jars", "my-graph-bibfs", params={"capacities": "5,3", "target": 4}),
+        benchmark.Run("Jars", "my-graph-bibfs", params={"capacities": "5,3", "target": "x"}),
+    ]
+    # Un procés per execució, com a main()
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1, initializer=benchmark.init_worker, initargs=(60, 0),
+                      maxtasksperchild=1) as pool:
+        ok, error = pool.map(benchmark.execute, runs)
+    assert ok["status"] == "ok"
+    # La fringe més gran de les dues direccions, no només `algorithm.fringe`
+    assert ok["max_fringe"] == 4
+    assert error["status"] == "error", error
+    assert error["time"] != ""
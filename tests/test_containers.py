@@ -0,0 +1,87 @@
+import os
+import random
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "algorithms"))
+
+from containers import IndexedPriorityQueue  # noqa: E402
+
+
+def queue(items):
+    # Els elements són les mateixes claus
+    q = IndexedPriorityQueue(index=lambda key: key)
+    for key, priority in items:
+        q.push(key, priority)
+    return q
+
+
+def pop_all(q):
+    return [q.pop() for _ in range(q.size())]
+
+
+def assert_consistent(q):
+    assert {entry[2]: i for i, entry in enumerate(q._heap)} == q._position
+
+
+def test_push_decreases_the_key():
+    q = queue([("a", 5), ("b", 3), ("c", 4)])
+    assert q.push("a", 1)
+    # Una prioritat que no és millor no canvia res
+    assert not q.push("b", 3)
+    assert not q.push("c", 9)
+    assert q.priority("a") == 1
+    assert q.size() == 3
+    assert pop_all(q) == ["a", "b", "c"]
+
+
+def test_decrease_key_ties_count_as_new_insertions():
+    # Com un push duplicat a PriorityQueue: després dels empats que ja hi eren
+    q = queue([("a", 5), ("b", 2), ("c", 2)])
+    q.push("a", 2)
+    assert pop_all(q) == ["b", "c", "a"]
+
+
+@pytest.mark.parametrize("slot", ["last", "inner"])
+def test_discard(slot):
+    items = [(key, priority) for priority, key in enumerate("jihgfedcba")]
+    q = queue(items)
+    key = q._heap[-1][2] if slot == "last" else q._heap[1][2]
+    q.discard(key)
+    assert key not in q
+    assert_consistent(q)
+    # Treure una clau que no hi és no fa res
+    q.discard("z")
+    assert pop_all(q) == [k for _, k in sorted((p, k) for k, p in items if k != key)]
+
+
+def test_max_size_ignores_decrease_key():
+    q = queue([(i, 10 + i) for i in range(5)])
+    q.pop()
+    q.pop()
+    q.push(4, 0)
+    q.push(3, 1)
+    assert (q.size(), q.max_size) == (3, 5)
+    for i in range(5, 8):
+        q.push(i, i)
+    assert (q.size(), q.max_size) == (6, 6)
+
+
+def test_matches_a_sorted_reference():
+    rng = random.Random(7)
+    q = IndexedPriorityQueue(index=lambda key: key, arity=3)
+    best = {}
+    for _ in range(2000):
+        key, priority = rng.randrange(50), rng.randrange(100)
+        if rng.random() < 0.1:
+            q.discard(key)
+            best.pop(key, None)
+        elif key not in best or priority < best[key]:
+            assert q.push(key, priority)
+            best[key] = priority
+        assert_consistent(q)
+    popped = [q.pop() for _ in range(q.size())]
+    assert [best[key] for key in popped] == sorted(best.values())
+    assert set(popped) == set(best)
@@ -0,0 +1,93 @@
+import heapq
+import os
+import sys
+
+import pytest
+from hlogedu.search.algorithm import Node, Solution
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "problems"))
+
+from pacman import FoodMSTHeuristic, PacmanProblem  # noqa: E402
+
+LAYOUTS = ["tinyMaze", "smallMaze", "mediumMaze", "openMaze", "tinySearch"]
+
+
+def ucs(problem):
+    """Node objectiu d'un camí òptim seguint get_successors."""
+    start = problem.get_start_states()[0]
+    best = {start: 0}
+    heap = [(0, 0, Node(start))]
+    order = 1
+    while heap:
+        cost, _, n = heapq.heappop(heap)
+        if cost > best[n.state]:
+            continue
+        if problem.is_goal_state(n.state):
+            return n
+        for s, a, c in problem.get_successors(n.state):
+            if cost + c < best.get(s, float("inf")):
+                best[s] = cost + c
+                heapq.heappush(heap, (cost + c, order, Node(s, a, cost=cost + c, parent=n)))
+                order += 1
+    return None
+
+
+@pytest.mark.parametrize("layout", LAYOUTS)
+def test_expanded_corridor_path_is_an_optimal_cell_path(layout):
+    file = os.path.join(ROOT, "problems", "layouts", f"{layout}.lay")
+    cells = PacmanProblem(file=file)
+    corridors = PacmanProblem(file=file, graph="corridors")
+
+    goal = ucs(corridors)
+    path = goal.compute_path()
+    root = path[0]
+    for parent, child in zip(path, path[1:]):
+        parent.add_successor(child)
+    solution = corridors.expand_solution(Solution(corridors, [root], solution_node=goal))
+
+    # El camí desplegat són moviments d'una casella vàlids al graf de
+    # caselles, amb el mateix cost que el camí comprimit i que l'òptim
+    expanded = solution.solution_node.compute_path()
+    assert expanded[0].state == cells.get_start_states()[0]
+    for parent, child in zip(expanded, expanded[1:]):
+        assert (child.state, child.action, 1) in cells.get_successors(parent.state)
+        assert child.cost == parent.cost + 1
+    assert cells.is_goal_state(expanded[-1].state)
+    assert expanded[-1].cost == goal.cost == ucs(cells).cost
+
+
+def costs_to_goal(problem):
+    """Cost òptim de cada estat abastable fins a menjar-ho tot (BFS enrere)."""
+    start = problem.get_start_states()[0]
+    predecessors = {start: []}
+    queue = [start]
+    for state in queue:
+        for s, _, _ in problem.get_successors(state):
+            if s not in predecessors:
+                predecessors[s] = []
+                queue.append(s)
+            predecessors[s].append(state)
+
+    queue = [state for state in predecessors if problem.is_goal_state(state)]
+    costs = dict.fromkeys(queue, 0)
+    for state in queue:
+        for prev in predecessors[state]:
+            if prev not in costs:
+                costs[prev] = costs[state] + 1
+                queue.append(prev)
+    return costs, predecessors
+
+
+@pytest.mark.parametrize("layout", ["tinySearch", "trickySearch"])
+def test_food_mst_is_admissible_and_consistent(layout):
+    problem = PacmanProblem(file=os.path.join(ROOT, "problems", "layouts", f"{layout}.lay"))
+    costs, predecessors = costs_to_goal(problem)
+    h = FoodMSTHeuristic(problem)
+    start = problem.get_start_states()[0]
+    assert h.compute(start) <= costs[start] == ucs(problem).cost
+    for state, cost in costs.items():
+        value = h.compute(state)
+        assert value <= cost, problem.decode(state)
+        for prev in predecessors[state]:
+            assert h.compute(prev) <= 1 + value
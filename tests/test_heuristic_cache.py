@@ -0,0 +1,40 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "algorithms"))
+
+from hlogedu.search.exceptions import AlgorithmException  # noqa: E402
+
+from heuristic_cache import CACHE_ENV, CachedHeuristic, cached_heuristic  # noqa: E402
+
+
+@pytest.mark.parametrize("policy, lookups, survivors, hits", [
+    # LRU: l'1 torna a ser recent, així el 4 treu el 2 i el 2 treu el 3
+    ("lru", [1, 2, 3, 1, 4, 2], {1, 2, 4}, 1),
+    # CLOCK: l'1 té el bit de referència i se salva; el 4 treu el 2 i el
+    # 5 el 3
+    ("clock", [1, 2, 3, 1, 4, 5, 1], {1, 4, 5}, 2),
+])
+def test_eviction_past_the_size(policy, lookups, survivors, hits):
+    computed = []
+
+    def heuristic(state):
+        computed.append(state)
+        return state * 10
+
+    cache = CachedHeuristic(heuristic, size=3, policy=policy)
+    assert [cache(state) for state in lookups] == [state * 10 for state in lookups]
+    assert set(cache.values) == survivors
+    assert (cache.hits, cache.misses) == (hits, len(lookups) - hits)
+    assert cache.evictions == cache.misses - 3
+    assert len(computed) == cache.misses
+
+
+@pytest.mark.parametrize("spec", ["lfu:10", "lru:ten", "clock:0"])
+def test_invalid_spec_names_the_variable(monkeypatch, spec):
+    monkeypatch.setenv(CACHE_ENV, spec)
+    with pytest.raises(AlgorithmException, match=f"{CACHE_ENV}.*lru:N.*clock:N"):
+        cached_heuristic(lambda state: 0)
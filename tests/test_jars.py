@@ -0,0 +1,56 @@
+import itertools
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "problems"))
+
+from jars import JarsProblem  # noqa: E402
+
+CAPACITIES = ["5,3", "4,6", "6,4,9", "3,3,2"]
+
+
+def all_states(problem):
+    return itertools.product(*(range(capacity + 1) for capacity in problem.capacities))
+
+
+def reachable(problem):
+    # L'objectiu 0 sempre té solució, així que get_successors no retalla res
+    full = JarsProblem(capacities=",".join(map(str, problem.capacities)), target=0)
+    seen = set(full.get_start_states())
+    queue = list(seen)
+    for state in queue:
+        for s, _, _ in full.get_successors(state):
+            if s not in seen:
+                seen.add(s)
+                queue.append(s)
+    return seen
+
+
+@pytest.mark.parametrize("capacities", CAPACITIES)
+def test_precheck_matches_the_reachable_amounts(capacities):
+    states = reachable(JarsProblem(capacities=capacities, target=0))
+    amounts = {state[0] for state in states}
+    first = int(capacities.split(",")[0])
+    for target in range(first + 2):
+        problem = JarsProblem(capacities=capacities, target=target)
+        assert problem.solvable == (target in amounts), target
+        if not problem.solvable:
+            # Sense successors la cerca s'atura a l'estat inicial
+            assert problem.get_successors(problem.get_start_states()[0]) == []
+            assert list(problem.get_goal_states()) == []
+
+
+@pytest.mark.parametrize("capacities", CAPACITIES)
+def test_predecessors_invert_successors(capacities):
+    problem = JarsProblem(capacities=capacities, target=0)
+    forward = {state: set() for state in all_states(problem)}
+    for state in forward:
+        for s, a, c in problem.get_successors(state):
+            forward[s].add((state, a, c))
+    for state, expected in forward.items():
+        predecessors = problem.get_predecessors(state)
+        assert len(predecessors) == len(set(predecessors))
+        assert set(predecessors) == expected, state
@@ -0,0 +1,83 @@
+import heapq
+import math
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "problems"))
+
+from kiwis_and_dogs import (  # noqa: E402
+    PATTERN_DATABASES, KiwisAndDogsProblem, PatternDatabaseHeuristic, generate_instance,
+)
+
+
+class SinglesOnly(PatternDatabaseHeuristic):
+    MAX_PAIR_NODES = 0
+
+
+def load(tmp_path, seed):
+    if seed is None:
+        return KiwisAndDogsProblem()
+    path = tmp_path / f"random-{seed}.kd"
+    path.write_text(generate_instance(7, 2, 2, seed=seed))
+    return KiwisAndDogsProblem(file=str(path))
+
+
+def costs_to_goal(problem):
+    """Cost òptim de cada estat abastable fins a l'objectiu (UCS enrere)."""
+    start = problem.get_start_states()[0]
+    predecessors = {start: []}
+    queue = [start]
+    for state in queue:
+        for s, _, c in problem.get_successors(state):
+            if s not in predecessors:
+                predecessors[s] = []
+                queue.append(s)
+            predecessors[s].append((state, c))
+
+    costs = {}
+    heap = [(0, 0, problem.goal_state)] if problem.goal_state in predecessors else []
+    order = 1
+    while heap:
+        cost, _, state = heapq.heappop(heap)
+        if state in costs:
+            continue
+        costs[state] = cost
+        for prev, c in predecessors[state]:
+            if prev not in costs:
+                heapq.heappush(heap, (cost + c, order, prev))
+                order += 1
+    return {state: costs.get(state, math.inf) for state in predecessors}, predecessors
+
+
+@pytest.mark.parametrize("seed", [None, 1, 2, 3])
+def test_pattern_database_is_admissible_and_consistent(tmp_path, seed):
+    problem = load(tmp_path, seed)
+    costs, predecessors = costs_to_goal(problem)
+    h = PatternDatabaseHeuristic(problem)
+    singles = SinglesOnly(problem)
+    for state, cost in costs.items():
+        value = h.compute(state)
+        assert value <= cost, state
+        # Les parelles només poden ajustar més la suma d'agents sols
+        assert singles.compute(state) <= value
+        for prev, c in predecessors[state]:
+            assert h.compute(prev) <= c + value
+    assert h.compute(problem.goal_state) == 0
+
+
+def test_pairs_are_skipped_on_large_graphs(tmp_path):
+    problem = load(tmp_path, 1)
+    assert PatternDatabaseHeuristic(problem).pairs
+    # Amb més nodes que MAX_PAIR_NODES només hi ha les taules d'agents sols,
+    # encara que les de parelles ja siguin a PATTERN_DATABASES
+    fallback = SinglesOnly(problem)
+    assert not fallback.pairs
+    state = problem.get_start_states()[0]
+    assert fallback.compute(state) == sum(
+        fallback.singles[goal][pos]
+        for pos, goal in zip(state.kiwis + state.dogs, fallback.goals)
+    )
+    assert len(PATTERN_DATABASES) >= 2
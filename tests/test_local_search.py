@@ -0,0 +1,54 @@
+import os
+import re
+import subprocess
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_search(*args):
+    """Executa `hlogedu-search run` amb els problemes i algorismes del repo.
+
+    Retorna la sortida de l'outputter seguida del resum (que va a stderr).
+    """
+    result = subprocess.run(
+        ["hlogedu-search", "run", "-pd", "problems", "-ad", "algorithms", *args],
+        cwd=ROOT, capture_output=True, text=True, timeout=600,
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stdout + result.stderr
+
+
+@pytest.mark.parametrize("algorithm, n_queens", [
+    ("my-local-minconflicts", 1000),
+    ("my-local-hillclimbing", 1000),
+    ("my-local-annealing", 1000),
+    ("my-local-minconflicts", 100000),
+])
+def test_local_search_large_board(algorithm, n_queens):
+    # Camins de milers de passos: abans petaven amb RecursionError en
+    # copiar els estats del camí
+    out = run_search(
+        "-a", algorithm, "-p", "NQueensIR",
+        "-pp", f"n_queens={n_queens}", "-pp", "seed=1", "-o", "none",
+    )
+    cost = re.search(r"Solution Cost: (\d+)", out)
+    length = re.search(r"Solution Length: (\d+)", out)
+    assert cost and length, out
+    assert int(length.group(1)) == int(cost.group(1)) + 1
+
+
+@pytest.mark.parametrize("encoding", ["tuple", "int", "zobrist"])
+def test_local_search_path_reaches_goal(encoding):
+    out = run_search(
+        "-a", "my-local-minconflicts", "-p", "NQueensIR",
+        "-pp", "n_queens=8", "-pp", f"encoding={encoding}",
+    )
+    # L'últim estat del camí (el node objectiu, en una caixa) no té conflictes
+    goal = re.findall(r'label=<\(([\d, ]+)\)<FONT[^\n]*shape="box"', out)
+    assert goal, out
+    rows = [int(r) for r in goal[-1].split(",")]
+    assert len(set(rows)) == len(rows)
+    assert len({q - r for q, r in enumerate(rows)}) == len(rows)
+    assert len({q + r for q, r in enumerate(rows)}) == len(rows)
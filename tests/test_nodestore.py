@@ -0,0 +1,73 @@
+import os
+import random
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "algorithms"))
+
+import nodestore  # noqa: E402
+import treestream  # noqa: E402
+
+
+def test_node_store_builds_the_tree_around_the_solution_path():
+    store = nodestore.NodeStore()
+    a = store.root("a")
+    store.expand(a, 1)
+    store.child(a, "b", "ab", 1)
+    c = store.child(a, "c", "ac", 1)
+    store.expand(c, 2)
+    d = store.child(c, "d", "cd", 2)
+    solution = store.solution(None, d)
+    goal = solution.solution_node
+    assert [n.state for n in goal.compute_path()] == ["a", "c", "d"]
+
+    # En llegir les arrels s'hi afegeixen els nodes que no són del camí,
+    # en l'ordre en què es van generar, i el camí és el mateix objecte
+    root, = solution.root_nodes
+    assert [n.state for n in root.successors] == ["b", "c"]
+    assert root.successors[1] is goal.parent
+    assert root.successors[1].successors == [goal]
+    assert (root.expanded_order, goal.parent.expanded_order) == (1, 2)
+
+
+@pytest.mark.parametrize("algorithm", ["my-graph-ucs", "my-tree-ids"])
+def test_dot_draws_the_whole_search_tree(algorithm):
+    result = subprocess.run(
+        ["hlogedu-search", "run", "-pd", "problems", "-ad", "algorithms",
+         "-a", algorithm, "-p", "Pacman", "-md", "12",
+         "-pp", "file=problems/layouts/tinyMaze.lay", "-o", "dot"],
+        cwd=ROOT, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    nodes = result.stdout.count('shape="ellipse"')
+    on_path = result.stdout.count('shape="ellipse", color="lawngreen"')
+    # Camí de la solució ressaltat (tinyMaze: 8 accions) i la resta de l'arbre
+    assert on_path == 8
+    assert nodes > on_path
+    # L'ordre d'expansió és el de la llibreria (`expanded_order`)
+    assert "e: 1</FONT>" in result.stdout
+
+
+def test_sampled_nodes_keep_their_ancestors(tmp_path):
+    rng = random.Random(4)
+    parents = [-1] + [rng.randrange(i) for i in range(1, 2000)]
+    depths = [0]
+    for parent in parents[1:]:
+        depths.append(depths[parent] + 1)
+
+    path = str(tmp_path / "tree.jsonl")
+    writer = treestream.TreeWriter(path, sample=5)
+    writer.sample_nodes(parents)
+    for i, parent in enumerate(parents):
+        writer.node(i, parent, depths[i], depths[i], "a", i)
+    summary = writer.finish()
+
+    nodes, _, _, _ = treestream.read_tree(path)
+    assert summary["written"] == len(nodes)
+    assert summary["written"] + summary["sampled_out"] == len(parents)
+    assert 0 < summary["sampled_out"]
+    # Cap node escrit penja d'un pare descartat
+    assert all(parent < 0 or parent in nodes for parent, *_ in nodes.values())
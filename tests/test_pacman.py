@@ -0,0 +1,76 @@
+import os
+import re
+import sys
+from array import array
+import subprocess
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_dot_output_shows_decoded_states():
+    result = subprocess.run(
+        ["hlogedu-search", "run", "-pd", "problems", "-ad", "algorithms",
+         "-a", "hlog-graph-bfs", "-p", "Pacman",
+         "-pp", "file=problems/layouts/tinyMaze.lay", "-o", "dot"],
+        cwd=ROOT, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    # L'estat inicial és ((fila, columna), menjar que queda), no l'enter empaquetat
+    assert "label=<((1, 5), ((5, 1),))" in result.stdout
+
+
+def test_hpastar_rebuilds_a_stale_cache():
+    sys.path.insert(0, os.path.join(ROOT, "problems"))
+    from pacman import PacmanProblem
+
+    layout = os.path.join(ROOT, "problems", "layouts", "mediumMaze.lay")
+    path = PacmanProblem(file=layout).cache_path("hpa-16.bin")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Un fitxer del format antic (sense capçalera) amb arestes inventades
+    with open(path, "wb") as fh:
+        array("i", (0, 1, 1) * 10).tofile(fh)
+    result = subprocess.run(
+        ["hlogedu-search", "run", "-pd", "problems", "-ad", "algorithms",
+         "-a", "my-graph-hpastar", "-p", "Pacman",
+         "-pp", f"file={layout}", "-o", "none"],
+        cwd=ROOT, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    assert "Solution Cost: 68" in result.stderr
+    header = array("i")
+    with open(path, "rb") as fh:
+        header.frombytes(fh.read(4 * 4))
+    assert list(header[1:3]) == [1, 16]
+
+
+def test_layout_index_reports_broken_layouts(tmp_path):
+    sys.path.insert(0, os.path.join(ROOT, "problems"))
+    from pacman import layout_index
+
+    with open(os.path.join(ROOT, "problems", "layouts", "tinyMaze.lay")) as fh:
+        (tmp_path / "tinyMaze.lay").write_text(fh.read())
+    (tmp_path / "broken.lay").write_text("%%%\n% %\n%%%\n")
+    index = layout_index(str(tmp_path))
+    # Un laberint sense P no impedeix indexar la resta
+    assert "error" in index["broken.lay"]
+    assert (index["tinyMaze.lay"]["rows"], index["tinyMaze.lay"]["cols"]) == (7, 7)
+
+
+def solution_cost(algorithm, layout, *args):
+    result = subprocess.run(
+        ["hlogedu-search", "run", "-pd", "problems", "-ad", "algorithms",
+         "-a", algorithm, "-p", "Pacman",
+         "-pp", f"file=problems/layouts/{layout}.lay", "-o", "none", *args],
+        cwd=ROOT, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    return re.search(r"Solution Cost: (\d+)", result.stderr).group(1)
+
+
+@pytest.mark.parametrize("layout", ["tinyMaze", "smallMaze", "contoursMaze", "openMaze", "bigMaze"])
+def test_jps_finds_the_bfs_cost(layout):
+    # Amb cost unitari BFS és òptim; els salts de JPS no poden allargar el camí
+    jps = solution_cost("my-graph-jps", layout, "-hf", "ManhattanHeuristic")
+    assert jps == solution_cost("hlog-graph-bfs", layout)
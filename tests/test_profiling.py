@@ -0,0 +1,31 @@
+import os
+import subprocess
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def profile(*args):
+    """Taula de HLOG_PROFILE=- d'una execució de `hlogedu-search run`."""
+    result = subprocess.run(
+        ["hlogedu-search", "run", "-pd", "problems", "-ad", "algorithms", *args, "-o", "none"],
+        cwd=ROOT, capture_output=True, text=True, timeout=300,
+        env={**os.environ, "HLOG_PROFILE": "-"},
+    )
+    assert result.returncode == 0, result.stderr
+    return {line.split()[0]: line.split()[1:] for line in result.stderr.splitlines() if line}
+
+
+@pytest.mark.parametrize("args, actions", [
+    (["-a", "my-graph-ucs", "-p", "Jars", "-pp", "capacities=5,3", "-pp", "target=4"],
+     ["fill", "empty", "pour"]),
+    (["-a", "my-graph-astar", "-p", "NQueensIR", "-pp", "n_queens=5", "-hf", "RepairHeuristic"],
+     ["move"]),
+])
+def test_actions_are_profiled(args, actions):
+    phases = profile(*args)
+    assert "get_successors" in phases
+    for name in actions:
+        assert name in phases
+        assert int(phases[name][0]) > 0